@@ -0,0 +1,81 @@
+"""
+Overload behaviour of the async Cortex server's ask-preview route with and
+without admission control: a burst of N concurrent requests against a
+recall that blocks its thread for --recall-ms. Reports how many were served
+or shed, and the latency of the served ones.
+
+Usage: python scripts/bench/bench_admission.py [--requests 2000] [--recall-ms 20] [--queue 64]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "services"))
+
+from aiohttp.test_utils import TestServer, TestClient
+
+from cortex import admission, async_server
+from cortex.api import CortexAPI
+
+
+def slow_recall(seconds: float):
+    def recall(query, rerank_budget_ms=None, rerank_timings=None):
+        time.sleep(seconds)
+        return []
+    return recall
+
+
+async def burst(client: TestClient, n: int):
+    async def one(i):
+        start = time.perf_counter()
+        resp = await client.get("/jarvis/ask-preview", params={"query": f"q{i}"})
+        await resp.read()
+        return resp.status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(n)))
+    return results, time.perf_counter() - start
+
+
+async def run_case(name: str, args, recall_limiter, tmp: str):
+    app = async_server.create_app(
+        executor_workers=args.workers,
+        cortex_api=CortexAPI(audit_log_path=os.path.join(tmp, f"{name}.jsonl")),
+        recall=slow_recall(args.recall_ms / 1000.0),
+        rate_limiter=admission.ClientRateLimiter(rate=0),
+        recall_limiter=recall_limiter,
+    )
+    async with TestClient(TestServer(app)) as client:
+        results, elapsed = await burst(client, args.requests)
+    served = sorted(t for status, t in results if status == 200)
+    shed = sum(status == 503 for status, _ in results)
+    pct = lambda p: served[int(p * (len(served) - 1))] * 1000.0 if served else float("nan")
+    print(f"{name:10s} served {len(served):5d}  shed {shed:5d}  "
+          f"p50 {pct(0.5):7.0f} ms  p99 {pct(0.99):7.0f} ms  burst cleared in {elapsed:5.1f} s")
+
+
+async def main_async(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        unbounded = admission.AsyncConcurrencyLimiter("recall", args.workers, max_queue=10**9, queue_timeout_s=3600)
+        await run_case("unbounded", args, unbounded, tmp)
+        bounded = admission.AsyncConcurrencyLimiter("recall", args.workers, max_queue=args.queue,
+                                                    queue_timeout_s=args.timeout)
+        await run_case("admission", args, bounded, tmp)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--recall-ms", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=1.0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Per-call latency of AuditWriter.write() in each durability mode, against
+the previous open/append/close per record, with several request threads.
+
+Usage: python scripts/bench/bench_audit_writer.py [--threads 8] [--records 2000]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "services"))
+
+from cortex.audit import AuditWriter
+
+RECORD = {"user_id": "u", "agent_id": "General", "brick_ids_used": ["a" * 32] * 5,
+          "model": "gpt-4o", "token_cost": 0.002, "timestamp": "2026-01-01T00:00:00+00:00"}
+
+
+def open_append_close(path):
+    def write(record):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    return write
+
+
+def run(write, threads: int, records: int):
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        mine = []
+        for _ in range(records):
+            start = time.perf_counter()
+            write(RECORD)
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    pct = lambda p: latencies[int(p * (len(latencies) - 1))] * 1e6
+    return len(latencies) / elapsed, pct(0.5), pct(0.99)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--records", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = [("open/append/close", open_append_close(os.path.join(tmp, "plain.jsonl")), None)]
+        for mode in ("async", "write", "fsync"):
+            writer = AuditWriter(os.path.join(tmp, f"{mode}.jsonl"), durability=mode)
+            cases.append((f"AuditWriter {mode}", writer.write, writer))
+
+        for name, write, writer in cases:
+            rate, p50, p99 = run(write, args.threads, args.records)
+            extra = ""
+            if writer is not None:
+                writer.close()
+                extra = f"  ({writer.records / max(writer.batches, 1):.1f} records/batch)"
+            print(f"{name:20s} {rate:9.0f} rec/s  p50 {p50:8.1f} us  p99 {p99:8.1f} us{extra}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Latency of CortexAPI's MODE-1 context reload for one generate() request of
+N bricks spread over several conversation trees: first request (trees
+parsed) vs later requests (SourceReader cache), with the token budget.
+
+Usage: python scripts/bench/bench_context_reload.py [--bricks 100,500] [--trees 20] [--messages 200]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "services"))
+
+from nexus.ask import recall
+from nexus.bricks.brick_store import BrickStore
+from nexus.bricks.extractor import extract_bricks_from_file
+from nexus.bricks.source_reader import SourceReader
+from cortex.api import CortexAPI
+
+
+def build_corpus(root: str, n_trees: int, n_messages: int):
+    rng = random.Random(3)
+    words = "nexus brick recall wall cortex graph rerank memory source span".split()
+    brick_ids = []
+    for t in range(n_trees):
+        tree = os.path.join(root, "trees", f"conv{t}", "path_1.json")
+        os.makedirs(os.path.dirname(tree))
+        messages = []
+        for i in range(n_messages):
+            paragraphs = ["".join(" " + rng.choice(words) for _ in range(40)) for _ in range(3)]
+            messages.append({"message_id": f"m{i}", "role": "user", "content": "\n\n".join(paragraphs)})
+        with open(tree, "w", encoding="utf-8") as f:
+            json.dump({"messages": messages}, f)
+        with open(extract_bricks_from_file(tree, root), "r", encoding="utf-8") as f:
+            brick_ids.extend(b["brick_id"] for b in json.load(f))
+    return brick_ids
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bricks", default="100,500")
+    parser.add_argument("--trees", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=8000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        all_ids = build_corpus(tmp, args.trees, args.messages)
+        recall._brick_store = BrickStore(os.path.join(tmp, "bricks"))
+        api = CortexAPI(audit_log_path=os.path.join(tmp, "audit.jsonl"))
+        rng = random.Random(1)
+
+        for n in (int(x) for x in args.bricks.split(",")):
+            recall._source_reader = SourceReader()
+            requests = [rng.sample(all_ids, n) for _ in range(6)]
+            timings = []
+            for ids in requests:
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    text = api._reload_source_text(ids, token_budget=args.budget)
+                timings.append((time.perf_counter() - start) * 1000.0)
+                assert text is not None, "reload blocked"
+            warm = sorted(timings[1:])[len(timings[1:]) // 2]
+            print(f"{n:5d} bricks / {args.trees} trees: first {timings[0]:7.1f} ms, "
+                  f"cached {warm:6.2f} ms, context {len(text) // 4} tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+CPU throughput benchmark for CrossEncoderReranker, in pairs/sec.
+
+Compares unbucketed vs length-bucketed batching, thread counts and int8
+dynamic quantization on a synthetic mix of short and long bricks.
+Requires sentence-transformers and torch.
+
+Usage: python scripts/bench/bench_cross_encoder.py [--pairs 512] [--threads 1,4] [--model NAME_OR_PATH]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from nexus.rerank.cross_encoder import CrossEncoderReranker, DEFAULT_CROSS_ENCODER_MODEL
+
+
+def make_pairs(n: int):
+    rng = random.Random(42)
+    words = "nexus brick recall wall cortex graph rerank memory source span".split()
+    pairs = []
+    for _ in range(n):
+        # Mostly short bricks with a long tail, like real chat paragraphs
+        length = rng.choice([8, 12, 20, 30, 40, 60, 200, 400])
+        pairs.append(["how does recall reranking work", " ".join(rng.choice(words) for _ in range(length))])
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs", type=int, default=512)
+    parser.add_argument("--threads", default="1,4")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-length", type=int, default=256)
+    # A local directory works too (offline hosts, same-architecture stand-ins)
+    parser.add_argument("--model", default=DEFAULT_CROSS_ENCODER_MODEL)
+    args = parser.parse_args()
+
+    pairs = make_pairs(args.pairs)
+    print(f"{'threads':>7} {'int8':>5} {'buckets':>7} {'pairs/sec':>10}")
+    for threads in [int(t) for t in args.threads.split(",")]:
+        for int8 in (False, True):
+            reranker = CrossEncoderReranker(model_name=args.model, max_length=args.max_length, batch_size=args.batch_size,
+                                            num_threads=threads, int8=int8)
+            for buckets in (False, True):
+                reranker.length_buckets = buckets
+                reranker.predict_pairs(pairs[:args.batch_size])  # warm-up
+                start = time.perf_counter()
+                reranker.predict_pairs(pairs)
+                elapsed = time.perf_counter() - start
+                print(f"{threads:>7} {str(int8):>5} {str(buckets):>7} {len(pairs) / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
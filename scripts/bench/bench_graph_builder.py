@@ -0,0 +1,60 @@
+"""
+Throughput and peak memory of GraphBuilder on synthetic bricks (Zipf-like
+vocabulary): a full build, then an incremental update with a small batch of
+new bricks, as after a sync.
+
+Usage: python scripts/bench/bench_graph_builder.py [--bricks 200000] [--update 2000]
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from nexus.graph.builder import GraphBuilder
+
+
+def make_bricks(prefix: str, n: int, vocab: int, seed: int):
+    rng = random.Random(seed)
+    words = [f"term{i}" for i in range(vocab)]
+    for i in range(n):
+        # Skewed: low-numbered terms are common
+        text = " ".join(words[int(vocab * rng.random() ** 2.5)] for _ in range(rng.randint(20, 80)))
+        yield {"brick_id": f"{prefix}{i}", "content": text}
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bricks", type=int, default=200_000)
+    parser.add_argument("--update", type=int, default=2000)
+    parser.add_argument("--vocab", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        builder = GraphBuilder(os.path.join(tmp, "state.sqlite"))
+        graph_dir = os.path.join(tmp, "graph")
+
+        start = time.perf_counter()
+        stats = builder.update(make_bricks("b", args.bricks, args.vocab, 1), graph_dir)
+        elapsed = time.perf_counter() - start
+        print(f"full build:  {args.bricks} bricks in {elapsed:.1f}s ({args.bricks / elapsed:.0f}/s), "
+              f"{stats['nodes']} nodes, {stats['edges']} edges, peak RSS {peak_rss_mb():.0f} MB")
+
+        start = time.perf_counter()
+        stats = builder.update(make_bricks("u", args.update, args.vocab, 2), graph_dir)
+        print(f"incremental: {args.update} bricks in {time.perf_counter() - start:.2f}s, "
+              f"{stats['terms_refreshed']} concepts re-ranked, peak RSS {peak_rss_mb():.0f} MB")
+        print(f"state file:  {os.path.getsize(os.path.join(tmp, 'state.sqlite')) / 1e6:.0f} MB")
+        builder.close()
+
+
+if __name__ == "__main__":
+    main()
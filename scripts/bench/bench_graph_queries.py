@@ -0,0 +1,63 @@
+"""
+Build time and query latency of GraphAdjacency on a synthetic concept graph
+(power-law-ish degrees), for the /jarvis/graph/* endpoints.
+
+Usage: python scripts/bench/bench_graph_queries.py [--nodes 300000] [--edges-per-node 4]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from nexus.graph.adjacency import GraphAdjacency
+
+
+def make_graph(n: int, edges_per_node: int):
+    rng = random.Random(7)
+    words = "safety alignment memory recall graph brick wall cortex nexus model".split()
+    nodes = [{"id": f"concept_{i}", "label": f"{rng.choice(words)} {i}"} for i in range(n)]
+    edges = []
+    for i in range(n):
+        for _ in range(edges_per_node):
+            # Skewed targets: low ids become hubs
+            j = int(n * rng.random() ** 3)
+            if j != i:
+                edges.append({"source": f"concept_{i}", "target": f"concept_{j}", "type": "co_occurs"})
+    return nodes, edges
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=300_000)
+    parser.add_argument("--edges-per-node", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    nodes, edges = make_graph(args.nodes, args.edges_per_node)
+    start = time.perf_counter()
+    g = GraphAdjacency(nodes, edges)
+    print(f"build: {g.node_count} nodes, {g.edge_count} edges in {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(1)
+    sample = [f"concept_{rng.randrange(args.nodes)}" for _ in range(args.repeat)]
+    it = iter(sample * 10)
+    print(f"neighborhood 1 hop (<=500):  {timed(lambda: g.neighborhood(next(it), 1, 500), args.repeat):.2f} ms")
+    print(f"neighborhood 2 hops (<=500): {timed(lambda: g.neighborhood(next(it), 2, 500), args.repeat):.2f} ms")
+    print(f"hub neighborhood (<=2000):   {timed(lambda: g.neighborhood('concept_0', 2, 2000), 5):.2f} ms")
+    print(f"prefix search (20):          {timed(lambda: g.search('memory 12', 20), args.repeat):.3f} ms")
+    print(f"node page (1000):            {timed(lambda: g.list_nodes(args.nodes // 2, 1000), args.repeat):.3f} ms")
+    print(f"edge page (1000):            {timed(lambda: g.list_edges(g.edge_count // 2, 1000), args.repeat):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark HeuristicReranker with and without the sync-time TermIndex.
+
+Usage: python scripts/bench/bench_heuristic.py [--candidates 1000] [--words 120]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from nexus.rerank.heuristic import HeuristicReranker
+from nexus.rerank.term_index import TermIndex
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=1000)
+    parser.add_argument("--words", type=int, default=120, help="Words per brick")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocab = [f"term{i}" for i in range(5000)]
+    bricks = [
+        {"brick_id": f"b{i}", "content": " ".join(rng.choice(vocab) for _ in range(args.words))}
+        for i in range(args.candidates)
+    ]
+    candidates = [
+        {"brick_id": b["brick_id"], "brick_text": b["content"], "base_confidence": rng.random()}
+        for b in bricks
+    ]
+    query = "term1 term42 term99 term1234"
+
+    index = TermIndex()
+    index.add_bricks(bricks)
+
+    for label, reranker in (("text", HeuristicReranker()), ("term_index", HeuristicReranker(index))):
+        reranker.rank(query, [dict(c) for c in candidates])  # warm-up
+        batches = [[dict(c) for c in candidates] for _ in range(args.repeat)]
+        start = time.perf_counter()
+        for batch in batches:
+            reranker.rank(query, batch)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / args.repeat
+        print(f"{label:>10}: {elapsed_ms:8.3f} ms per {args.candidates} candidates")
+
+
+if __name__ == "__main__":
+    main()
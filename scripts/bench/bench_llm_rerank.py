@@ -0,0 +1,66 @@
+"""
+Benchmark pointwise vs listwise LLM reranking against a stub llama model.
+
+The stub charges a fixed per-call overhead plus a per-token cost for prompt
+evaluation and generation, which is roughly how llama.cpp behaves on CPU.
+No GGUF file is needed.
+
+Usage: python scripts/bench/bench_llm_rerank.py [--call-ms 40] [--token-us 150]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from nexus.rerank.llm_reranker import LlmReranker
+
+
+class StubLlama:
+    def __init__(self, call_ms: float, token_us: float):
+        self.call_s = call_ms / 1000.0
+        self.token_s = token_us / 1_000_000.0
+        self.calls = 0
+
+    def __call__(self, prompt, max_tokens=16, **kwargs):
+        self.calls += 1
+        passages = re.findall(r"^\[(\d+)\]", prompt, re.MULTILINE)
+        if passages:
+            text = "\n".join(f"{p}: 0.{(int(p) * 7) % 10}" for p in passages)
+        else:
+            text = "0.5"
+        # ~4 chars per token for prompt evaluation, plus generated tokens
+        tokens = len(prompt) / 4 + len(text) / 4
+        time.sleep(self.call_s + tokens * self.token_s)
+        return {"choices": [{"text": text}]}
+
+
+def make_candidates(k: int):
+    return [
+        {"brick_id": str(i), "brick_text": f"passage {i} " + "lorem ipsum dolor " * 30, "base_confidence": 0.5}
+        for i in range(k)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--call-ms", type=float, default=40.0, help="Fixed cost per llama call")
+    parser.add_argument("--token-us", type=float, default=150.0, help="Cost per prompt/output token")
+    parser.add_argument("--ks", default="5,10,20,40")
+    args = parser.parse_args()
+
+    print(f"{'k':>4} {'mode':>10} {'calls':>6} {'ms':>9}")
+    for k in [int(x) for x in args.ks.split(",")]:
+        for mode in ("pointwise", "listwise"):
+            stub = StubLlama(args.call_ms, args.token_us)
+            reranker = LlmReranker(llm=stub, mode=mode)
+            start = time.perf_counter()
+            reranker.rank("what is nexus recall", make_candidates(k))
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"{k:>4} {mode:>10} {stub.calls:>6} {elapsed_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
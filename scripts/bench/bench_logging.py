@@ -0,0 +1,79 @@
+"""
+Per-call cost on the calling thread of the structured logging layer
+(nexus.observability.logs), against the print() calls it replaced:
+a debug record below the level, an enabled record queued for the JSON
+writer thread, and print() to a file and to a pipe, with several threads.
+
+Usage: python scripts/bench/bench_logging.py [--records 100000] [--threads 4]
+"""
+import argparse
+import contextlib
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from nexus.observability import logs
+
+log = logging.getLogger("nexus.bench")
+
+
+def per_call_ns(fn, records: int, threads: int) -> float:
+    def worker():
+        with logs.request_context():
+            for i in range(records):
+                fn(i)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return (time.perf_counter() - start) / (records * threads) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "nexus.jsonl")
+        cases = []
+
+        logs.configure(level="INFO", path=path)
+        cases.append(("debug, disabled", per_call_ns(
+            lambda i: log.debug("reloading raw source", extra={"bricks": i}), args.records, args.threads)))
+        cases.append(("info, JSON queued", per_call_ns(
+            lambda i: log.info("reloading raw source", extra={"bricks": i}), args.records, args.threads)))
+        logs.shutdown()
+        logs.configure(level="INFO", path=path, sample_rate=0.01)
+        cases.append(("info, 1% sampled", per_call_ns(
+            lambda i: log.info("reloading raw source", extra={"bricks": i}), args.records, args.threads)))
+        logs.shutdown()
+
+        with open(os.path.join(tmp, "print.txt"), "w") as f, contextlib.redirect_stdout(f):
+            cases.append(("print to file", per_call_ns(
+                lambda i: print(f"Reloading raw source for {i} bricks"), args.records, args.threads)))
+        # A terminal or log collector reading stdout: line-buffered writes to a pipe
+        reader = subprocess.Popen([sys.executable, "-c", "import sys\nfor _ in sys.stdin: pass"],
+                                  stdin=subprocess.PIPE, text=True, bufsize=1)
+        with contextlib.redirect_stdout(reader.stdin):
+            cases.append(("print to pipe", per_call_ns(
+                lambda i: print(f"Reloading raw source for {i} bricks"), args.records, args.threads)))
+        reader.stdin.close()
+        reader.wait()
+
+    for name, ns in cases:
+        print(f"{name:20s} {ns:8.0f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Cost of the metrics instrumentation on recall_bricks: the same recall
+workload (synthetic FAISS index + brick files, heuristic reranking) timed
+with the registry enabled and disabled, in alternating rounds. Also
+reports the raw cost of one counter increment / histogram observation.
+
+Usage: python scripts/bench/bench_metrics_overhead.py [--bricks 20000] [--queries 300] [--rounds 5]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from nexus.ask import recall
+from nexus.bricks.brick_store import BrickStore
+from nexus.observability import metrics
+
+
+def build_corpus(root: str, n_bricks: int, per_file: int = 50):
+    rng = random.Random(7)
+    words = "nexus brick recall wall cortex graph rerank memory source span token index".split()
+    ids = []
+    for f_i in range(0, n_bricks, per_file):
+        bricks = []
+        for i in range(f_i, min(n_bricks, f_i + per_file)):
+            brick_id = f"brick{i:08d}"
+            ids.append(brick_id)
+            bricks.append({"brick_id": brick_id, "content": " ".join(rng.choice(words) for _ in range(60)),
+                           "source_file": "tree.json", "source_span": {"message_id": "m", "block_index": 0},
+                           "hash": f"h{i}"})
+        with open(os.path.join(root, f"bricks_{f_i}.json"), "w", encoding="utf-8") as f:
+            json.dump(bricks, f)
+    return ids
+
+
+def per_op_ns(fn, n: int = 200_000) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bricks", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    registry = metrics.Registry()
+    c = registry.counter("bench_total", "")
+    h = registry.histogram("bench_seconds", "", ("stage",)).labels("x")
+    print(f"counter.inc {per_op_ns(c.inc):6.0f} ns, histogram.observe {per_op_ns(lambda: h.observe(0.003)):6.0f} ns")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ids = build_corpus(tmp, args.bricks)
+        index = recall._local_index
+        index.index = faiss.IndexFlatL2(index.dimension)
+        index.index.add(np.random.default_rng(1).random((len(ids), index.dimension), dtype=np.float32))
+        index.brick_ids = ids
+        recall._brick_store = BrickStore(tmp)
+        # Heuristic stage only: model stages would dominate and add noise
+        recall._reranker.primary = recall._reranker.secondary = None
+
+        queries = [f"recall query {i} nexus brick" for i in range(args.queries)]
+        timings = {True: [], False: []}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for q in queries[:20]:
+                recall.recall_bricks(q)
+            for _ in range(args.rounds):
+                for enabled in (True, False):
+                    metrics.REGISTRY.enabled = enabled
+                    start = time.perf_counter()
+                    for q in queries:
+                        recall.recall_bricks(q)
+                    timings[enabled].append((time.perf_counter() - start) / len(queries) * 1000.0)
+        metrics.REGISTRY.enabled = True
+
+    on, off = sorted(timings[True])[args.rounds // 2], sorted(timings[False])[args.rounds // 2]
+    print(f"recall_bricks over {args.bricks} bricks: metrics on {on:.3f} ms, off {off:.3f} ms, "
+          f"overhead {(on - off) / off * 100:+.2f}% (median of {args.rounds} rounds)")
+
+
+if __name__ == "__main__":
+    main()
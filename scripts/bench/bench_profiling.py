@@ -0,0 +1,77 @@
+"""
+Cost of the profiling hooks (nexus.observability.profiling): a call through
+@profiled with no profiler running, against the bare function, and a
+pure-Python CPU workload timed with no profiler, under the sampling
+profiler at a few intervals, under cProfile, and with tracemalloc.
+
+Usage: python scripts/bench/bench_profiling.py [--calls 1000000] [--work-ms 300]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from nexus.observability import profiling
+from nexus.observability.profiling import Profiler
+
+
+def noop():
+    return None
+
+
+profiled_noop = profiling.profiled("bench")(noop)
+
+
+def work(n: int) -> int:
+    # Dict and string churn, the shape of brick hydration and term scoring
+    total = 0
+    for i in range(n):
+        d = {"brick_id": f"b{i}", "text": "alpha beta gamma " * 4}
+        total += len(d["text"].split())
+    return total
+
+
+def best_of(fn, rounds: int = 3) -> float:
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--work-ms", type=float, default=300)
+    args = parser.parse_args()
+
+    bare = best_of(lambda: [noop() for _ in range(args.calls)]) / args.calls * 1e9
+    wrapped = best_of(lambda: [profiled_noop() for _ in range(args.calls)]) / args.calls * 1e9
+    print(f"{'bare call':28s} {bare:8.0f} ns")
+    print(f"{'@profiled, disabled':28s} {wrapped:8.0f} ns (+{wrapped - bare:.0f} ns)")
+
+    # Size the workload to about --work-ms unprofiled
+    n = 10_000
+    while best_of(lambda: work(n), 1) * 1000 < args.work_ms:
+        n *= 2
+    baseline = best_of(lambda: work(n))
+    print(f"{'workload, no profiler':28s} {baseline * 1000:8.1f} ms")
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = [("sample, 10ms", dict(mode="sample", interval_ms=10)),
+                 ("sample, 5ms", dict(mode="sample", interval_ms=5)),
+                 ("sample, 1ms", dict(mode="sample", interval_ms=1)),
+                 ("cprofile", dict(mode="cprofile")),
+                 ("tracemalloc", dict(mode=None, memory=True))]
+        for name, kwargs in cases:
+            with Profiler("bench", out_dir=tmp, **kwargs):
+                # tracemalloc is slow enough that one round will do
+                seconds = best_of(lambda: work(n), 1 if kwargs.get("memory") else 3)
+            print(f"{'workload, ' + name:28s} {seconds * 1000:8.1f} ms ({(seconds / baseline - 1) * 100:+.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
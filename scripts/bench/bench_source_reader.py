@@ -0,0 +1,76 @@
+"""
+Per-request latency of resolving a brick span, uncached (open + json.load +
+linear scan + split, the old brick-meta/brick-full path) vs SourceReader,
+across conversation lengths.
+
+Usage: python scripts/bench/bench_source_reader.py [--messages 10,100,1000] [--lookups 200]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from nexus.bricks.source_reader import SourceReader, split_blocks
+
+
+def write_tree(path: str, n_messages: int):
+    rng = random.Random(n_messages)
+    words = "nexus brick recall wall cortex graph rerank memory source span".split()
+    messages = []
+    for i in range(n_messages):
+        paragraphs = ["".join(" " + rng.choice(words) for _ in range(40)) for _ in range(4)]
+        messages.append({"message_id": f"m{i}", "role": "user", "content": "\n\n".join(paragraphs)})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"messages": messages}, f)
+
+
+def uncached_lookup(path: str, message_id: str, block_index: int):
+    with open(path, "r", encoding="utf-8") as f:
+        tree = json.load(f)
+    for msg in tree.get("messages", []):
+        if (msg.get("message_id") or msg.get("id")) == message_id:
+            blocks = split_blocks(msg.get("content", ""))
+            return blocks[block_index] if block_index < len(blocks) else None
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", default="10,100,1000")
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        print(f"{'messages':>8} {'uncached us':>12} {'cached us':>10}")
+        for n in [int(m) for m in args.messages.split(",")]:
+            path = os.path.join(tmp, f"tree_{n}.json")
+            write_tree(path, n)
+            rng = random.Random(0)
+            spans = [(f"m{rng.randrange(n)}", rng.randrange(4)) for _ in range(args.lookups)]
+
+            start = time.perf_counter()
+            for message_id, idx in spans:
+                uncached_lookup(path, message_id, idx)
+            uncached = (time.perf_counter() - start) / len(spans) * 1e6
+
+            reader = SourceReader()
+            reader.get_tree(path)  # first request pays the parse
+            start = time.perf_counter()
+            for message_id, idx in spans:
+                reader.get_block(path, message_id, idx)
+            cached = (time.perf_counter() - start) / len(spans) * 1e6
+
+            print(f"{n:>8} {uncached:>12.1f} {cached:>10.1f}")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Time-to-first-token and total latency of POST /cortex/generate vs the SSE
+POST /cortex/generate-stream on the async server, against StubModelServer
+emitting one token every --token-delay-ms.
+
+Usage: python scripts/bench/bench_stream_ttft.py [--tokens 100] [--token-delay-ms 20] [--clients 50]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "services"))
+
+import aiohttp
+from aiohttp import web
+
+from cortex.api import CortexAPI
+from cortex.async_server import create_app
+from cortex.model_client import AsyncModelClient, StubModelServer
+
+
+async def one(session: aiohttp.ClientSession, url: str, stream: bool):
+    start = time.perf_counter()
+    first = None
+    async with session.post(url, json={"query": "benchmark question", "brick_ids": []}) as resp:
+        if stream:
+            async for line in resp.content:
+                if first is None and line.startswith(b"event: token"):
+                    first = time.perf_counter() - start
+        else:
+            await resp.read()
+    total = time.perf_counter() - start
+    return (first if first is not None else total), total
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[int(p * (len(values) - 1))] * 1000.0
+
+
+async def main_async(args):
+    stub = StubModelServer(token_delay_ms=args.token_delay_ms, tokens=args.tokens)
+    model_url = await stub.start()
+    audit_dir = tempfile.TemporaryDirectory()
+    runner = web.AppRunner(create_app(
+        model_client=AsyncModelClient(model_url, max_connections=args.clients),
+        cortex_api=CortexAPI(audit_log_path=os.path.join(audit_dir.name, "audit.jsonl")),
+    ))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=args.clients)) as session:
+        for name, path, stream in (("generate", "/cortex/generate", False),
+                                   ("generate-stream", "/cortex/generate-stream", True)):
+            results = await asyncio.gather(*(one(session, base + path, stream) for _ in range(args.clients)))
+            ttft = [r[0] for r in results]
+            total = [r[1] for r in results]
+            print(f"{name:16s} TTFT p50 {pct(ttft, 0.5):7.1f} ms  p99 {pct(ttft, 0.99):7.1f} ms   "
+                  f"total p50 {pct(total, 0.5):7.1f} ms")
+
+    await runner.cleanup()
+    await stub.stop()
+    audit_dir.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=100)
+    parser.add_argument("--token-delay-ms", type=float, default=20.0)
+    parser.add_argument("--clients", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
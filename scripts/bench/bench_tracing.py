@@ -0,0 +1,63 @@
+"""
+Cost of request tracing (nexus.observability.tracing) per request: a trace
+shaped like ask-preview (http -> recall_bricks -> embed / search / hydrate
+-> brick_store.read_files, rerank -> heuristic / cross_encoder) opened and
+closed at several sample rates, against the same code with no spans.
+
+Usage: python scripts/bench/bench_tracing.py [--requests 20000] [--trace-file]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from nexus.observability.tracing import Tracer
+
+
+def request(tracer: Tracer):
+    with tracer.span("http", method="GET", path="/jarvis/ask-preview") as root:
+        with tracer.span("recall_bricks", k=10) as recall:
+            with tracer.span("recall.embed"):
+                pass
+            with tracer.span("recall.search", k=40):
+                pass
+            with tracer.span("recall.hydrate", bricks=40):
+                with tracer.span("brick_store.read_files", files=8) as read:
+                    read.set(bricks=40)
+            with tracer.span("rerank", candidates=40, budget_ms=150):
+                with tracer.span("rerank.heuristic", n=40):
+                    pass
+                with tracer.span("rerank.cross_encoder", n=20) as stage:
+                    stage.set(status="ok")
+            recall.set(candidates=40, reranker_used="cross_encoder")
+        root.set(status=200)
+
+
+def per_request_us(fn, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        fn()
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--trace-file", action="store_true", help="also append sampled traces to a file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.json") if args.trace_file else None
+        baseline = per_request_us(lambda: None, args.requests)
+        print(f"{'no spans':14s} {baseline:8.2f} us/request")
+        for rate in (0.0, 0.01, 0.1, 1.0):
+            tracer = Tracer(sample_rate=rate, path=path, buffer=100)
+            us = per_request_us(lambda: request(tracer), args.requests)
+            print(f"{f'sampled {rate:g}':14s} {us:8.2f} us/request ({us / 11:.2f} us/span)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Load test for Cortex /jarvis/ask-preview: requests/sec and latency
+percentiles under N concurrent keep-alive clients.
+
+Start the server first (python services/cortex serve), then:
+
+Usage: python scripts/bench/load_ask_preview.py [--url http://127.0.0.1:5001]
+       [--concurrency 16] [--duration 30] [--queries queries.txt]
+"""
+import argparse
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit, quote
+
+DEFAULT_QUERIES = [
+    "how does recall reranking work",
+    "nexus sync pipeline",
+    "cortex audit trace",
+    "wall builder token budget",
+    "graph anchors override",
+    "brick source span",
+]
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(p / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def client(url, queries, stop_at, latencies, errors, lock, offset):
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    local_lat = []
+    local_err = 0
+    i = offset
+    while time.perf_counter() < stop_at:
+        path = f"/jarvis/ask-preview?query={quote(queries[i % len(queries)])}"
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                local_err += 1
+                continue
+        except (OSError, http.client.HTTPException):
+            local_err += 1
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+            continue
+        local_lat.append(time.perf_counter() - start)
+    conn.close()
+    with lock:
+        latencies.extend(local_lat)
+        errors[0] += local_err
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:5001")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of untimed warm-up")
+    parser.add_argument("--queries", help="File with one query per line")
+    args = parser.parse_args()
+
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    lock = threading.Lock()
+    if args.warmup > 0:
+        client(args.url, queries, time.perf_counter() + args.warmup, [], [0], lock, 0)
+
+    latencies = []
+    errors = [0]
+    stop_at = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=client, args=(args.url, queries, stop_at, latencies, errors, lock, n))
+        for n in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    ms = lambda s: s * 1000.0
+    print(f"concurrency {args.concurrency}, {elapsed:.1f}s, {len(latencies)} ok, {errors[0]} errors")
+    print(f"requests/sec {len(latencies) / elapsed:.1f}")
+    print(f"latency ms   p50 {ms(percentile(latencies, 50)):.1f}  p95 {ms(percentile(latencies, 95)):.1f}  "
+          f"p99 {ms(percentile(latencies, 99)):.1f}  max {ms(latencies[-1] if latencies else 0):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Cortex command line.
+
+Usage:
+    python services/cortex serve [--bind HOST:PORT] [--workers N] [--threads N]
+    python services/cortex serve-async [--bind HOST:PORT] [--executor-workers N]
+    python services/cortex reload
+"""
+import argparse
+import os
+import sys
+
+# services/ on the path: the modules import each other as cortex.*
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cortex.serve import gunicorn_options, serve, reload
+from nexus.config import CORTEX_BIND, CORTEX_WORKERS, CORTEX_THREADS, CORTEX_PIDFILE, CORTEX_EXECUTOR_WORKERS
+
+
+def cmd_serve(args):
+    options = gunicorn_options(
+        bind=args.bind, workers=args.workers, threads=args.threads, pidfile=args.pidfile,
+        timeout=args.timeout, graceful_timeout=args.graceful_timeout, access_log=args.access_log
+    )
+    try:
+        serve(options)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+def cmd_serve_async(args):
+    try:
+        from cortex.async_server import serve_async
+    except ImportError as e:
+        print(f"Error: the async server needs aiohttp ({e})")
+        sys.exit(1)
+    host, _, port = args.bind.rpartition(":")
+    serve_async(host or "127.0.0.1", int(port), executor_workers=args.executor_workers)
+
+
+def cmd_reload(args):
+    try:
+        new_pid = reload(args.pidfile)
+    except (RuntimeError, OSError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Cortex reloaded (master pid {new_pid})")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="cortex", description="Cortex API server")
+    subparsers = parser.add_subparsers(dest="command")
+
+    parser_serve = subparsers.add_parser("serve", help="Run the API under the production server (gunicorn)")
+    parser_serve.add_argument("--bind", default=CORTEX_BIND, help=f"Address to bind (default {CORTEX_BIND})")
+    parser_serve.add_argument("--workers", type=int, default=CORTEX_WORKERS, help="Worker processes")
+    parser_serve.add_argument("--threads", type=int, default=CORTEX_THREADS, help="Threads per worker")
+    parser_serve.add_argument("--pidfile", default=CORTEX_PIDFILE, help="Master pidfile (used by reload)")
+    parser_serve.add_argument("--timeout", type=int, default=60, help="Kill workers silent for this many seconds")
+    parser_serve.add_argument("--graceful-timeout", type=int, default=30, help="Drain time on reload/shutdown")
+    parser_serve.add_argument("--access-log", action="store_true", help="Write access log to stdout")
+    parser_serve.set_defaults(func=cmd_serve)
+
+    parser_async = subparsers.add_parser("serve-async", help="Run the async (aiohttp) API in one process")
+    parser_async.add_argument("--bind", default=CORTEX_BIND, help=f"Address to bind (default {CORTEX_BIND})")
+    parser_async.add_argument("--executor-workers", type=int, default=CORTEX_EXECUTOR_WORKERS,
+                              help="Threads for recall/rerank/reload work")
+    parser_async.set_defaults(func=cmd_serve_async)
+
+    parser_reload = subparsers.add_parser("reload", help="Zero-downtime reload of a running server")
+    parser_reload.add_argument("--pidfile", default=CORTEX_PIDFILE, help="Master pidfile")
+    parser_reload.set_defaults(func=cmd_reload)
+
+    args = parser.parse_args()
+    if hasattr(args, "func"):
+        args.func(args)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Admission control for the Cortex servers.
+
+Recall and generate requests pass two checks before any work starts:
+
+1. ClientRateLimiter: a token bucket per client. An empty bucket means
+   429, with Retry-After set to when the next token arrives.
+2. A concurrency limiter per route class. It admits up to `limit` requests
+   at once and queues at most `max_queue` more, in arrival order.
+   - A full queue means an immediate 503.
+   - A wait longer than `queue_timeout_s` also means a 503.
+   - Retry-After estimates how long the current backlog takes to drain.
+
+ConcurrencyLimiter blocks threads (server.py under gthread workers);
+AsyncConcurrencyLimiter parks coroutines (async_server.py). Both keep
+counters for GET /cortex/admission and /metrics. State is per process, so
+with gunicorn every worker applies the limits on its own.
+"""
+import abc
+import asyncio
+import contextlib
+import math
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+try:
+    from nexus.config import (
+        CORTEX_ADMISSION_QUEUE, CORTEX_ADMISSION_TIMEOUT_S, CORTEX_RATE_LIMIT_RPS, CORTEX_RATE_LIMIT_BURST,
+        CORTEX_TRUST_CLIENT_ID
+    )
+    from nexus.observability import metrics
+except ImportError:
+    # Fallback for development if not installed
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    sys.path.append(os.path.join(repo_root, "src"))
+    from nexus.config import (
+        CORTEX_ADMISSION_QUEUE, CORTEX_ADMISSION_TIMEOUT_S, CORTEX_RATE_LIMIT_RPS, CORTEX_RATE_LIMIT_BURST,
+        CORTEX_TRUST_CLIENT_ID
+    )
+    from nexus.observability import metrics
+
+# Header naming the client for rate limiting, set at a trusted gateway. It is
+# only honoured with NEXUS_CORTEX_TRUST_CLIENT_ID=1; otherwise, and for
+# requests without it, clients are limited by peer address.
+CLIENT_ID_HEADER = "X-Client-Id"
+
+
+class Rejected(Exception):
+    """A request turned away before doing any work."""
+    def __init__(self, status: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def response(self) -> Tuple[Dict, int, Dict[str, str]]:
+        """(payload, status, headers); Retry-After is whole seconds, at least 1."""
+        seconds = max(1, math.ceil(self.retry_after))
+        return ({"error": self.reason, "status": "rejected", "retry_after": seconds},
+                self.status, {"Retry-After": str(seconds)})
+
+
+def client_id(headers, remote: Optional[str]) -> str:
+    if CORTEX_TRUST_CLIENT_ID and headers.get(CLIENT_ID_HEADER):
+        return headers[CLIENT_ID_HEADER]
+    return remote or "unknown"
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`. Not thread-safe."""
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = now
+
+    def take(self, now: float) -> float:
+        """Takes a token. Returns 0.0, or the seconds until one is available (nothing taken)."""
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class ClientRateLimiter:
+    """
+    Token bucket per client id. The `max_clients` most recently seen are
+    kept; an evicted client starts over with a full bucket. rate <= 0
+    disables limiting.
+    """
+    def __init__(self, rate: float = CORTEX_RATE_LIMIT_RPS, burst: float = CORTEX_RATE_LIMIT_BURST,
+                 max_clients: int = 10_000, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_clients = max_clients
+        self.clock = clock
+        self.limited = 0
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client: str):
+        """Raises Rejected (429) when the client is over its rate."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = self.clock()
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = TokenBucket(self.rate, self.burst, now)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+            wait = bucket.take(now)
+            if wait:
+                self.limited += 1
+        if wait:
+            raise Rejected(429, "Rate limit exceeded", wait)
+
+    def stats(self) -> Dict:
+        return {"rate": self.rate, "burst": self.burst, "clients": len(self._buckets), "limited": self.limited}
+
+
+class _Limiter(abc.ABC):
+    """Counters and backlog estimate shared by both limiters."""
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout_s: float):
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout_s = queue_timeout_s
+        self.in_flight = 0
+        self.peak_queued = 0
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        # Moving average of time holding a slot, for Retry-After
+        self.service_s = 0.0
+
+    @abc.abstractmethod
+    def _queued(self) -> int:
+        """Requests waiting for a slot."""
+
+    def _done(self, held_s: float):
+        self.service_s = held_s if not self.service_s else 0.8 * self.service_s + 0.2 * held_s
+
+    def _backlog_s(self) -> float:
+        return self.service_s * (self._queued() / self.limit + 1)
+
+    def _shed(self, timed_out: bool) -> Rejected:
+        if timed_out:
+            self.shed_timeout += 1
+            reason = f"Server busy: timed out waiting for a {self.name} slot"
+        else:
+            self.shed_queue_full += 1
+            reason = f"Server busy: {self.name} queue is full"
+        return Rejected(503, reason, self._backlog_s())
+
+    def stats(self) -> Dict:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self._queued(),
+            "peak_queued": self.peak_queued,
+            "admitted": self.admitted,
+            "shed_queue_full": self.shed_queue_full,
+            "shed_timeout": self.shed_timeout,
+            "avg_service_ms": round(self.service_s * 1000.0, 2),
+        }
+
+
+class ConcurrencyLimiter(_Limiter):
+    """Bounded concurrency with a bounded FIFO wait queue, for threads."""
+    def __init__(self, name: str, limit: int, max_queue: int = CORTEX_ADMISSION_QUEUE,
+                 queue_timeout_s: float = CORTEX_ADMISSION_TIMEOUT_S):
+        super().__init__(name, limit, max_queue, queue_timeout_s)
+        self._lock = threading.Lock()
+        self._waiters: Deque[threading.Event] = deque()
+
+    def _queued(self) -> int:
+        return len(self._waiters)
+
+    def acquire(self):
+        """Takes a slot, waiting in line if needed. Raises Rejected (503)."""
+        with self._lock:
+            if self.in_flight < self.limit and not self._waiters:
+                self.in_flight += 1
+                self.admitted += 1
+                return
+            if len(self._waiters) >= self.max_queue:
+                raise self._shed(timed_out=False)
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+            self.peak_queued = max(self.peak_queued, len(self._waiters))
+
+        granted = waiter.wait(self.queue_timeout_s)
+        with self._lock:
+            if not granted and not waiter.is_set():
+                self._waiters.remove(waiter)
+                raise self._shed(timed_out=True)
+            # release() handed its slot over (in_flight already counts us)
+            self.admitted += 1
+
+    def release(self, held_s: Optional[float] = None):
+        with self._lock:
+            if held_s is not None:
+                self._done(held_s)
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self.in_flight -= 1
+
+    @contextlib.contextmanager
+    def slot(self):
+        self.acquire()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+
+
+class AsyncConcurrencyLimiter(_Limiter):
+    """ConcurrencyLimiter for coroutines on one event loop (not thread-safe)."""
+    def __init__(self, name: str, limit: int, max_queue: int = CORTEX_ADMISSION_QUEUE,
+                 queue_timeout_s: float = CORTEX_ADMISSION_TIMEOUT_S):
+        super().__init__(name, limit, max_queue, queue_timeout_s)
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def _queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self):
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._shed(timed_out=False)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.peak_queued = max(self.peak_queued, len(self._waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout_s)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done():
+                # Handed a slot just as we gave up: pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._shed(timed_out=True) from None
+            raise
+        self.admitted += 1
+
+    def release(self, held_s: Optional[float] = None):
+        if held_s is not None:
+            self._done(held_s)
+        if self._waiters:
+            self._waiters.popleft().set_result(None)
+        else:
+            self.in_flight -= 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+
+
+def stats(rate_limiter: ClientRateLimiter, *limiters: _Limiter) -> Dict:
+    """Payload of GET /cortex/admission."""
+    return {"rate_limit": rate_limiter.stats(), "limiters": {l.name: l.stats() for l in limiters}}
+
+
+_IN_FLIGHT = metrics.gauge("cortex_admission_in_flight", "Requests holding a slot", ("limiter",))
+_QUEUED = metrics.gauge("cortex_admission_queued", "Requests waiting for a slot", ("limiter",))
+_ADMITTED = metrics.counter("cortex_admission_admitted_total", "Requests admitted", ("limiter",))
+_SHED = metrics.counter("cortex_admission_shed_total", "Requests shed with 503", ("limiter", "reason"))
+_RATE_LIMITED = metrics.counter("cortex_rate_limited_total", "Requests rejected with 429")
+
+
+def register_metrics(rate_limiter: ClientRateLimiter, *limiters: _Limiter):
+    """Exposes the limiters' counters at /metrics (read at scrape time)."""
+    _RATE_LIMITED.set_function(lambda: rate_limiter.limited)
+    for limiter in limiters:
+        name = limiter.name
+        _IN_FLIGHT.labels(name).set_function(lambda l=limiter: l.in_flight)
+        _QUEUED.labels(name).set_function(limiter._queued)
+        _ADMITTED.labels(name).set_function(lambda l=limiter: l.admitted)
+        _SHED.labels(name, "queue_full").set_function(lambda l=limiter: l.shed_queue_full)
+        _SHED.labels(name, "timeout").set_function(lambda l=limiter: l.shed_timeout)
@@ -1,55 +1,101 @@
-import json
+import logging
 import os
+import sys
 from datetime import datetime, timezone
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
+
+from cortex.audit import AuditWriter
+from cortex.router import IntentRouter
+from cortex.simulated import SimulatedModel
+from nexus.config import CORTEX_CONTEXT_TOKEN_BUDGET
+from nexus.observability import tracing
+
+log = logging.getLogger("cortex.api")
+
+# Answer to a generate request whose source reload failed
+MODE1_BLOCKED = {"error": "MODE-1 Violation: Source reload failed.", "status": "blocked"}
+TOKEN_COST = 0.002 # Mock
 
 class CortexAPI:
-    def __init__(self, audit_log_path: str = "phase3_audit_trace.jsonl"):
+    def __init__(self, audit_log_path: str = "phase3_audit_trace.jsonl", audit: Optional[AuditWriter] = None):
         self.audit_log_path = audit_log_path
+        # Buffered, group-committed writer; durability per NEXUS_CORTEX_AUDIT_DURABILITY (audit.py)
+        self.audit = audit or AuditWriter(audit_log_path)
+        # Stand-in model for generate_stream (token pacing per NEXUS_CORTEX_SIMULATED_TOKEN_DELAY_MS)
+        self.model = SimulatedModel()
+        # Compiled routing table, hot-reloaded from NEXUS_CORTEX_ROUTING_RULES (router.py)
+        self.router = IntentRouter()
 
     def route(self, user_query: str) -> Dict:
         """Endpoint: /route - Intent-based routing (LOCKED Rules)"""
-        query_lower = user_query.lower()
-        
-        # Deterministic Routing Table
-        if any(word in query_lower for word in ["trade", "market", "stock", "price"]):
-            return {"agent_id": "Jarvis", "model": "Claude"}
-        
-        if any(word in query_lower for word in ["architect", "code", "implement", "design"]):
-            return {"agent_id": "Architect", "model": "Gemini"}
-            
-        if any(word in query_lower for word in ["research", "find", "who", "when"]):
-            return {"agent_id": "ResearchPro", "model": "Gemini"}
-            
-        if any(word in query_lower for word in ["video", "creative", "story", "write"]):
-            return {"agent_id": "VideoFactory", "model": "GPT"}
-            
-        # Default fallback
-        return {"agent_id": "General", "model": "GPT"}
+        return self.router.route(user_query)
 
     def generate(self, user_id: str, agent_id: str, user_query: str, brick_ids: List[str]) -> Dict:
         """Endpoint: /generate - Secure generation with memory injection"""
-        print(f"[{datetime.now(timezone.utc).isoformat()}] Cortex: Generating response for {agent_id}...")
-        
-        # 1. Inject memory (Reload raw source)
-        context_text = self._reload_source_text(brick_ids)
-        if not context_text and brick_ids:
-            return {"error": "MODE-1 Violation: Source reload failed.", "status": "blocked"}
-        
-        # 2. LLM Call (Mock for skeleton)
-        model = "gpt-4o" # Example
-        response_text = f"Simulated response for: {user_query[:20]}..."
-        token_cost = 0.002 # Mock
-        
-        # 3. Emit audit record
-        self._audit_trace(user_id, agent_id, brick_ids, model, token_cost)
-        
+        log.info("generating response", extra={"agent_id": agent_id, "bricks": len(brick_ids)})
+
+        with tracing.span("cortex.generate", agent_id=agent_id, bricks=len(brick_ids)) as span:
+            # 1. Inject memory (Reload raw source)
+            if self.prepare_prompt(user_query, brick_ids) is None:
+                span.set(status="blocked")
+                return dict(MODE1_BLOCKED)
+
+            # 2. LLM Call (Mock for skeleton)
+            model = "gpt-4o" # Example
+            response_text = f"Simulated response for: {user_query[:20]}..."
+
+            # 3. Emit audit record
+            self.record_generation(user_id, agent_id, brick_ids, model)
+            span.set(status="success", model=model)
+
         return {
             "response": response_text,
             "model": model,
             "status": "success"
         }
 
+    def generate_stream(self, user_id: str, agent_id: str, user_query: str, brick_ids: List[str]) -> Iterator[Dict]:
+        """
+        Streaming /generate. Yields {"event": "token", "text": ...} as the
+        model produces them, then {"event": "done", "model", "status"}; or a
+        single {"event": "error", ..., "status": "blocked"} if reload fails.
+        The audit record is written when the stream ends, including when the
+        consumer stops early, since the model was already called.
+        """
+        log.info("streaming response", extra={"agent_id": agent_id, "bricks": len(brick_ids)})
+
+        # 1. Inject memory (Reload raw source)
+        if self.prepare_prompt(user_query, brick_ids) is None:
+            yield {"event": "error", **MODE1_BLOCKED}
+            return
+
+        # 2. LLM Call (Mock for skeleton), token by token
+        model = "gpt-4o" # Example
+        try:
+            for token in self.model.stream(f"Simulated response for: {user_query[:20]}..."):
+                yield {"event": "token", "text": token}
+            yield {"event": "done", "model": model, "status": "success"}
+        finally:
+            # 3. Emit audit record
+            self.record_generation(user_id, agent_id, brick_ids, model)
+
+    def prepare_prompt(self, user_query: str, brick_ids: List[str]) -> Optional[str]:
+        """
+        MODE-1 step shared by every generate path (here and async_server.py):
+        the query with the reloaded source in front, or None if any brick
+        failed to reload and the request must be blocked.
+        """
+        context_text = self._reload_source_text(brick_ids)
+        if context_text is None:
+            return None
+        return f"{context_text}\n\n{user_query}" if context_text else user_query
+
+    def record_generation(self, user_id: str, agent_id: str, brick_ids: List[str], model: str,
+                          token_cost: float = TOKEN_COST):
+        """Audit step shared by every generate path; runs once the model was called."""
+        with tracing.span("cortex.audit"):
+            self._audit_trace(user_id, agent_id, brick_ids, model, token_cost)
+
     def ask_preview(self, query: str) -> Dict:
         # This method is for Jarvis UI read-only preview.
         # It MUST NOT call self.generate() or emit audit rows.
@@ -59,8 +105,12 @@ class CortexAPI:
         # and to emphasize that Cortex is calling out to Nexus for recall, not performing it itself.
         sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "nexus-cli")))
         from nexus.ask.recall import recall_bricks_readonly
+        from nexus.config import ASK_PREVIEW_RERANK_BUDGET_MS
 
-        recalled_bricks = recall_bricks_readonly(query)
+        rerank_timings = {}
+        recalled_bricks = recall_bricks_readonly(
+            query, rerank_budget_ms=ASK_PREVIEW_RERANK_BUDGET_MS, rerank_timings=rerank_timings
+        )
 
         top_bricks_output = [
             {"brick_id": brick["brick_id"], "confidence": round(brick["confidence"], 4)}
@@ -70,22 +120,59 @@ class CortexAPI:
         return {
             "query": query,
             "top_bricks": top_bricks_output,
+            "reranker_used": recalled_bricks[0].get("reranker_used", "none") if recalled_bricks else "none",
+            "rerank_timings": rerank_timings,
             "status": "preview"
         }
 
 
-    def _reload_source_text(self, brick_ids: List[str]) -> str:
-        """MODE-1 enforcement layer: Reload raw source text from bricks"""
-        all_text = []
-        for brick_id in brick_ids:
-            # In a real implementation, we would look up the brick_id 
-            # in a mapping and reload from tree files.
-            # Mocking the lookup and reload logic.
-            print(f"Reloading raw source for brick: {brick_id}")
-            # If reload fails -> BLOCK (return empty/None)
-            all_text.append(f"Content for {brick_id}")
-        
-        return "\n".join(all_text)
+    def _reload_source_text(self, brick_ids: List[str],
+                            token_budget: int = CORTEX_CONTEXT_TOKEN_BUDGET) -> Optional[str]:
+        """
+        MODE-1 enforcement layer: Reload raw source text from bricks.
+        None if any brick cannot be reloaded; blocks that reload empty are
+        not a failure.
+        """
+        if not brick_ids:
+            return ""
+
+        # Read-only Nexus adapter: spans resolved against the source trees,
+        # one cached parse per tree file, checked against the brick hash
+        from nexus.ask.recall import get_recall_brick_blocks
+
+        log.debug("reloading raw source", extra={"bricks": len(brick_ids)})
+        with tracing.span("cortex.reload_source", bricks=len(brick_ids)) as span:
+            blocks = get_recall_brick_blocks(brick_ids)
+
+            # If reload fails for any brick -> BLOCK (return None)
+            if any(brick_id not in blocks for brick_id in brick_ids):
+                span.set(missing=sum(brick_id not in blocks for brick_id in brick_ids))
+                return None
+
+            context_text = self._assemble_context(brick_ids, blocks, token_budget)
+            span.set(chars=len(context_text))
+            return context_text
+
+    @staticmethod
+    def _assemble_context(brick_ids: List[str], blocks: Dict[str, str], token_budget: int) -> str:
+        """
+        Blocks in brick order (duplicates once) up to token_budget tokens,
+        estimated at 4 characters each. Bricks past the budget are left out;
+        the first brick is always included, cut to the budget if needed.
+        """
+        budget_chars = max(0, token_budget) * 4
+        parts = []
+        used = 0
+        for brick_id in dict.fromkeys(brick_ids):
+            text = blocks[brick_id]
+            cost = len(text) + (1 if parts else 0)
+            if used + cost > budget_chars:
+                if not parts:
+                    parts.append(text[:budget_chars])
+                break
+            parts.append(text)
+            used += cost
+        return "\n".join(parts)
 
     def _audit_trace(self, user_id: str, agent_id: str, brick_ids: List[str], model: str, token_cost: float):
         """Mandatory audit logging"""
@@ -97,5 +184,4 @@ class CortexAPI:
             "token_cost": token_cost,
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
-        with open(self.audit_log_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(record) + "\n")
+        self.audit.write(record)
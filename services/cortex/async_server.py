@@ -0,0 +1,266 @@
+"""
+Async Cortex API (aiohttp).
+
+Serves the same endpoints as server.py (/jarvis/*, POST /cortex/generate and
+its Server-Sent Events variant POST /cortex/generate-stream); here generation
+calls the model backend through AsyncModelClient.
+The event loop only does I/O. Recall, reranking and source reloads run on a
+bounded thread pool, and generation awaits AsyncModelClient. Requests that
+find every executor slot busy wait on the loop, which costs a coroutine
+rather than a thread. So hundreds of concurrent ask-preview calls queue and
+are served in turn instead of timing out.
+
+Recall and generate routes also go through admission control (admission.py):
+per-client rate limits and bounded wait queues. Overload is answered with
+429/503 and Retry-After; GET /cortex/admission reports queue depth and
+shed counts. GET /metrics serves the process's metrics registry
+(nexus.observability.metrics) in the Prometheus text format. Sampled
+requests are traced from a root span per request (nexus.observability.tracing),
+and GET /cortex/traces returns the most recent traces.
+
+Usage: python services/cortex serve-async [--bind 127.0.0.1:5001] [--executor-workers 8]
+"""
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from aiohttp import web
+
+from cortex import admission, handlers
+from cortex.api import CortexAPI
+from cortex.model_client import AsyncModelClient, ModelBackendError
+from nexus.observability import logs, profiling, tracing
+from nexus.config import (
+    CORTEX_EXECUTOR_WORKERS, CORTEX_MODEL_NAME, CORTEX_RECALL_CONCURRENCY, CORTEX_GENERATE_CONCURRENCY
+)
+
+
+@web.middleware
+async def request_id_middleware(request: web.Request, handler):
+    """Request ID for every log record of the request; a caller's X-Request-Id is kept."""
+    with logs.request_context(request.headers.get(logs.REQUEST_ID_HEADER)) as request_id:
+        resp = await handler(request)
+        if not resp.prepared:
+            resp.headers[logs.REQUEST_ID_HEADER] = request_id
+        return resp
+
+
+@web.middleware
+async def tracing_middleware(request: web.Request, handler):
+    """Root span of the request's trace; spans in run_blocking threads nest under it."""
+    with tracing.span("http", method=request.method, path=request.path) as span:
+        resp = await handler(request)
+        span.set(status=resp.status)
+        return resp
+
+
+def _admitted(limiter_attr: str):
+    """Rate-limits per client, then holds a slot of self.<limiter_attr> for the handler."""
+    def wrap(handler):
+        @functools.wraps(handler)
+        async def inner(self, request: web.Request):
+            try:
+                self.rate_limiter.check(admission.client_id(request.headers, request.remote))
+                async with getattr(self, limiter_attr).slot():
+                    return await handler(self, request)
+            except admission.Rejected as e:
+                payload, status, headers = e.response()
+                return web.json_response(payload, status=status, headers=headers)
+        return inner
+    return wrap
+
+
+class AsyncCortex:
+    """Route handlers plus the executor and model client they share."""
+    def __init__(self, executor_workers: int = CORTEX_EXECUTOR_WORKERS,
+                 model_client: Optional[AsyncModelClient] = None,
+                 cortex_api: Optional[CortexAPI] = None,
+                 recall: Optional[Callable] = None,
+                 rate_limiter: Optional[admission.ClientRateLimiter] = None,
+                 recall_limiter: Optional[admission.AsyncConcurrencyLimiter] = None,
+                 generate_limiter: Optional[admission.AsyncConcurrencyLimiter] = None):
+        self.executor_workers = max(1, executor_workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.executor_workers, thread_name_prefix="cortex")
+        self.model_client = model_client or AsyncModelClient()
+        self.cortex_api = cortex_api or CortexAPI()
+        self.recall = recall or handlers.recall_bricks_readonly
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.rate_limiter = rate_limiter or admission.ClientRateLimiter()
+        self.recall_limiter = recall_limiter or admission.AsyncConcurrencyLimiter("recall", CORTEX_RECALL_CONCURRENCY)
+        self.generate_limiter = generate_limiter or admission.AsyncConcurrencyLimiter(
+            "generate", CORTEX_GENERATE_CONCURRENCY
+        )
+        admission.register_metrics(self.rate_limiter, self.recall_limiter, self.generate_limiter)
+
+    async def on_startup(self, app: web.Application):
+        # One slot per executor thread: waiting requests queue here, where
+        # a client that disconnects is cancelled before any work starts
+        self._slots = asyncio.Semaphore(self.executor_workers)
+
+    async def on_cleanup(self, app: web.Application):
+        await self.model_client.close()
+        # Drain pending audit rows before the executor goes away
+        await self.run_blocking(self.cortex_api.audit.close)
+        self.executor.shutdown(wait=False)
+
+    async def run_blocking(self, fn: Callable, *args, **kwargs):
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            # Carry the request's context (request ID) into the worker thread
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(self.executor, functools.partial(context.run, fn, *args, **kwargs))
+
+    @staticmethod
+    async def _json_body(request: web.Request):
+        try:
+            return await request.json()
+        except ValueError:
+            return None
+
+    async def _respond(self, fn: Callable, *args, **kwargs) -> web.Response:
+        payload, status = await self.run_blocking(fn, *args, **kwargs)
+        return web.json_response(payload, status=status)
+
+    async def graph_index(self, request: web.Request) -> web.Response:
+        body, status, headers = await self.run_blocking(
+            handlers.graph_index, request.headers.get("If-None-Match"), request.headers.get("Accept-Encoding", "")
+        )
+        return web.Response(body=body or None, status=status, headers=headers)
+
+    async def graph_query(self, request: web.Request) -> web.Response:
+        handler = {
+            "summary": handlers.graph_summary,
+            "nodes": handlers.graph_nodes,
+            "edges": handlers.graph_edges,
+            "search": handlers.graph_search,
+            "neighborhood": handlers.graph_neighborhood,
+        }[request.match_info["view"]]
+        return await self._respond(handler, request.query)
+
+    async def brick_meta(self, request: web.Request) -> web.Response:
+        return await self._respond(handlers.brick_meta, request.query.get("brick_id"))
+
+    async def brick_full(self, request: web.Request) -> web.Response:
+        return await self._respond(handlers.brick_full, request.query.get("brick_id"))
+
+    async def bricks_meta(self, request: web.Request) -> web.Response:
+        return await self._respond(handlers.bricks_meta, await self._json_body(request))
+
+    async def bricks_full(self, request: web.Request) -> web.Response:
+        return await self._respond(handlers.bricks_full, await self._json_body(request))
+
+    @_admitted("recall_limiter")
+    async def ask_preview(self, request: web.Request) -> web.Response:
+        return await self._respond(handlers.ask_preview, request.query.get("query"), recall=self.recall)
+
+    async def _prepare_generation(self, request: web.Request) -> Tuple[Optional[web.Response], Dict]:
+        """Validates a generate body and reloads its context (handlers.prepare_generation)."""
+        job, error = await self.run_blocking(handlers.prepare_generation, self.cortex_api,
+                                             await self._json_body(request))
+        if error:
+            payload, status = error
+            return web.json_response(payload, status=status), {}
+        return None, job
+
+    @_admitted("generate_limiter")
+    async def generate(self, request: web.Request) -> web.Response:
+        """Async counterpart of CortexAPI.generate (same MODE-1 and audit rules)."""
+        error, job = await self._prepare_generation(request)
+        if error is not None:
+            return error
+
+        # 2. LLM call, over the pooled async client
+        try:
+            with tracing.span("cortex.model", model=CORTEX_MODEL_NAME, prompt_chars=len(job["prompt"])):
+                result = await self.model_client.generate(job["prompt"], CORTEX_MODEL_NAME)
+        except ModelBackendError as e:
+            return web.json_response({"error": str(e), "status": "error"}, status=502)
+        model = result.get("model", CORTEX_MODEL_NAME)
+
+        # 3. Emit audit record
+        await self.run_blocking(self.cortex_api.record_generation, job["user_id"], job["agent_id"],
+                                job["brick_ids"], model)
+
+        return web.json_response({
+            "response": result.get("text", ""),
+            "model": model,
+            "status": "success"
+        })
+
+    @_admitted("generate_limiter")
+    async def generate_stream(self, request: web.Request) -> web.StreamResponse:
+        """
+        /cortex/generate as Server-Sent Events: "token" events ({"text"}) as
+        the model emits them, then "done" ({"model", "status"}) or "error".
+        Request errors and MODE-1 blocks are plain JSON responses, sent
+        before the stream starts. The audit record is written when the
+        stream ends, including when the client goes away.
+        """
+        error, job = await self._prepare_generation(request)
+        if error is not None:
+            return error
+
+        resp = web.StreamResponse(headers=handlers.SSE_HEADERS)
+        await resp.prepare(request)
+        final = {}  # the backend's closing chunk: the model that actually answered
+        try:
+            # 2. LLM call, streamed through
+            try:
+                with tracing.span("cortex.model_stream", model=CORTEX_MODEL_NAME) as span:
+                    tokens = 0
+                    async for token in self.model_client.generate_stream(job["prompt"], CORTEX_MODEL_NAME,
+                                                                         final=final):
+                        await resp.write(handlers.sse_event("token", {"text": token}))
+                        tokens += 1
+                    span.set(tokens=tokens)
+                await resp.write(handlers.sse_event("done", {"model": final.get("model", CORTEX_MODEL_NAME),
+                                                             "status": "success"}))
+            except ModelBackendError as e:
+                await resp.write(handlers.sse_event("error", {"error": str(e), "status": "error"}))
+        finally:
+            # 3. Emit audit record
+            await self.run_blocking(self.cortex_api.record_generation, job["user_id"], job["agent_id"],
+                                    job["brick_ids"], final.get("model", CORTEX_MODEL_NAME))
+        await resp.write_eof()
+        return resp
+
+    async def admission_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(admission.stats(self.rate_limiter, self.recall_limiter, self.generate_limiter))
+
+    async def traces(self, request: web.Request) -> web.Response:
+        payload, status = handlers.traces(request.query)
+        return web.json_response(payload, status=status)
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        # Rendering is cheap and touches no blocking I/O: stay on the loop
+        body, status, headers = handlers.metrics_text()
+        return web.Response(body=body, status=status, headers=headers)
+
+
+def create_app(**kwargs) -> web.Application:
+    """Builds the aiohttp app; kwargs go to AsyncCortex (for injection in tests)."""
+    cortex = AsyncCortex(**kwargs)
+    app = web.Application(middlewares=[request_id_middleware, tracing_middleware])
+    app.on_startup.append(cortex.on_startup)
+    app.on_cleanup.append(cortex.on_cleanup)
+    app.router.add_get("/jarvis/graph-index", cortex.graph_index)
+    app.router.add_get("/jarvis/graph/{view:summary|nodes|edges|search|neighborhood}", cortex.graph_query)
+    app.router.add_get("/jarvis/brick-meta", cortex.brick_meta)
+    app.router.add_get("/jarvis/brick-full", cortex.brick_full)
+    app.router.add_post("/jarvis/bricks-meta", cortex.bricks_meta)
+    app.router.add_post("/jarvis/bricks-full", cortex.bricks_full)
+    app.router.add_get("/jarvis/ask-preview", cortex.ask_preview)
+    app.router.add_post("/cortex/generate", cortex.generate)
+    app.router.add_post("/cortex/generate-stream", cortex.generate_stream)
+    app.router.add_get("/cortex/admission", cortex.admission_stats)
+    app.router.add_get("/cortex/traces", cortex.traces)
+    app.router.add_get("/metrics", cortex.metrics)
+    return app
+
+
+def serve_async(host: str, port: int, executor_workers: int = CORTEX_EXECUTOR_WORKERS):
+    logs.configure()
+    profiling.start_from_env("cortex-async")
+    web.run_app(create_app(executor_workers=executor_workers), host=host, port=port)
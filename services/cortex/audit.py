@@ -0,0 +1,276 @@
+"""
+Append-only audit log for CortexAPI.
+
+write() serializes the record on the caller's thread and puts the line on a
+bounded queue. A background thread drains everything pending and appends it
+with one write() call (group commit), so concurrent requests share the
+syscall and, in fsync mode, the fsync.
+
+Durability (NEXUS_CORTEX_AUDIT_DURABILITY):
+    async   write() returns once the line is queued, so the caller never
+            waits on disk. A process crash loses what is still queued
+            (drained on a normal exit); a power loss loses up to
+            fsync_interval_ms. The default.
+    write   write() returns once its batch is in the file (OS page cache).
+            Survives a process crash.
+    fsync   write() returns once its batch is fsynced. Survives power loss.
+In async and write modes the file is fsynced at most every fsync_interval_ms
+(0: after every batch), and when the writer goes idle.
+
+Several processes (gunicorn workers) may share one file. Each batch is
+appended under an flock on <path>.lock, and after acquiring it a writer
+reopens the file if another process rotated it away. The file is rotated
+to <path>.1 ... <path>.<backups> once it reaches max_bytes.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # No cross-process locking off POSIX; a single process is still safe
+    fcntl = None
+
+from nexus.config import (
+    CORTEX_AUDIT_BACKUPS, CORTEX_AUDIT_DURABILITY, CORTEX_AUDIT_FSYNC_INTERVAL_MS,
+    CORTEX_AUDIT_MAX_BYTES, CORTEX_AUDIT_QUEUE_SIZE
+)
+
+DURABILITY_MODES = ("async", "write", "fsync")
+
+
+class AuditWriteError(Exception):
+    """An audit record could not be written (raised in write / fsync modes)."""
+
+
+class _Pending:
+    """Completion handle for a line (or a flush marker) on the queue."""
+    __slots__ = ("line", "done", "error")
+
+    def __init__(self, line: Optional[bytes]):
+        self.line = line
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+_STOP = object()
+
+# Writers to drain at interpreter exit (one hook for all of them)
+_writers: "weakref.WeakSet[AuditWriter]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_all():
+    for writer in list(_writers):
+        writer.close()
+
+
+class AuditWriter:
+    def __init__(self, path: str, durability: str = CORTEX_AUDIT_DURABILITY,
+                 fsync_interval_ms: float = CORTEX_AUDIT_FSYNC_INTERVAL_MS,
+                 max_bytes: int = CORTEX_AUDIT_MAX_BYTES, backups: int = CORTEX_AUDIT_BACKUPS,
+                 queue_size: int = CORTEX_AUDIT_QUEUE_SIZE):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {DURABILITY_MODES}, got {durability!r}")
+        self.path = path
+        self.durability = durability
+        self.fsync_interval_s = fsync_interval_ms / 1000.0
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue_size = queue_size
+        self.batches = 0
+        self.records = 0
+        self.errors = 0
+        self._start_lock = threading.Lock()
+        self._reset()
+        _writers.add(self)
+
+    def _reset(self):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._fd: Optional[int] = None
+        self._lock_fd: Optional[int] = None
+        self._unsynced = False
+        self._last_fsync = time.monotonic()
+
+    def after_fork(self):
+        """
+        Starts over in a forked child: the writer thread does not survive
+        fork and the queue may hold the parent's lines. Descriptors are
+        dropped, not closed.
+        """
+        self._start_lock = threading.Lock()
+        self._reset()
+
+    def write(self, record: Dict):
+        """
+        Appends one record. Blocks only while the queue is full, or (write /
+        fsync modes) until the record's batch has been written.
+        """
+        line = (json.dumps(record) + "\n").encode("utf-8")
+        if self.durability == "async":
+            self._enqueue(line)
+            return
+        pending = _Pending(line)
+        self._enqueue(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise AuditWriteError(f"audit write to {self.path} failed: {pending.error}") from pending.error
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until everything queued so far is written and fsynced."""
+        if self._thread is None:
+            return True
+        marker = _Pending(None)
+        self._enqueue(marker)
+        return marker.done.wait(timeout)
+
+    def close(self):
+        """Drains the queue, fsyncs and stops the writer thread. write() restarts it."""
+        with self._start_lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+            thread.join()
+            self._thread = None
+
+    def _enqueue(self, item):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="cortex-audit", daemon=True)
+                    self._thread.start()
+        self._queue.put(item)
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.fsync_interval_s if self._unsynced else None)
+            except queue.Empty:
+                self._sync_quietly()
+                continue
+
+            batch = [first]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines: List[bytes] = []
+            waiters: List[_Pending] = []
+            stop = flushing = False
+            for item in batch:
+                if item is _STOP:
+                    stop = flushing = True
+                elif isinstance(item, bytes):
+                    lines.append(item)
+                else:
+                    waiters.append(item)
+                    if item.line is None:
+                        flushing = True
+                    else:
+                        lines.append(item.line)
+
+            error = None
+            try:
+                if lines:
+                    self._append(b"".join(lines))
+                    self.batches += 1
+                    self.records += len(lines)
+                    self._unsynced = True
+                if self._unsynced and (
+                    flushing or self.durability == "fsync"
+                    or time.monotonic() - self._last_fsync >= self.fsync_interval_s
+                ):
+                    self._sync()
+            except OSError as e:
+                # Lost batch; async callers have already returned, so it is only counted
+                error = e
+                self.errors += 1
+            for waiter in waiters:
+                waiter.error = error
+                waiter.done.set()
+
+            if stop:
+                self._close_files()
+                return
+
+    def _append(self, data: bytes):
+        if self._lock_fd is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._lock_fd = os.open(self.path + ".lock", os.O_WRONLY | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            self._open_current()
+            size = os.fstat(self._fd).st_size
+            if self.max_bytes and size and size + len(data) > self.max_bytes:
+                self._rotate()
+            view = memoryview(data)
+            while view:
+                written = os.write(self._fd, view)
+                view = view[written:]
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _open_current(self):
+        # Caller holds the flock. Reopen if the path now names another file
+        # (rotated by this or another process) or is gone.
+        if self._fd is not None:
+            try:
+                st = os.stat(self.path)
+                current = os.fstat(self._fd)
+                if (st.st_dev, st.st_ino) == (current.st_dev, current.st_ino):
+                    return
+            except FileNotFoundError:
+                pass
+            self._close_fd()
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _rotate(self):
+        # Caller holds the flock
+        self._sync()
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.unlink(self.path)
+        self._close_fd()
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _sync(self):
+        if self._fd is not None and self._unsynced:
+            os.fsync(self._fd)
+        self._unsynced = False
+        self._last_fsync = time.monotonic()
+
+    def _sync_quietly(self):
+        try:
+            self._sync()
+        except OSError:
+            pass
+
+    def _close_fd(self):
+        if self._fd is not None:
+            fd, self._fd = self._fd, None
+            os.close(fd)
+
+    def _close_files(self):
+        self._sync_quietly()
+        self._close_fd()
+        if self._lock_fd is not None:
+            fd, self._lock_fd = self._lock_fd, None
+            os.close(fd)
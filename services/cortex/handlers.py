@@ -0,0 +1,398 @@
+"""
+Framework-neutral Cortex request handlers.
+
+Each handler does the (blocking) work for one endpoint and returns
+(payload, status), or (body bytes, status, headers) for pre-serialized
+responses. server.py wraps them in Flask routes; async_server.py
+runs them on its bounded executor.
+"""
+import os
+import sys
+import json
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+# Use the properly installed nexus package
+try:
+    from nexus.ask.recall import recall_bricks_readonly, get_recall_brick_source, get_recall_brick_sources
+    from nexus.config import (
+        ASK_PREVIEW_RERANK_BUDGET_MS, BRICK_BATCH_MAX,
+        GRAPH_PAGE_MAX, GRAPH_MAX_HOPS, GRAPH_NEIGHBORHOOD_MAX_NODES
+    )
+    from nexus.graph.store import GraphStore
+    from nexus.observability import metrics, tracing
+except ImportError:
+    # Fallback for development if not installed
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    sys.path.append(os.path.join(repo_root, "src"))
+    from nexus.ask.recall import recall_bricks_readonly, get_recall_brick_source, get_recall_brick_sources
+    from nexus.config import (
+        ASK_PREVIEW_RERANK_BUDGET_MS, BRICK_BATCH_MAX,
+        GRAPH_PAGE_MAX, GRAPH_MAX_HOPS, GRAPH_NEIGHBORHOOD_MAX_NODES
+    )
+    from nexus.graph.store import GraphStore
+    from nexus.observability import metrics, tracing
+
+from cortex.api import MODE1_BLOCKED
+
+Response = Tuple[Dict, int]
+# Body already serialized: (bytes, status, headers)
+RawResponse = Tuple[bytes, int, Dict[str, str]]
+
+# Headers for a Server-Sent Events stream (no proxy buffering)
+SSE_HEADERS = {"Content-Type": "text/event-stream", "Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+_graph_store = GraphStore.default()
+
+
+def sse_event(event: str, payload: Dict) -> bytes:
+    """One Server-Sent Events frame carrying a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n".encode("utf-8")
+
+
+def graph_index(if_none_match: Optional[str] = None, accept_encoding: str = "") -> RawResponse:
+    """
+    Pre-serialized graph payload (nexus.graph.store), with ETag revalidation
+    and gzip when the client accepts it. Returns (body, status, headers).
+    """
+    try:
+        payload = _graph_store.get()
+    except Exception as e:
+        return json.dumps({"error": str(e)}).encode("utf-8"), 500, {"Content-Type": "application/json"}
+    if payload is None:
+        return (json.dumps({"error": "Graph index files not found"}).encode("utf-8"), 404,
+                {"Content-Type": "application/json"})
+
+    # Clients may cache, but must revalidate every time
+    gzip = accepts_gzip(accept_encoding)
+    headers = {"ETag": payload.gzip_etag if gzip else payload.etag, "Cache-Control": "no-cache",
+               "Vary": "Accept-Encoding"}
+    if payload.matches(if_none_match, gzip=gzip):
+        return b"", 304, headers
+
+    headers["Content-Type"] = "application/json"
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+        return payload.gzip_body, 200, headers
+    return payload.body, 200, headers
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """
+    True if an Accept-Encoding value allows gzip: listed (or covered by "*")
+    with a q-value above 0. "gzip;q=0" refuses it.
+    """
+    weights = {}
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in weights:
+            return weights[coding] > 0
+    return False
+
+
+def metrics_text() -> RawResponse:
+    """This process's metrics registry in the Prometheus text format."""
+    return metrics.render().encode("utf-8"), 200, {"Content-Type": metrics.CONTENT_TYPE}
+
+
+def traces(args: Mapping) -> Response:
+    """
+    This process's most recent sampled traces (nexus.observability.tracing),
+    newest last. ?format=chrome returns Chrome trace JSON (chrome://tracing,
+    ui.perfetto.dev) instead of span lists.
+    """
+    try:
+        limit = _int_arg(args, "limit", 20, 1, 10_000)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    if args.get("format") == "chrome":
+        return tracing.TRACER.chrome_trace(limit), 200
+    return {"sample_rate": tracing.TRACER.sample_rate, "traces": tracing.TRACER.recent(limit)}, 200
+
+
+def _int_arg(args: Mapping, name: str, default: int, lo: int, hi: int) -> int:
+    value = args.get(name)
+    if value is None or value == "":
+        return default
+    parsed = int(value)  # ValueError -> 400
+    if not lo <= parsed <= hi:
+        raise ValueError(f"{name} must be between {lo} and {hi}")
+    return parsed
+
+
+def _graph_query(fn: Callable[[object], Dict]) -> Response:
+    try:
+        adjacency = _graph_store.adjacency()
+    except Exception as e:
+        return {"error": str(e)}, 500
+    if adjacency is None:
+        return {"error": "Graph index files not found"}, 404
+    try:
+        return fn(adjacency), 200
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except LookupError as e:
+        return {"error": str(e)}, 404
+
+
+def graph_summary(args: Mapping) -> Response:
+    """Index text, overrides and graph size; nodes/edges come from the paged endpoints."""
+    try:
+        summary = _graph_store.summary()
+    except Exception as e:
+        return {"error": str(e)}, 500
+    if summary is None:
+        return {"error": "Graph index files not found"}, 404
+    return summary, 200
+
+
+def _page(items_fn: Callable, total: int, key: str, args: Mapping) -> Dict:
+    offset = _int_arg(args, "offset", 0, 0, max(total, 0))
+    limit = _int_arg(args, "limit", 100, 1, GRAPH_PAGE_MAX)
+    items = items_fn(offset, limit)
+    return {
+        key: items,
+        "offset": offset,
+        "limit": limit,
+        "total": total,
+        "next_offset": offset + len(items) if offset + len(items) < total else None
+    }
+
+
+def graph_nodes(args: Mapping) -> Response:
+    return _graph_query(lambda g: _page(g.list_nodes, g.node_count, "nodes", args))
+
+
+def graph_edges(args: Mapping) -> Response:
+    return _graph_query(lambda g: _page(g.list_edges, g.edge_count, "edges", args))
+
+
+def graph_search(args: Mapping) -> Response:
+    def run(g):
+        prefix = args.get("prefix", "")
+        if not prefix:
+            raise ValueError("prefix required")
+        return {"prefix": prefix, "nodes": g.search(prefix, _int_arg(args, "limit", 20, 1, GRAPH_PAGE_MAX))}
+    return _graph_query(run)
+
+
+def graph_neighborhood(args: Mapping) -> Response:
+    def run(g):
+        node_id = args.get("node_id")
+        if not node_id:
+            raise ValueError("node_id required")
+        result = g.neighborhood(
+            node_id,
+            hops=_int_arg(args, "hops", 1, 1, GRAPH_MAX_HOPS),
+            max_nodes=_int_arg(args, "max_nodes", 500, 1, GRAPH_NEIGHBORHOOD_MAX_NODES)
+        )
+        if result is None:
+            raise LookupError("node not found")
+        return result
+    return _graph_query(run)
+
+
+def _meta_payload(brick_id: str, source: Dict) -> Dict:
+    block = source["block"]
+    return {
+        "brick_id": brick_id,
+        "source_file": source["source_file"],
+        "source_span": source["source_span"],
+        "text_sample": str(block)[:500] if block is not None else ""
+    }
+
+
+def _full_payload(brick_id: str, source: Dict) -> Optional[Dict]:
+    if source["block"] is None:
+        return None
+    span = source["source_span"]
+    message = source["message"]
+    return {
+        "brick_id": brick_id,
+        "source_file": source["source_file"],
+        "message_id": span["message_id"],
+        "block_index": span["block_index"],
+        "role": message["role"],
+        "created_at": message["created_at"],
+        "full_text": source["block"]
+    }
+
+
+def brick_meta(brick_id: Optional[str]) -> Response:
+    if not brick_id:
+        return {"error": "brick_id required"}, 400
+
+    # Cached, stat-validated tree access (nexus.bricks.source_reader)
+    source = get_recall_brick_source(brick_id)
+    if not source:
+        return {"error": "brick not found"}, 404
+    return _meta_payload(brick_id, source), 200
+
+
+def brick_full(brick_id: Optional[str]) -> Response:
+    if not brick_id:
+        return {"error": "brick_id required"}, 400
+
+    source = get_recall_brick_source(brick_id)
+    if not source:
+        return {"error": "brick not found"}, 404
+    payload = _full_payload(brick_id, source)
+    if payload is None:
+        return {"error": "block not found"}, 404
+    return payload, 200
+
+
+def _batch_ids(body) -> Tuple[Optional[List[str]], Optional[Response]]:
+    brick_ids = body.get("brick_ids") if isinstance(body, dict) else None
+    if not isinstance(brick_ids, list) or not all(isinstance(b, str) for b in brick_ids):
+        return None, ({"error": "JSON body with brick_ids (list of strings) required"}, 400)
+    if len(brick_ids) > BRICK_BATCH_MAX:
+        return None, ({"error": f"At most {BRICK_BATCH_MAX} brick_ids per request"}, 400)
+    return brick_ids, None
+
+
+def bricks_meta(body) -> Response:
+    """
+    Batch brick-meta: {"brick_ids": [...]} -> {"bricks": [...], "not_found": [...]}.
+    Bricks come back in request order; each tree file is read once.
+    """
+    brick_ids, error = _batch_ids(body)
+    if error:
+        return error
+
+    sources = get_recall_brick_sources(brick_ids)
+    bricks = []
+    not_found = []
+    for brick_id in dict.fromkeys(brick_ids):
+        if brick_id in sources:
+            bricks.append(_meta_payload(brick_id, sources[brick_id]))
+        else:
+            not_found.append(brick_id)
+    return {"bricks": bricks, "not_found": not_found}, 200
+
+
+def bricks_full(body) -> Response:
+    """Batch brick-full; bricks whose block no longer resolves are listed in not_found."""
+    brick_ids, error = _batch_ids(body)
+    if error:
+        return error
+
+    sources = get_recall_brick_sources(brick_ids)
+    bricks = []
+    not_found = []
+    for brick_id in dict.fromkeys(brick_ids):
+        payload = _full_payload(brick_id, sources[brick_id]) if brick_id in sources else None
+        if payload is not None:
+            bricks.append(payload)
+        else:
+            not_found.append(brick_id)
+    return {"bricks": bricks, "not_found": not_found}, 200
+
+
+def generation_request(body) -> Tuple[Optional[Dict], Optional[Response]]:
+    """
+    Validates a generate body: {"query", "brick_ids"?, "user_id"?, "agent_id"?}.
+    Returns the request fields, or an error response.
+    """
+    if not isinstance(body, dict):
+        return None, ({"error": "JSON object body required"}, 400)
+    query = body.get("query")
+    if not query or not isinstance(query, str):
+        return None, ({"error": "query required"}, 400)
+    brick_ids = body.get("brick_ids", [])
+    if not isinstance(brick_ids, list) or not all(isinstance(b, str) for b in brick_ids):
+        return None, ({"error": "brick_ids must be a list of strings"}, 400)
+    return {
+        "user_id": body.get("user_id", "anonymous"),
+        "agent_id": body.get("agent_id", "General"),
+        "query": query,
+        "brick_ids": brick_ids,
+    }, None
+
+
+def prepare_generation(api, body) -> Tuple[Optional[Dict], Optional[Response]]:
+    """
+    A validated generate request plus its MODE-1 prompt (CortexAPI.prepare_prompt),
+    for servers that call the model themselves. Blocking: reloads source.
+    The caller audits with api.record_generation once the model was called.
+    """
+    job, error = generation_request(body)
+    if error:
+        return None, error
+    job["prompt"] = api.prepare_prompt(job["query"], job["brick_ids"])
+    if job["prompt"] is None:
+        return None, (dict(MODE1_BLOCKED), 422)
+    return job, None
+
+
+def generate(api, body) -> Response:
+    """/cortex/generate over CortexAPI.generate (MODE-1 reload, model call, audit)."""
+    job, error = generation_request(body)
+    if error:
+        return error
+    result = api.generate(job["user_id"], job["agent_id"], job["query"], job["brick_ids"])
+    return result, 422 if result.get("status") == "blocked" else 200
+
+
+def generate_stream(api, body) -> Tuple[Optional[Iterator[bytes]], Optional[Response]]:
+    """
+    /cortex/generate-stream over CortexAPI.generate_stream: Server-Sent Events
+    frames ("token", then "done"), or an error response (400, or 422 when
+    MODE-1 blocks) decided before anything is streamed. Blocking: reloads
+    source before returning. Closing the frames closes the model stream,
+    which writes the audit record.
+    """
+    job, error = generation_request(body)
+    if error:
+        return None, error
+    events = api.generate_stream(job["user_id"], job["agent_id"], job["query"], job["brick_ids"])
+    first = next(events, None)
+    if first is not None and first["event"] == "error":
+        events.close()
+        return None, ({k: v for k, v in first.items() if k != "event"}, 422)
+
+    def frames() -> Iterator[bytes]:
+        try:
+            event = first
+            while event is not None:
+                yield sse_event(event.pop("event"), event)
+                event = next(events, None)
+        finally:
+            events.close()
+    return frames(), None
+
+
+def ask_preview(query: Optional[str], recall: Callable = recall_bricks_readonly) -> Response:
+    if not query:
+        return {"error": "Query parameter is required"}, 400
+
+    # Use the read-only recall adapter, under a hard rerank budget
+    rerank_timings = {}
+    recalled_bricks = recall(
+        query, rerank_budget_ms=ASK_PREVIEW_RERANK_BUDGET_MS, rerank_timings=rerank_timings
+    )
+
+    top_bricks_output = [
+        {"brick_id": brick["brick_id"], "confidence": round(brick["confidence"], 4)}
+        for brick in recalled_bricks
+    ]
+
+    return {
+        "query": query,
+        "top_bricks": top_bricks_output,
+        "reranker_used": recalled_bricks[0].get("reranker_used", "none") if recalled_bricks else "none",
+        "rerank_timings": rerank_timings,
+        "status": "preview"
+    }, 200
@@ -0,0 +1,183 @@
+"""
+Async client for the generation model backend.
+
+One aiohttp session per client, with a bounded keep-alive connection pool,
+so concurrent generate calls reuse connections instead of opening one
+each. Backend protocol:
+
+    POST {base_url}/v1/generate
+    request   {"model": str, "prompt": str, "max_tokens": int, "stream": bool}
+    response  {"text": str, "model": str, "usage": {"prompt_tokens": int, "completion_tokens": int}}
+              or, with "stream": true, newline-delimited JSON: {"text": str} per
+              token, then {"done": true, "model": str, "usage": {...}}
+
+Without a base_url the client returns the same simulated response as
+CortexAPI.generate, paced by SimulatedModel. StubModelServer implements the
+protocol for tests and local load runs.
+"""
+import asyncio
+import json
+import os
+import sys
+from typing import AsyncIterator, Dict, Optional
+
+import aiohttp
+from aiohttp import web
+
+try:
+    from nexus.config import CORTEX_MODEL_URL, CORTEX_MODEL_MAX_CONNECTIONS, CORTEX_MODEL_TIMEOUT_S
+except ImportError:
+    # Fallback for development if not installed
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    sys.path.append(os.path.join(repo_root, "src"))
+    from nexus.config import CORTEX_MODEL_URL, CORTEX_MODEL_MAX_CONNECTIONS, CORTEX_MODEL_TIMEOUT_S
+
+from cortex.simulated import SimulatedModel
+
+
+class ModelBackendError(RuntimeError):
+    """The model backend could not be reached or returned an error."""
+
+
+class AsyncModelClient:
+    def __init__(self, base_url: Optional[str] = CORTEX_MODEL_URL,
+                 max_connections: int = CORTEX_MODEL_MAX_CONNECTIONS,
+                 timeout_s: float = CORTEX_MODEL_TIMEOUT_S,
+                 simulated: Optional[SimulatedModel] = None):
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.simulated = simulated or SimulatedModel()
+        self.max_connections = max(1, max_connections)
+        self.timeout_s = timeout_s
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily so it binds to the running event loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout_s),
+            )
+        return self._session
+
+    async def generate(self, prompt: str, model: str, max_tokens: int = 512) -> Dict:
+        if self.base_url is None:
+            return {
+                "text": "".join([t async for t in self.simulated.astream(self._simulated_text(prompt))]),
+                "model": model,
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0},
+            }
+
+        payload = {"model": model, "prompt": prompt, "max_tokens": max_tokens}
+        try:
+            async with self._get_session().post(f"{self.base_url}/v1/generate", json=payload) as resp:
+                if resp.status != 200:
+                    raise ModelBackendError(f"Model backend returned HTTP {resp.status}")
+                return await resp.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise ModelBackendError(f"Model backend unavailable: {e!r}")
+
+    async def generate_stream(self, prompt: str, model: str, max_tokens: int = 512,
+                              final: Optional[Dict] = None) -> AsyncIterator[str]:
+        """
+        Yields the response text as the backend produces it. If given, `final`
+        is filled with the closing chunk's fields ("model", "usage") once the
+        stream ends.
+        """
+        if self.base_url is None:
+            async for token in self.simulated.astream(self._simulated_text(prompt)):
+                yield token
+            if final is not None:
+                final.update(model=model, usage={"prompt_tokens": 0, "completion_tokens": 0})
+            return
+
+        payload = {"model": model, "prompt": prompt, "max_tokens": max_tokens, "stream": True}
+        try:
+            async with self._get_session().post(f"{self.base_url}/v1/generate", json=payload) as resp:
+                if resp.status != 200:
+                    raise ModelBackendError(f"Model backend returned HTTP {resp.status}")
+                async for line in resp.content:
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("done"):
+                        if final is not None:
+                            final.update((k, v) for k, v in chunk.items() if k != "done")
+                        return
+                    yield chunk.get("text", "")
+            raise ModelBackendError("Model backend closed the stream early")
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise ModelBackendError(f"Model backend unavailable: {e!r}")
+
+    @staticmethod
+    def _simulated_text(prompt: str) -> str:
+        return f"Simulated response for: {prompt[-20:]}..."
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class StubModelServer:
+    """
+    Local model backend for tests: echoes the prompt tail plus `tokens`
+    filler tokens after delay_ms, generated one per token_delay_ms. With
+    "stream": true each token is sent as it is generated. Responses name
+    `model` if given, else the requested model. Records the peer
+    address of each request, so tests can check that calls share pooled
+    connections.
+    """
+    def __init__(self, delay_ms: float = 0.0, token_delay_ms: float = 0.0, tokens: int = 0,
+                 model: Optional[str] = None):
+        self.delay = delay_ms / 1000.0
+        self.served_model = model
+        self.model = SimulatedModel(token_delay_ms)
+        self.tokens = tokens
+        self.requests = 0
+        self.peers = set()
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _generate(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.requests += 1
+        self.peers.add(request.transport.get_extra_info("peername"))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        prompt = body.get("prompt", "")
+        text = f"Stub response for: {prompt[-20:]}" + " lorem" * self.tokens
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": 8 + self.tokens}
+        model = self.served_model or body.get("model", "stub")
+        if not body.get("stream"):
+            # Same pacing as the stream, delivered in one piece at the end
+            text = "".join([t async for t in self.model.astream(text)])
+            return web.json_response({"text": text, "model": model, "usage": usage})
+
+        resp = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await resp.prepare(request)
+        async for token in self.model.astream(text):
+            await resp.write(json.dumps({"text": token}).encode() + b"\n")
+        await resp.write(json.dumps({"done": True, "model": model, "usage": usage}).encode() + b"\n")
+        await resp.write_eof()
+        return resp
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Starts serving; returns the base URL."""
+        app = web.Application()
+        app.router.add_post("/v1/generate", self._generate)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{bound_port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
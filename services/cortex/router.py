@@ -0,0 +1,168 @@
+"""
+Intent router for CortexAPI.route.
+
+The routing table is data (routing_rules.json, or NEXUS_CORTEX_ROUTING_RULES):
+
+    {"default": {"agent_id": ..., "model": ...},
+     "rules": [{"agent_id": ..., "model": ..., "keywords": ["stock", "trad*", ...]}, ...]}
+
+Keywords match whole words or phrases, case-insensitively. A trailing "*"
+also matches any word continuation ("trad*" matches "trading"). All
+keywords are compiled into one regex whose alternation is factored as a
+prefix trie. The regex finds every position where some keyword starts.
+At each such position, walking the trie gives every keyword that matches
+there, so a phrase ("code review") cannot hide a shorter keyword ("code")
+of an earlier rule. Scanning a query costs about the query length,
+whatever the number of rules. The earliest rule in the file with a
+keyword in the query wins, as in the old if-chain.
+
+The file is re-read when its mtime or size changes, checked at most every
+reload_interval_s. A file that fails to load is reported and skipped; the
+last good table stays in use.
+"""
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from nexus.config import CORTEX_ROUTING_RULES_PATH
+except ImportError:
+    # Fallback for development if not installed
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    sys.path.append(os.path.join(repo_root, "src"))
+    from nexus.config import CORTEX_ROUTING_RULES_PATH
+
+log = logging.getLogger("cortex.router")
+
+_END = ""
+_STEM = "*"
+_WORD = re.compile(r"\w")
+
+
+def _trie_pattern(trie: Dict) -> str:
+    """Regex source matching any keyword in the trie, with shared prefixes factored out."""
+    def build(node: Dict) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch not in (_END, _STEM)]
+        # Longer keywords are tried first; the (?!\w) guard backtracks into these
+        if _STEM in node:
+            alts.append(r"\w*")
+        elif _END in node:
+            alts.append("")
+        if len(alts) == 1:
+            return alts[0]
+        return "(?:" + "|".join(alts) + ")"
+
+    return build(trie)
+
+
+def _normalize(keyword: str) -> str:
+    return " ".join(keyword.lower().split())
+
+
+class RoutingTable:
+    """One compiled rules file. Immutable; IntentRouter swaps whole tables."""
+    def __init__(self, config: Dict):
+        default = config.get("default") or {"agent_id": "General", "model": "GPT"}
+        self.default = {"agent_id": default["agent_id"], "model": default["model"]}
+        self.routes: List[Dict] = []
+        # Keyword trie; _END / _STEM entries hold the rule index of the keyword ending there
+        self._trie: Dict = {}
+        self.keyword_count = 0
+        for rule in config.get("rules", []):
+            index = len(self.routes)
+            self.routes.append({"agent_id": rule["agent_id"], "model": rule["model"]})
+            for keyword in rule.get("keywords", []):
+                keyword = _normalize(keyword)
+                text = keyword.rstrip(_STEM)
+                if not text:
+                    raise ValueError(f"empty keyword in rule {index}")
+                node = self._trie
+                for ch in text:
+                    node = node.setdefault(ch, {})
+                marker = _STEM if keyword.endswith(_STEM) else _END
+                if marker not in node:
+                    self.keyword_count += 1
+                # A keyword listed under several rules belongs to the first
+                node.setdefault(marker, index)
+
+        # Zero-width, so every position where some keyword starts is reported,
+        # including starts inside a longer match
+        self._starts = (re.compile(r"(?<!\w)(?=" + _trie_pattern(self._trie) + r"(?!\w))")
+                        if self._trie else None)
+
+    def _rule_at(self, text: str, start: int) -> int:
+        """Earliest rule among all keywords matching text at start."""
+        best = len(self.routes)
+        node = self._trie
+        i = start
+        while True:
+            if _STEM in node:
+                best = min(best, node[_STEM])
+            if _END in node and not _WORD.match(text, i):
+                best = min(best, node[_END])
+            if i == len(text):
+                return best
+            node = node.get(text[i])
+            if node is None:
+                return best
+            i += 1
+
+    def route(self, query: str) -> Dict:
+        if self._starts is None:
+            return dict(self.default)
+        text = " ".join(query.lower().split())
+        best = len(self.routes)
+        for match in self._starts.finditer(text):
+            best = min(best, self._rule_at(text, match.start()))
+            if best == 0:
+                break
+        return dict(self.routes[best]) if best < len(self.routes) else dict(self.default)
+
+
+class IntentRouter:
+    def __init__(self, path: str = CORTEX_ROUTING_RULES_PATH, reload_interval_s: float = 1.0):
+        self.path = path
+        self.reload_interval_s = reload_interval_s
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._next_check = 0.0
+        self.table = RoutingTable({})
+        self._maybe_reload(force=True)
+
+    def route(self, query: str) -> Dict:
+        """{"agent_id", "model"} for the query."""
+        if time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        return self.table.route(query)
+
+    def _maybe_reload(self, force: bool = False):
+        if not self._lock.acquire(blocking=force):
+            # Another thread is checking; route with the current table
+            return
+        try:
+            self._next_check = time.monotonic() + self.reload_interval_s
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                return
+            stamp = (st.st_mtime_ns, st.st_size)
+            if stamp == self._stamp:
+                return
+            self._stamp = stamp
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    table = RoutingTable(json.load(f))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                log.warning("routing rules not loaded; keeping the previous table",
+                            extra={"path": self.path, "error": str(e)})
+                return
+            self.table = table
+            self.reloads += 1
+        finally:
+            self._lock.release()
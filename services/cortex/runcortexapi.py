@@ -1,4 +1,8 @@
-from api import CortexAPI
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cortex.api import CortexAPI
 
 cortex = CortexAPI()
 
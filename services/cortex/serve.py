@@ -0,0 +1,150 @@
+"""
+Production runtime for the Cortex API.
+
+Runs server.app under gunicorn with threaded (gthread) workers and
+preload_app: the master imports the app once, which loads the FAISS index,
+brick store and rerank models, freezes the GC, and then forks the workers,
+which share those pages copy-on-write.
+
+Reloading:
+    python services/cortex reload   new master (fresh index/models), then
+                                    the old one drains and exits
+    kill -HUP <master pid>          restarts workers only; preloaded data
+                                    is kept as is
+"""
+import gc
+import os
+import signal
+import sys
+import time
+from typing import Dict, Optional
+
+try:
+    from nexus.config import CORTEX_BIND, CORTEX_WORKERS, CORTEX_THREADS, CORTEX_PIDFILE
+except ImportError:
+    # Fallback for development if not installed
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    sys.path.append(os.path.join(repo_root, "src"))
+    from nexus.config import CORTEX_BIND, CORTEX_WORKERS, CORTEX_THREADS, CORTEX_PIDFILE
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    # gunicorn is optional (and POSIX-only); only `serve` needs it
+    BaseApplication = None
+
+
+def load_app():
+    """
+    Imports the Flask app, loading the index, brick store and models.
+    Called once in the master when preloading.
+    """
+    from cortex.server import app
+    # Move everything allocated so far out of the GC's generations, so
+    # collections in the workers don't write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def post_fork(server, worker):
+    """Per-worker setup for state that must not cross fork()."""
+    from nexus.ask import recall
+    from nexus.observability import logs, profiling, tracing
+    logs.after_fork()
+    tracing.TRACER.after_fork()
+    # Per worker: profiler threads do not survive fork (NEXUS_PROFILE)
+    profiling.start_from_env("cortex")
+    recall._reranker.score_cache.after_fork()
+    from cortex import server as cortex_server
+    cortex_server.cortex_api.audit.after_fork()
+
+
+def worker_exit(server, worker):
+    """Drains audit rows still queued in an exiting worker and writes its profile, if any."""
+    from nexus.observability import profiling
+    from cortex import server as cortex_server
+    cortex_server.cortex_api.audit.close()
+    profiling.stop()
+
+
+def gunicorn_options(bind: str = CORTEX_BIND, workers: int = CORTEX_WORKERS,
+                     threads: int = CORTEX_THREADS, pidfile: str = CORTEX_PIDFILE,
+                     timeout: int = 60, graceful_timeout: int = 30,
+                     access_log: bool = False) -> Dict:
+    return {
+        "bind": bind,
+        "workers": max(1, workers),
+        "threads": max(1, threads),
+        "worker_class": "gthread",
+        "preload_app": True,
+        "pidfile": pidfile,
+        "timeout": timeout,
+        "graceful_timeout": graceful_timeout,
+        "keepalive": 5,
+        "accesslog": "-" if access_log else None,
+        "post_fork": post_fork,
+        "worker_exit": worker_exit,
+    }
+
+
+if BaseApplication is not None:
+    class CortexApplication(BaseApplication):
+        """Embedded gunicorn application serving server.app."""
+        def __init__(self, options: Dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                if value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            return load_app()
+
+
+def serve(options: Dict):
+    if BaseApplication is None:
+        raise RuntimeError(
+            "gunicorn is not installed (pip install gunicorn). "
+            "It needs a POSIX system; on Windows run Cortex under WSL."
+        )
+    os.makedirs(os.path.dirname(os.path.abspath(options["pidfile"])), exist_ok=True)
+    CortexApplication(options).run()
+
+
+def _read_pid(pidfile: str) -> Optional[int]:
+    try:
+        with open(pidfile, "r") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def reload(pidfile: str = CORTEX_PIDFILE, timeout: float = 120.0) -> int:
+    """
+    Zero-downtime reload. USR2 makes the running master exec a new master
+    on the same listening socket; the new one preloads fresh data and then
+    writes <pidfile>.2. The old master is then sent TERM, so its workers
+    finish in-flight requests (up to graceful_timeout) and exit, and the new
+    master takes over the pidfile. Returns the new master's pid.
+    """
+    old_pid = _read_pid(pidfile)
+    if old_pid is None:
+        raise RuntimeError(f"No running Cortex server (pidfile {pidfile} missing)")
+
+    os.kill(old_pid, signal.SIGUSR2)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        new_pid = _read_pid(pidfile + ".2")
+        if new_pid is not None and new_pid != old_pid:
+            break
+        time.sleep(0.2)
+    else:
+        raise RuntimeError(f"New Cortex master did not start within {timeout:.0f}s; old master {old_pid} left running")
+
+    # Give the new master a moment to fork its workers before draining
+    time.sleep(1.0)
+    os.kill(old_pid, signal.SIGTERM)
+    return new_pid
@@ -1,180 +1,166 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g
+import functools
 import os
 import sys
+import time
 from datetime import datetime, timezone
-import json
-
-# Adjust the path to import CortexAPI from the same directory
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from api import CortexAPI
-
-# Use the properly installed nexus package
-try:
-    from nexus.ask.recall import recall_bricks_readonly, get_recall_brick_metadata
-    from nexus.config import REPO_ROOT
-except ImportError:
-    # Fallback for development if not installed
-    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-    sys.path.append(os.path.join(repo_root, "src"))
-    from nexus.ask.recall import recall_bricks_readonly, get_recall_brick_metadata
-    from nexus.config import REPO_ROOT
 
+# services/ on the path, so the cortex package imports when this file is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cortex.api import CortexAPI
+# Endpoint logic is shared with the async server (async_server.py)
+from cortex import admission, handlers
+from nexus.config import CORTEX_RECALL_CONCURRENCY, CORTEX_GENERATE_CONCURRENCY
+from nexus.observability import logs, profiling, tracing
+
+# JSON lines through a background writer (nexus.observability.logs)
+logs.configure()
 app = Flask(__name__)
 cortex_api = CortexAPI()
+# Per-worker admission control for the expensive routes (admission.py)
+rate_limiter = admission.ClientRateLimiter()
+recall_limiter = admission.ConcurrencyLimiter("recall", CORTEX_RECALL_CONCURRENCY)
+generate_limiter = admission.ConcurrencyLimiter("generate", CORTEX_GENERATE_CONCURRENCY)
+admission.register_metrics(rate_limiter, recall_limiter, generate_limiter)
+
+@app.before_request
+def _begin_request():
+    # Request ID for every log record of this request; a caller's X-Request-Id is kept
+    g.request_id, g.request_id_token = logs.bind_request_id(request.headers.get(logs.REQUEST_ID_HEADER))
+    # Root span of the request's trace (sampled per NEXUS_TRACE_SAMPLE_RATE)
+    g.span, g.span_token = tracing.start_span("http", method=request.method, path=request.path)
+
+@app.after_request
+def _tag_response(response):
+    if "request_id" in g:
+        response.headers[logs.REQUEST_ID_HEADER] = g.request_id
+    if "span" in g:
+        g.span.set(status=response.status_code)
+    return response
+
+@app.teardown_request
+def _end_request(exc):
+    span_token = g.pop("span_token", None)
+    if span_token is not None:
+        if exc is not None:
+            g.span.set(error=type(exc).__name__)
+        tracing.end_span(g.span, span_token)
+    token = g.pop("request_id_token", None)
+    if token is not None:
+        logs.unbind_request_id(token)
 
 def get_utc_now():
     return datetime.now(timezone.utc).isoformat()
 
+def _respond(result):
+    payload, status = result
+    return jsonify(payload), status
+
+def _admitted(limiter):
+    """
+    Rate-limits per client, then holds a slot of `limiter` for the view, or,
+    when the view returns a streamed Response, until the server closes it.
+    """
+    def wrap(view):
+        @functools.wraps(view)
+        def inner(*args, **kwargs):
+            try:
+                rate_limiter.check(admission.client_id(request.headers, request.remote_addr))
+                limiter.acquire()
+            except admission.Rejected as e:
+                payload, status, headers = e.response()
+                return jsonify(payload), status, headers
+            start = time.perf_counter()
+            release = lambda: limiter.release(time.perf_counter() - start)
+            try:
+                resp = view(*args, **kwargs)
+            except BaseException:
+                release()
+                raise
+            if isinstance(resp, Response) and resp.is_streamed:
+                resp.call_on_close(release)
+            else:
+                release()
+            return resp
+        return inner
+    return wrap
+
 @app.route("/jarvis/graph-index", methods=["GET"])
 def jarvis_graph_index():
-    graph_dir = os.path.join(REPO_ROOT, "src", "nexus", "graph")
-    nodes_path = os.path.join(graph_dir, "nodes.json")
-    edges_path = os.path.join(graph_dir, "edges.json")
-    index_path = os.path.join(graph_dir, "index.md")
-    overrides_path = os.path.join(graph_dir, "anchors.override.json")
-
-    try:
-        if not (os.path.exists(nodes_path) and os.path.exists(edges_path) and os.path.exists(index_path)):
-             return jsonify({"error": "Graph index files not found"}), 404
-
-        with open(nodes_path, "r", encoding="utf-8") as f:
-            nodes = json.load(f)
-        
-        with open(edges_path, "r", encoding="utf-8") as f:
-            edges = json.load(f)
-
-        with open(index_path, "r", encoding="utf-8") as f:
-            index_content = f.read()
-
-        overrides = []
-        if os.path.exists(overrides_path):
-            try:
-                with open(overrides_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    overrides = data.get("overrides", [])
-            except Exception:
-                overrides = []
-
-        return jsonify({
-            "nodes": nodes,
-            "edges": edges,
-            "index_content": index_content,
-            "anchor_overrides": overrides
-        })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    body, status, headers = handlers.graph_index(
+        request.headers.get("If-None-Match"), request.headers.get("Accept-Encoding", "")
+    )
+    return Response(body, status=status, headers=headers)
+
+@app.route("/jarvis/graph/summary", methods=["GET"])
+def jarvis_graph_summary():
+    return _respond(handlers.graph_summary(request.args))
+
+@app.route("/jarvis/graph/nodes", methods=["GET"])
+def jarvis_graph_nodes():
+    return _respond(handlers.graph_nodes(request.args))
+
+@app.route("/jarvis/graph/edges", methods=["GET"])
+def jarvis_graph_edges():
+    return _respond(handlers.graph_edges(request.args))
+
+@app.route("/jarvis/graph/search", methods=["GET"])
+def jarvis_graph_search():
+    return _respond(handlers.graph_search(request.args))
+
+@app.route("/jarvis/graph/neighborhood", methods=["GET"])
+def jarvis_graph_neighborhood():
+    return _respond(handlers.graph_neighborhood(request.args))
 
 @app.route("/jarvis/brick-meta", methods=["GET"])
 def jarvis_brick_meta():
-    brick_id = request.args.get("brick_id")
-    if not brick_id:
-        return jsonify({"error": "brick_id required"}), 400
-
-    meta = get_recall_brick_metadata(brick_id)
-    if not meta:
-        return jsonify({"error": "brick not found"}), 404
-
-    source_file = meta["source_file"]
-    source_span = meta["source_span"]
-
-    text_sample = ""
-    try:
-        with open(source_file, "r", encoding="utf-8") as f:
-            tree = json.load(f)
-
-        # find matching message + block
-        for msg in tree.get("messages", []):
-            if (msg.get("message_id") or msg.get("id")) == source_span.get("message_id"):
-                content = msg.get("content", "")
-                blocks = []
-                if isinstance(content, str):
-                    # Replicate extractor logic: split by double newlines
-                    blocks = [b.strip() for b in content.split("\n\n") if b.strip()]
-                elif isinstance(content, list):
-                    blocks = content
-                
-                idx = source_span.get("block_index")
-                if idx is not None and idx < len(blocks):
-                    text_sample = str(blocks[idx])[:500]
-                break
-    except Exception:
-        text_sample = ""
-
-    return jsonify({
-        "brick_id": brick_id,
-        "source_file": source_file,
-        "source_span": source_span,
-        "text_sample": text_sample
-    })
+    return _respond(handlers.brick_meta(request.args.get("brick_id")))
 
 @app.route("/jarvis/brick-full", methods=["GET"])
 def jarvis_brick_full():
-    brick_id = request.args.get("brick_id")
-    if not brick_id:
-        return jsonify({"error": "brick_id required"}), 400
-
-    meta = get_recall_brick_metadata(brick_id)
-    if not meta:
-        return jsonify({"error": "brick not found"}), 404
-
-    source_file = meta["source_file"]
-    span = meta["source_span"]
-
-    try:
-        with open(source_file, "r", encoding="utf-8") as f:
-            tree = json.load(f)
-
-        for msg in tree.get("messages", []):
-            if (msg.get("message_id") or msg.get("id")) == span["message_id"]:
-                content = msg.get("content", "")
-                blocks = []
-                if isinstance(content, str):
-                    # Replicate extractor logic: split by double newlines
-                    blocks = [b.strip() for b in content.split("\n\n") if b.strip()]
-                elif isinstance(content, list):
-                    blocks = content
-                
-                idx = span["block_index"]
-
-                if idx is not None and idx < len(blocks):
-                    return jsonify({
-                        "brick_id": brick_id,
-                        "source_file": source_file,
-                        "message_id": span["message_id"],
-                        "block_index": idx,
-                        "role": msg.get("role"),
-                        "created_at": msg.get("created_at"),
-                        "full_text": blocks[idx]
-                    })
-    except Exception:
-        pass
-
-    return jsonify({"error": "block not found"}), 404
+    return _respond(handlers.brick_full(request.args.get("brick_id")))
 
+@app.route("/jarvis/bricks-meta", methods=["POST"])
+def jarvis_bricks_meta():
+    return _respond(handlers.bricks_meta(request.get_json(silent=True)))
 
+@app.route("/jarvis/bricks-full", methods=["POST"])
+def jarvis_bricks_full():
+    return _respond(handlers.bricks_full(request.get_json(silent=True)))
 
 @app.route("/jarvis/ask-preview", methods=["GET"])
+@_admitted(recall_limiter)
 def jarvis_ask_preview():
-    query = request.args.get("query")
-    if not query:
-        return jsonify({"error": "Query parameter is required"}), 400
-
-    # Use the read-only recall adapter
-    recalled_bricks = recall_bricks_readonly(query)
-
-    top_bricks_output = [
-        {"brick_id": brick["brick_id"], "confidence": round(brick["confidence"], 4)}
-        for brick in recalled_bricks
-    ]
-
-    response_data = {
-        "query": query,
-        "top_bricks": top_bricks_output,
-        "status": "preview"
-    }
-    return jsonify(response_data)
+    return _respond(handlers.ask_preview(request.args.get("query")))
+
+@app.route("/cortex/generate", methods=["POST"])
+@_admitted(generate_limiter)
+def cortex_generate():
+    return _respond(handlers.generate(cortex_api, request.get_json(silent=True)))
+
+@app.route("/cortex/generate-stream", methods=["POST"])
+@_admitted(generate_limiter)
+def cortex_generate_stream():
+    frames, error = handlers.generate_stream(cortex_api, request.get_json(silent=True))
+    if error:
+        return _respond(error)
+    return Response(frames, headers=handlers.SSE_HEADERS)
+
+@app.route("/cortex/admission", methods=["GET"])
+def cortex_admission():
+    return jsonify(admission.stats(rate_limiter, recall_limiter, generate_limiter))
+
+@app.route("/cortex/traces", methods=["GET"])
+def cortex_traces():
+    return _respond(handlers.traces(request.args))
+
+@app.route("/metrics", methods=["GET"])
+def cortex_metrics():
+    body, status, headers = handlers.metrics_text()
+    return Response(body, status=status, headers=headers)
 
 if __name__ == "__main__":
-    # For development purposes, run with debug true
-    # In production, use a production-ready WSGI server like Gunicorn
+    # Flask's built-in server (single process, reloader on), for local runs.
+    # In production run `python services/cortex serve` (see serve.py)
+    profiling.start_from_env("cortex")
     app.run(debug=True, port=5001)
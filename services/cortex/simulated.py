@@ -0,0 +1,47 @@
+"""
+Simulated generation model: emits a response token by token, sleeping
+token_delay_ms before each one, so streaming and time-to-first-token can be
+exercised without a model backend. Used by CortexAPI, by AsyncModelClient
+without a base_url, and by StubModelServer.
+"""
+import asyncio
+import os
+import re
+import sys
+import time
+from typing import AsyncIterator, Iterator, List
+
+try:
+    from nexus.config import CORTEX_SIMULATED_TOKEN_DELAY_MS
+except ImportError:
+    # Fallback for development if not installed
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    sys.path.append(os.path.join(repo_root, "src"))
+    from nexus.config import CORTEX_SIMULATED_TOKEN_DELAY_MS
+
+_TOKEN_RE = re.compile(r"\s*\S+")
+
+
+def split_tokens(text: str) -> List[str]:
+    """Word-level tokens that concatenate back to text (leading whitespace kept)."""
+    tokens = _TOKEN_RE.findall(text)
+    if tokens and len("".join(tokens)) < len(text):
+        tokens[-1] += text[len("".join(tokens)):]
+    return tokens
+
+
+class SimulatedModel:
+    def __init__(self, token_delay_ms: float = CORTEX_SIMULATED_TOKEN_DELAY_MS):
+        self.token_delay = token_delay_ms / 1000.0
+
+    def stream(self, text: str) -> Iterator[str]:
+        for token in split_tokens(text):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield token
+
+    async def astream(self, text: str) -> AsyncIterator[str]:
+        for token in split_tokens(text):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield token
@@ -1,8 +1,19 @@
+import hashlib
+import logging
 import os
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
 from nexus.vector.local_index import LocalVectorIndex
-from nexus.bricks.brick_store import BrickStore, query_to_vector # Import the deterministic mock embedding
+from nexus.bricks.brick_store import BrickStore, query_to_vector, EMBEDDER_VERSION # Import the deterministic mock embedding
+from nexus.bricks.source_reader import SourceReader
 from nexus.rerank.orchestrator import RerankOrchestrator
+from nexus.vector.embedding_cache import EmbeddingCache
+from nexus.config import (
+    EMBEDDING_CACHE_MAX_BYTES, EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_DISK_MAX_BYTES, RECALL_OVERFETCH
+)
+from nexus.observability import metrics, profiling, tracing
+
+log = logging.getLogger(__name__)
 
 # Initialize LocalVectorIndex and BrickStore globally or pass them around
 # For simplicity and to avoid circular imports during initial setup, we'll initialize here
@@ -10,6 +21,23 @@ from nexus.rerank.orchestrator import RerankOrchestrator
 _local_index = LocalVectorIndex()
 _brick_store = BrickStore()
 _reranker = RerankOrchestrator()
+# Parsed tree files behind brick-meta / brick-full and Cortex MODE-1 reloads
+_source_reader = SourceReader()
+# Shared by every recall entry point (CLI ask, Cortex ask_preview, Jarvis preview)
+_embedding_cache = EmbeddingCache(EMBEDDING_CACHE_MAX_BYTES, EMBEDDER_VERSION, EMBEDDING_CACHE_DIR,
+                                  EMBEDDING_CACHE_DISK_MAX_BYTES)
+
+_RECALL_SECONDS = metrics.histogram("nexus_recall_seconds", "recall_bricks latency, end to end")
+_RECALL_STAGE = metrics.histogram("nexus_recall_stage_seconds", "recall_bricks latency by stage", ("stage",))
+_EMBED_SECONDS = _RECALL_STAGE.labels("embed")
+_SEARCH_SECONDS = _RECALL_STAGE.labels("search")
+_HYDRATE_SECONDS = _RECALL_STAGE.labels("hydrate")
+_RERANK_SECONDS = _RECALL_STAGE.labels("rerank")
+_RECALL_CANDIDATES = metrics.histogram("nexus_recall_candidates", "Candidates handed to the reranker per recall",
+                                       buckets=(0, 10, 25, 50, 100, 250, 500, 1000))
+_EMBED_CACHE = metrics.counter("nexus_embedding_cache_lookups_total", "Query embedding cache lookups", ("result",))
+_EMBED_CACHE.labels("hit").set_function(lambda: _embedding_cache.hits)
+_EMBED_CACHE.labels("miss").set_function(lambda: _embedding_cache.misses)
 
 def _normalize_distance_to_confidence(distance: float) -> float:
     # FAISS L2 distance needs to be converted to cosine similarity and then normalized.
@@ -30,35 +58,68 @@ def _normalize_distance_to_confidence(distance: float) -> float:
     confidence = 1.0 - (distance / 2.0)
     return max(0.0, min(1.0, confidence))
 
-def recall_bricks(query: str, k: int = 10) -> List[Dict]:
-    query_vec = query_to_vector(query)
-    print("DEBUG query vector shape =", query_vec.shape)
-    print("DEBUG index dim =", _local_index.index.d)
-    distances, indices = _local_index.search(query_vec, k)
-    
-    candidates = []
-    flat_indices = indices.flatten().tolist()
-    flat_distances = distances.flatten().tolist()
-
-    for i, idx in enumerate(flat_indices):
-        if idx != -1 and idx < len(_local_index.brick_ids):
-            brick_id = _local_index.brick_ids[idx]
-            confidence = _normalize_distance_to_confidence(flat_distances[i])
-            
-            # Hydrate with text for reranker
-            brick_text = _brick_store.get_brick_text(brick_id)
-            candidates.append({
-                "brick_id": brick_id,
-                "base_confidence": confidence,
-                "brick_text": brick_text if brick_text else ""
-            })
-            
-    # Apply Reranker
-    reranked_results = _reranker.rerank(query, candidates)
-    
+@profiling.profiled("recall")
+def recall_bricks(query: str, k: int = 10, rerank_budget_ms: Optional[float] = None,
+                  rerank_timings: Optional[Dict] = None) -> List[Dict]:
+    """
+    Semantic recall + rerank.
+    Over-fetches k * RECALL_OVERFETCH candidates so the rerank cascade has a
+    larger pool to promote from, then returns the top k.
+    rerank_budget_ms bounds reranking latency (see RerankOrchestrator.rerank);
+    rerank_timings, if given, receives per-stage status and timing.
+    """
+    with tracing.span("recall_bricks", k=k) as span:
+        start = time.perf_counter()
+        with tracing.span("recall.embed"):
+            query_vec = _embedding_cache.get_or_compute(query, query_to_vector)
+        embedded = time.perf_counter()
+        log.debug("query embedded", extra={"shape": query_vec.shape, "index_dim": _local_index.index.d})
+        fetch_k = k * max(1, RECALL_OVERFETCH)
+        searching = time.perf_counter()
+        with tracing.span("recall.search", k=fetch_k):
+            distances, indices = _local_index.search(query_vec, fetch_k)
+        searched = time.perf_counter()
+
+        hits = []
+        flat_indices = indices.flatten().tolist()
+        flat_distances = distances.flatten().tolist()
+
+        for i, idx in enumerate(flat_indices):
+            if idx != -1 and idx < len(_local_index.brick_ids):
+                brick_id = _local_index.brick_ids[idx]
+                hits.append((brick_id, _normalize_distance_to_confidence(flat_distances[i])))
+
+        with tracing.span("recall.hydrate", bricks=len(hits)):
+            # Hydrate with text for reranker: one read per backing brick file
+            texts = _brick_store.get_brick_texts(brick_id for brick_id, _ in hits)
+
+            candidates = []
+            for brick_id, confidence in hits:
+                meta = _brick_store.get_brick_metadata(brick_id)
+                candidates.append({
+                    "brick_id": brick_id,
+                    "base_confidence": confidence,
+                    "brick_text": texts.get(brick_id, ""),
+                    # Content hash keys the rerank score cache
+                    "brick_hash": meta.get("hash") if meta else None
+                })
+        hydrated = time.perf_counter()
+
+        # Apply Reranker
+        reranked_results = _reranker.rerank(query, candidates, budget_ms=rerank_budget_ms, timings=rerank_timings)
+        reranked = time.perf_counter()
+        span.set(candidates=len(candidates),
+                 reranker_used=reranked_results[0].get("reranker_used", "none") if reranked_results else "none")
+    _EMBED_SECONDS.observe(embedded - start)
+    _SEARCH_SECONDS.observe(searched - searching)
+    _HYDRATE_SECONDS.observe(hydrated - searched)
+    _RERANK_SECONDS.observe(reranked - hydrated)
+    _RECALL_SECONDS.observe(reranked - start)
+    _RECALL_CANDIDATES.observe(len(candidates))
+
     # Map back to expected output format
     results = []
-    for res in reranked_results:
+    for res in reranked_results[:k]:
         results.append({
             "brick_id": res["brick_id"],
             "confidence": res.get("final_score", res["base_confidence"]),
@@ -67,16 +128,14 @@ def recall_bricks(query: str, k: int = 10) -> List[Dict]:
             
     return results
 
-def recall_bricks_readonly(query: str, k: int = 10) -> List[Dict]:
-    print("DEBUG recall invoked, query =", query)
-    import os
-    print("DEBUG CWD:", os.getcwd())
-
+def recall_bricks_readonly(query: str, k: int = 10, rerank_budget_ms: Optional[float] = None,
+                           rerank_timings: Optional[Dict] = None) -> List[Dict]:
+    log.debug("readonly recall", extra={"query": query})
 
     # This is essentially the same as recall_bricks, but explicitly marked as read-only
     # and intended for use by Cortex to prevent direct Nexus imports.
     # It ensures no mutation or side effects occur.
-    return recall_bricks(query, k)
+    return recall_bricks(query, k, rerank_budget_ms=rerank_budget_ms, rerank_timings=rerank_timings)
 
 def get_recall_brick_metadata(brick_id: str) -> Dict | None:
     """
@@ -88,3 +147,69 @@ def get_recall_brick_metadata(brick_id: str) -> Dict | None:
     """
     # Reuse the same loaded metadata store that recall_bricks depends on
     return _brick_store.get_brick_metadata(brick_id)
+
+def _resolve_span(meta: Dict, tree) -> Dict:
+    span = meta["source_span"]
+    message = tree.messages.get(span.get("message_id")) if tree is not None else None
+    block = None
+    idx = span.get("block_index")
+    if message is not None and idx is not None and 0 <= idx < len(message["blocks"]):
+        block = message["blocks"][idx]
+
+    return {
+        "source_file": meta["source_file"],
+        "source_span": span,
+        "hash": meta.get("hash"),
+        "message": message,
+        "block": block
+    }
+
+def get_recall_brick_source(brick_id: str) -> Optional[Dict]:
+    """
+    Brick metadata plus the source message and block its span points at,
+    served from the shared SourceReader cache.
+    Returns None for unknown bricks; "message" / "block" are None when the
+    span no longer resolves against the tree file.
+    Read-only. No persistence.
+    """
+    meta = _brick_store.get_brick_metadata(brick_id)
+    if not meta:
+        return None
+    return _resolve_span(meta, _source_reader.get_tree(meta["source_file"]))
+
+def get_recall_brick_sources(brick_ids: List[str]) -> Dict[str, Dict]:
+    """
+    Batched get_recall_brick_source: bricks are grouped by tree file and
+    each file is fetched (stat + cache, or parse) once.
+    Unknown bricks are omitted from the result. Read-only.
+    """
+    by_file: Dict[str, List] = {}
+    for brick_id in dict.fromkeys(brick_ids):
+        meta = _brick_store.get_brick_metadata(brick_id)
+        if meta:
+            by_file.setdefault(meta["source_file"], []).append((brick_id, meta))
+
+    sources = {}
+    for source_file, entries in by_file.items():
+        tree = _source_reader.get_tree(source_file)
+        for brick_id, meta in entries:
+            sources[brick_id] = _resolve_span(meta, tree)
+    return sources
+
+def get_recall_brick_blocks(brick_ids: List[str]) -> Dict[str, str]:
+    """
+    MODE-1 reload for Cortex: the raw source block each brick's span points
+    at, re-read from its tree file (grouped by file, via the SourceReader
+    cache). A brick is omitted if it is unknown, its span no longer
+    resolves to a text block, or the block no longer matches the hash
+    recorded at extraction (the source was edited since). Read-only.
+    """
+    blocks = {}
+    for brick_id, source in get_recall_brick_sources(brick_ids).items():
+        block = source["block"]
+        if not isinstance(block, str):
+            continue
+        if source["hash"] and hashlib.sha256(block.encode()).hexdigest() != source["hash"]:
+            continue
+        blocks[brick_id] = block
+    return blocks
@@ -1,7 +1,24 @@
 import json
 import os
-from typing import Dict, Optional
-from nexus.config import DATA_DIR
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from nexus.config import DATA_DIR, HYDRATION_MAX_WORKERS
+from nexus.observability import metrics, tracing
+
+_READ_SECONDS = metrics.histogram("nexus_brick_store_read_seconds", "BrickStore.get_brick_texts latency")
+_FILES_READ = metrics.counter("nexus_brick_store_files_read_total", "Brick files read for text hydration")
+_READ_ERRORS = metrics.counter("nexus_brick_store_read_errors_total", "Brick files that failed to read or parse")
+_BRICKS_LOADED = metrics.gauge("nexus_brick_store_bricks", "Bricks in the most recently loaded BrickStore")
+
+# Shared by all BrickStores; only used when a request spans several files
+_hydration_pool: Optional[ThreadPoolExecutor] = None
+
+def _get_hydration_pool() -> ThreadPoolExecutor:
+    global _hydration_pool
+    if _hydration_pool is None:
+        _hydration_pool = ThreadPoolExecutor(max_workers=HYDRATION_MAX_WORKERS, thread_name_prefix="hydrate")
+    return _hydration_pool
 
 class BrickStore:
     def __init__(self, bricks_dir: str = None):
@@ -32,10 +49,12 @@ class BrickStore:
                                 self.metadata_store[brick["brick_id"]] = {
                                     "source_file": brick["source_file"],
                                     "source_span": brick["source_span"],
+                                    "hash": brick.get("hash"),
                                     "file_path": path
                                 }
                     except Exception:
                         continue
+        _BRICKS_LOADED.set(len(self.metadata_store))
 
     def get_brick_metadata(self, brick_id: str) -> Optional[Dict]:
         return self.metadata_store.get(brick_id)
@@ -61,6 +80,49 @@ class BrickStore:
             return None
         return None
 
+    def get_brick_texts(self, brick_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Bulk version of get_brick_text.
+        Groups the requested bricks by backing file and reads each file once;
+        several files are read in parallel. Unknown bricks are omitted.
+        """
+        start = time.perf_counter()
+        by_file: Dict[str, set] = {}
+        for brick_id in brick_ids:
+            meta = self.get_brick_metadata(brick_id)
+            if meta and "file_path" in meta:
+                by_file.setdefault(meta["file_path"], set()).add(brick_id)
+
+        texts: Dict[str, str] = {}
+        with tracing.span("brick_store.read_files", files=len(by_file)) as span:
+            if len(by_file) > 1 and HYDRATION_MAX_WORKERS > 1:
+                chunks = _get_hydration_pool().map(lambda item: self._read_brick_file(*item), by_file.items())
+            else:
+                chunks = [self._read_brick_file(path, wanted) for path, wanted in by_file.items()]
+            for chunk in chunks:
+                texts.update(chunk)
+            span.set(bricks=len(texts))
+        _FILES_READ.inc(len(by_file))
+        _READ_SECONDS.observe(time.perf_counter() - start)
+        return texts
+
+    @staticmethod
+    def _read_brick_file(path: str, wanted: set) -> Dict[str, str]:
+        found = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                bricks_data = json.load(f)
+        except Exception:
+            _READ_ERRORS.inc()
+            return found
+        for brick in bricks_data:
+            if brick["brick_id"] in wanted and brick.get("content") is not None:
+                found[brick["brick_id"]] = brick["content"]
+        return found
+
+# Bump whenever query_to_vector changes so cached embeddings are invalidated
+EMBEDDER_VERSION = "sha256-default-rng-384-v2"
+
 # Placeholder for a deterministic query embedding function
 def query_to_vector(query: str) -> 'np.ndarray':
     # In a real system, this would use an actual embedding model
@@ -69,6 +131,8 @@ def query_to_vector(query: str) -> 'np.ndarray':
     import hashlib
 
     hash_val = int(hashlib.sha256(query.encode("utf-8")).hexdigest(), 16)
-    np.random.seed(hash_val % (2**32 - 1)) # Seed with part of the hash for determinism
+    # Local generator seeded with part of the hash: np.random.seed would
+    # reseed global state that other threads are drawing from
+    rng = np.random.default_rng(hash_val % (2**32 - 1))
     # Assuming dimension is 384 as per LocalVectorIndex
-    return np.random.random((1, 384)).astype("float32")
+    return rng.random((1, 384)).astype("float32")
@@ -2,6 +2,7 @@ import json
 import os
 import hashlib
 from typing import List, Dict
+from .source_reader import split_blocks
 
 def generate_brick_id(source_file: str, content: str, index: int) -> str:
     """Generate a unique, stable brick ID."""
@@ -28,7 +29,7 @@ def extract_bricks_from_file(tree_file_path: str, output_dir: str):
         # Split content into atomic paragraphs/blocks
         # Rule: One brick = one idea. For ChatGPT messages, 
         # double newlines are a good proxy for distinct ideas.
-        blocks = [b.strip() for b in content.split("\n\n") if b.strip()]
+        blocks = split_blocks(content)
         
         for idx, block in enumerate(blocks):
             brick_id = generate_brick_id(tree_file_path, block, idx)
@@ -0,0 +1,140 @@
+"""
+Cached access to extracted tree files (the raw source bricks point at).
+
+SourceReader keeps an LRU of parsed trees. Each cached tree has every
+message's content already split into blocks (the extractor's rule) and is
+indexed by message id, so resolving a (source_file, message_id, block_index)
+span costs one stat plus two lookups, whatever the conversation length.
+Entries are checked against the file's (mtime, size) on every access and
+reparsed when the file has changed.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from nexus.config import SOURCE_READER_CACHE_FILES, SOURCE_READER_CACHE_MAX_BYTES
+
+
+def split_blocks(content) -> List:
+    """
+    Splits message content into atomic blocks, as the extractor does.
+    String content is split on blank lines; list content is already blocks.
+    """
+    if isinstance(content, str):
+        return [b.strip() for b in content.split("\n\n") if b.strip()]
+    if isinstance(content, list):
+        return content
+    return []
+
+
+class SourceTree:
+    """One parsed tree file: message id -> {role, created_at, blocks}."""
+    def __init__(self, path: str, stamp: Tuple[int, int], tree: Dict):
+        self.path = path
+        self.stamp = stamp
+        self.messages: Dict[str, Dict] = {}
+        for msg in tree.get("messages", []):
+            if not isinstance(msg, dict):
+                continue
+            message_id = msg.get("message_id") or msg.get("id")
+            # First occurrence wins, like the old linear scan
+            if message_id is None or message_id in self.messages:
+                continue
+            self.messages[message_id] = {
+                "message_id": message_id,
+                "role": msg.get("role"),
+                "created_at": msg.get("created_at"),
+                "blocks": split_blocks(msg.get("content", "")),
+            }
+
+
+class SourceReader:
+    """
+    Thread-safe LRU of parsed tree files, bounded by file count and by the
+    total file size of the cached trees (max_bytes). A tree larger than
+    max_bytes is parsed and returned, but not cached.
+    Missing or unparsable files, and JSON that is not a tree object,
+    resolve to None (and are not cached).
+    """
+    def __init__(self, max_files: int = SOURCE_READER_CACHE_FILES,
+                 max_bytes: int = SOURCE_READER_CACHE_MAX_BYTES):
+        self.max_files = max(1, max_files)
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._trees: "OrderedDict[str, SourceTree]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_tree(self, path: str) -> Optional[SourceTree]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._evict(path)
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            cached = self._trees.get(path)
+            if cached is not None and cached.stamp == stamp:
+                self._trees.move_to_end(path)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        # Parse outside the lock; concurrent misses on one file may both parse
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            self._evict(path)
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get("messages", []), list):
+            # Valid JSON, but not a tree file
+            self._evict(path)
+            return None
+        parsed = SourceTree(path, stamp, data)
+
+        with self._lock:
+            self._remove(path)
+            if stamp[1] > self.max_bytes:
+                return parsed
+            self._trees[path] = parsed
+            self.current_bytes += stamp[1]
+            while len(self._trees) > self.max_files or self.current_bytes > self.max_bytes:
+                _, evicted = self._trees.popitem(last=False)
+                self.current_bytes -= evicted.stamp[1]
+        return parsed
+
+    def get_message(self, path: str, message_id: str) -> Optional[Dict]:
+        tree = self.get_tree(path)
+        if tree is None:
+            return None
+        return tree.messages.get(message_id)
+
+    def get_block(self, path: str, message_id: str, block_index: Optional[int]):
+        """The block a source span points at, or None if it doesn't resolve."""
+        message = self.get_message(path, message_id)
+        if message is None or block_index is None or not 0 <= block_index < len(message["blocks"]):
+            return None
+        return message["blocks"][block_index]
+
+    def clear(self):
+        with self._lock:
+            self._trees.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._trees)
+
+    def _evict(self, path: str):
+        with self._lock:
+            self._remove(path)
+
+    def _remove(self, path: str):
+        # Caller holds the lock
+        tree = self._trees.pop(path, None)
+        if tree is not None:
+            self.current_bytes -= tree.stamp[1]
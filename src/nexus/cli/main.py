@@ -6,6 +6,7 @@ from datetime import datetime, timezone
 
 from nexus.ask.recall import recall_bricks
 from nexus.bricks.brick_store import BrickStore
+from nexus.observability import logs, profiling
 # Cortex is now isolated, but we can still import it if it's in the python path or installed
 # For now, we adjust the import to match the new structure if needed, or assume it's available.
 try:
@@ -59,6 +60,53 @@ def cmd_sync(args):
     output_dir = "output/nexus"
     run_sync(input_file, output_dir)
 
+def cmd_graph_build(args):
+    """Subcommand: graph-build"""
+    from nexus.graph.builder import GraphBuilder, iter_brick_files
+    from nexus.config import GRAPH_DIR, GRAPH_STATE_PATH
+
+    bricks_dir = os.path.join(args.input, "bricks")
+    if not os.path.isdir(bricks_dir):
+        print(f"Error: Bricks directory {bricks_dir} does not exist.")
+        sys.exit(1)
+
+    state_path = args.state or GRAPH_STATE_PATH
+    if args.full and os.path.exists(state_path):
+        # A full rebuild starts from empty counts
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(state_path + suffix):
+                os.remove(state_path + suffix)
+
+    print(f"[{get_utc_now()}] Running 'graph-build'...")
+    builder = GraphBuilder(state_path)
+    try:
+        stats = builder.update(iter_brick_files(bricks_dir), args.output or GRAPH_DIR)
+    finally:
+        builder.close()
+    print(f"[{get_utc_now()}] Graph built: {json.dumps(stats)}")
+
+def cmd_rerank_service(args):
+    """Subcommand: rerank-service"""
+    from nexus.rerank.service import RerankService, load_local_stages
+    from nexus.config import RERANK_SERVICE_SOCKET
+
+    socket_path = args.socket or RERANK_SERVICE_SOCKET
+    if not socket_path:
+        print("Error: pass --socket or set NEXUS_RERANK_SOCKET.")
+        sys.exit(1)
+
+    stages = load_local_stages()
+    if not stages:
+        print("Error: no rerank models could be loaded.")
+        sys.exit(1)
+
+    service = RerankService(socket_path, stages, batch_window_ms=args.window_ms)
+    print(f"[{get_utc_now()}] Rerank service listening on {socket_path} (stages: {', '.join(sorted(stages))})")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
 def cmd_ask(args):
     """Subcommand: ask"""
     query = args.query
@@ -96,8 +144,8 @@ def cmd_ask(args):
                 metadata = _brick_store.get_brick_metadata(brick["brick_id"])
                 source_file = metadata.get("source_file", "N/A") if metadata else "N/A"
                 source_span = metadata.get("source_span", "N/A") if metadata else "N/A"
-                print(f"  {i+1}. Brick ID: {brick["brick_id"]}")
-                print(f"     Confidence: {brick["confidence"]:.4f}")
+                print(f"  {i+1}. Brick ID: {brick['brick_id']}")
+                print(f"     Confidence: {brick['confidence']:.4f}")
                 print(f"     Source: {source_file} (Span: {source_span})\n")
             
             # Governed Handoff to Cortex
@@ -107,10 +155,50 @@ def cmd_ask(args):
             agent_id = "nexus_cli_agent"
             cortex_brick_ids = [b["brick_id"] for b in recalled_bricks]
             
-            cortex_response = _cortex_api.generate(user_id, agent_id, query, cortex_brick_ids)
-            print(f"[{get_utc_now()}] Cortex Response: {cortex_response.get("response", "Error or no response from Cortex")}")
+            if args.no_stream:
+                cortex_response = _cortex_api.generate(user_id, agent_id, query, cortex_brick_ids)
+                print(f"[{get_utc_now()}] Cortex Response: {cortex_response.get('response', 'Error or no response from Cortex')}")
+            else:
+                _print_stream(_cortex_api.generate_stream(user_id, agent_id, query, cortex_brick_ids))
 
-def main():
+def cmd_profile(args):
+    """Subcommand: profile"""
+    from nexus.config import PROFILE_DIR
+
+    if not args.argv or args.argv[0] == "profile":
+        print("Error: give the command to profile, e.g. `nexus profile sync`.")
+        sys.exit(1)
+    if args.mode == "none" and not args.memory:
+        print("Error: --mode none needs --memory.")
+        sys.exit(1)
+
+    profiler = profiling.Profiler(
+        f"nexus-{args.argv[0]}", mode=None if args.mode == "none" else args.mode, memory=args.memory,
+        out_dir=args.out or PROFILE_DIR, interval_ms=args.interval_ms
+    )
+    print(f"[{get_utc_now()}] Profiling 'nexus {' '.join(args.argv)}' ({args.mode}{', memory' if args.memory else ''})...", file=sys.stderr)
+    try:
+        with profiler:
+            main(args.argv)
+    finally:
+        for path in profiler.written:
+            print(f"[{get_utc_now()}] Profile written: {path}", file=sys.stderr)
+
+def _print_stream(events):
+    """Prints generate_stream tokens as they arrive."""
+    started = False
+    for event in events:
+        if event["event"] == "token":
+            if not started:
+                print(f"[{get_utc_now()}] Cortex Response: ", end="", flush=True)
+                started = True
+            print(event["text"], end="", flush=True)
+        elif event["event"] == "error":
+            print(f"[{get_utc_now()}] Cortex Response: Error: {event.get('error', 'no response from Cortex')}")
+    if started:
+        print()
+
+def main(argv=None):
     parser = argparse.ArgumentParser(prog="nexus", description="Nexus Productivity Backbone CLI")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
@@ -130,19 +218,47 @@ def main():
     parser_sync = subparsers.add_parser("sync", help="Autonomous ingestion and sync daemon")
     parser_sync.set_defaults(func=cmd_sync)
 
+    # graph-build
+    parser_graph = subparsers.add_parser("graph-build", help="Build or update the concept graph from bricks")
+    parser_graph.add_argument("--input", default="output/nexus", help="Input directory (bricks)")
+    parser_graph.add_argument("--output", help="Graph directory (default: NEXUS_GRAPH_DIR)")
+    parser_graph.add_argument("--state", help="Builder state file (default: NEXUS_GRAPH_STATE_PATH)")
+    parser_graph.add_argument("--full", action="store_true", help="Discard the builder state and rebuild from all bricks")
+    parser_graph.set_defaults(func=cmd_graph_build)
+
+    # rerank-service
+    parser_rerank = subparsers.add_parser("rerank-service", help="Serve rerank models to all workers over a Unix socket")
+    parser_rerank.add_argument("--socket", help="Unix socket path (default: NEXUS_RERANK_SOCKET)")
+    parser_rerank.add_argument("--window-ms", type=float, default=2.0, help="Cross-request batching window (default 2ms)")
+    parser_rerank.set_defaults(func=cmd_rerank_service)
+
     # ask
     parser_ask = subparsers.add_parser("ask", help="Perform semantic recall and optionally generate answers")
     parser_ask.add_argument("query", help="The query text for semantic recall")
     parser_ask.add_argument("--json", action="store_true", help="Output results in strict JSON format")
     parser_ask.add_argument("--top-k", type=int, default=10, help="Number of top bricks to recall (default 5)")
+    parser_ask.add_argument("--no-stream", action="store_true", help="Print the Cortex response only once it is complete")
     parser_ask.set_defaults(func=cmd_ask)
 
-    args = parser.parse_args()
+    # profile
+    parser_profile = subparsers.add_parser("profile", help="Run another command under the CPU and/or allocation profiler")
+    parser_profile.add_argument("--mode", choices=profiling.MODES + ("none",), default="sample",
+                                help="CPU profiler: stack sampling (collapsed stacks), cProfile, or none (default sample)")
+    parser_profile.add_argument("--memory", action="store_true", help="Also record allocations with tracemalloc")
+    parser_profile.add_argument("--out", help="Output directory (default: NEXUS_PROFILE_DIR)")
+    parser_profile.add_argument("--interval-ms", type=float, default=5.0, help="Sampling interval (default 5ms)")
+    parser_profile.add_argument("argv", nargs=argparse.REMAINDER, help="The command to profile and its arguments")
+    parser_profile.set_defaults(func=cmd_profile)
+
+    args = parser.parse_args(argv)
 
     if not args.command:
         parser.print_help()
         sys.exit(0)
 
+    # Structured logs on stderr (stdout stays for command output)
+    logs.configure()
+
     # Execute command
     args.func(args)
 
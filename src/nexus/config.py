@@ -5,9 +5,16 @@ PACKAGE_ROOT = os.path.dirname(os.path.abspath(__file__))
 REPO_ROOT = os.path.dirname(os.path.dirname(PACKAGE_ROOT))
 
 # Data paths
-DATA_DIR = os.path.join(REPO_ROOT, "data")
+DATA_DIR = os.environ.get("NEXUS_DATA_DIR") or os.path.join(REPO_ROOT, "data")
 INDEX_PATH = os.path.join(DATA_DIR, "index", "index.faiss")
 BRICK_IDS_PATH = os.path.join(DATA_DIR, "brick_ids.json")
+TERM_INDEX_PATH = os.path.join(DATA_DIR, "index", "terms.npz")
+# Concept graph files (nodes.json, edges.json, index.md, anchors.override.json).
+# sync and graph-build write GRAPH_DIR, next to the builder state; until a
+# graph is built there, GraphStore serves the curated files bundled with the
+# package in GRAPH_BUNDLED_DIR, which nothing writes to.
+GRAPH_DIR = os.environ.get("NEXUS_GRAPH_DIR", os.path.join(DATA_DIR, "index", "graph"))
+GRAPH_BUNDLED_DIR = os.path.join(PACKAGE_ROOT, "graph")
 
 # Output paths (for synchronization/extraction)
 DEFAULT_OUTPUT_DIR = os.path.join(REPO_ROOT, "output", "nexus")
@@ -15,3 +22,173 @@ DEFAULT_OUTPUT_DIR = os.path.join(REPO_ROOT, "output", "nexus")
 # Constants
 MAX_FILENAME_LENGTH = 120
 DEFAULT_WALL_SIZE = 32000
+
+# Query embedding cache
+# Capped in bytes (vectors + keys), not entries. Set NEXUS_EMBEDDING_CACHE_DIR
+# to persist embeddings across restarts; the .npy files there are capped at
+# NEXUS_EMBEDDING_CACHE_DISK_MAX_BYTES, least recently used evicted first.
+EMBEDDING_CACHE_MAX_BYTES = int(os.environ.get("NEXUS_EMBEDDING_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+EMBEDDING_CACHE_DIR = os.environ.get("NEXUS_EMBEDDING_CACHE_DIR") or None
+EMBEDDING_CACHE_DISK_MAX_BYTES = int(os.environ.get("NEXUS_EMBEDDING_CACHE_DISK_MAX_BYTES", 512 * 1024 * 1024))
+
+# LLM reranker
+# "listwise" scores LLM_RERANK_BATCH_SIZE candidates per llama call;
+# "pointwise" is the legacy one-call-per-candidate prompt. Only pointwise
+# scores go through the rerank score cache (below).
+LLM_RERANK_MODE = os.environ.get("NEXUS_LLM_RERANK_MODE", "listwise")
+LLM_RERANK_BATCH_SIZE = int(os.environ.get("NEXUS_LLM_RERANK_BATCH_SIZE", 10))
+LLM_RERANK_PROMPT_CHARS = 4800  # Passage budget per listwise prompt (fits n_ctx=2048)
+
+# Rerank latency budgets (milliseconds). A stage that misses its deadline is
+# skipped and the next stage's result is used; the heuristic always runs.
+# None disables the deadline (CLI default).
+RERANK_BUDGET_MS = None
+ASK_PREVIEW_RERANK_BUDGET_MS = float(os.environ.get("NEXUS_ASK_PREVIEW_RERANK_BUDGET_MS", 300))
+
+# Rerank cascade
+# Recall over-fetches k * RECALL_OVERFETCH candidates from FAISS; the heuristic
+# scores all of them and each model stage only sees the top N of the previous
+# stage's ranking.
+RECALL_OVERFETCH = int(os.environ.get("NEXUS_RECALL_OVERFETCH", 5))
+RERANK_STAGE_TOP_N = {
+    "cross_encoder": int(os.environ.get("NEXUS_RERANK_CROSS_ENCODER_TOP_N", 30)),
+    "llm_reranker": int(os.environ.get("NEXUS_RERANK_LLM_TOP_N", 10)),
+}
+
+# Rerank score cache
+# Model scores keyed by (model id, exact query string, brick hash). The SQLite
+# tier is optional and shared between processes. Only pointwise scores are
+# cached: CrossEncoder scores always, LLM scores only with
+# NEXUS_LLM_RERANK_MODE=pointwise. Listwise LLM scores are never memoized.
+RERANK_SCORE_CACHE_SIZE = int(os.environ.get("NEXUS_RERANK_SCORE_CACHE_SIZE", 100_000))
+RERANK_SCORE_CACHE_PATH = os.environ.get("NEXUS_RERANK_SCORE_CACHE_PATH") or None
+
+# CrossEncoder inference
+# Pairs are sorted by length and predicted CROSS_ENCODER_BATCH_SIZE at a time
+# so short bricks are not padded to the longest one in the request. With
+# several server workers, set NEXUS_CROSS_ENCODER_THREADS to cores / workers.
+CROSS_ENCODER_MAX_LENGTH = int(os.environ.get("NEXUS_CROSS_ENCODER_MAX_LENGTH", 256))
+CROSS_ENCODER_BATCH_SIZE = int(os.environ.get("NEXUS_CROSS_ENCODER_BATCH_SIZE", 32))
+CROSS_ENCODER_NUM_THREADS = int(os.environ.get("NEXUS_CROSS_ENCODER_THREADS", 0)) or None
+CROSS_ENCODER_INT8 = os.environ.get("NEXUS_CROSS_ENCODER_INT8", "0") == "1"
+
+# Shared rerank service (see nexus.rerank.service / `nexus rerank-service`)
+# When set, RerankOrchestrator talks to the service on this Unix socket
+# instead of loading its own models.
+RERANK_SERVICE_SOCKET = os.environ.get("NEXUS_RERANK_SOCKET") or None
+
+# Candidate hydration: brick files read in parallel per recall request
+HYDRATION_MAX_WORKERS = int(os.environ.get("NEXUS_HYDRATION_MAX_WORKERS", 4))
+
+# Cortex production server (`python services/cortex serve`)
+# Workers are forked from a master that has already loaded the index, brick
+# store and rerank models, so they share that memory copy-on-write.
+CORTEX_BIND = os.environ.get("NEXUS_CORTEX_BIND", "127.0.0.1:5001")
+CORTEX_WORKERS = int(os.environ.get("NEXUS_CORTEX_WORKERS", 2))
+CORTEX_THREADS = int(os.environ.get("NEXUS_CORTEX_THREADS", 4))
+CORTEX_PIDFILE = os.environ.get("NEXUS_CORTEX_PIDFILE", os.path.join(DATA_DIR, "cortex.pid"))
+
+# Async Cortex (`python services/cortex serve-async`)
+# Recall, reranking and source reloads run on a pool of this many threads;
+# requests beyond that wait on the event loop instead of holding a thread.
+CORTEX_EXECUTOR_WORKERS = int(os.environ.get("NEXUS_CORTEX_EXECUTOR_WORKERS", 8))
+# Admission control (services/cortex/admission.py), applied per worker process.
+# Recall and generate requests run at most this many at a time, with up to
+# CORTEX_ADMISSION_QUEUE more waiting per route class for CORTEX_ADMISSION_TIMEOUT_S;
+# beyond that they get 503 + Retry-After instead of piling up.
+CORTEX_RECALL_CONCURRENCY = int(os.environ.get("NEXUS_CORTEX_RECALL_CONCURRENCY", 4))
+CORTEX_GENERATE_CONCURRENCY = int(os.environ.get("NEXUS_CORTEX_GENERATE_CONCURRENCY", 32))
+CORTEX_ADMISSION_QUEUE = int(os.environ.get("NEXUS_CORTEX_ADMISSION_QUEUE", 512))
+CORTEX_ADMISSION_TIMEOUT_S = float(os.environ.get("NEXUS_CORTEX_ADMISSION_TIMEOUT_S", 10))
+# Per-client token bucket (client = peer address): requests per second and
+# burst size; 0 disables it. Over the rate -> 429.
+CORTEX_RATE_LIMIT_RPS = float(os.environ.get("NEXUS_CORTEX_RATE_LIMIT_RPS", 0))
+CORTEX_RATE_LIMIT_BURST = float(os.environ.get("NEXUS_CORTEX_RATE_LIMIT_BURST", 20))
+# Key the bucket on the X-Client-Id header instead of the peer address. Only
+# set this behind a gateway that sets the header and strips callers' copies;
+# otherwise any caller can pick a fresh identity per request.
+CORTEX_TRUST_CLIENT_ID = os.environ.get("NEXUS_CORTEX_TRUST_CLIENT_ID", "0") == "1"
+# Generation backend (see services/cortex/model_client.py). Unset = simulated.
+CORTEX_MODEL_URL = os.environ.get("NEXUS_CORTEX_MODEL_URL") or None
+CORTEX_MODEL_NAME = os.environ.get("NEXUS_CORTEX_MODEL_NAME", "gpt-4o")
+CORTEX_MODEL_MAX_CONNECTIONS = int(os.environ.get("NEXUS_CORTEX_MODEL_MAX_CONNECTIONS", 32))
+CORTEX_MODEL_TIMEOUT_S = float(os.environ.get("NEXUS_CORTEX_MODEL_TIMEOUT_S", 60))
+# Per-token delay of the simulated model used when no backend is configured
+# (services/cortex/simulated.py); set it to measure streaming / time-to-first-token.
+CORTEX_SIMULATED_TOKEN_DELAY_MS = float(os.environ.get("NEXUS_CORTEX_SIMULATED_TOKEN_DELAY_MS", 0))
+
+# CortexAPI.route table: ordered rules of keywords -> agent/model, compiled into
+# one matcher (services/cortex/router.py) and re-read when the file changes.
+CORTEX_ROUTING_RULES_PATH = os.environ.get(
+    "NEXUS_CORTEX_ROUTING_RULES", os.path.join(REPO_ROOT, "services", "cortex", "routing_rules.json"))
+
+# Context injected by CortexAPI.generate: reloaded source blocks in brick order,
+# cut off at this many tokens (estimated as characters / 4).
+CORTEX_CONTEXT_TOKEN_BUDGET = int(os.environ.get("NEXUS_CORTEX_CONTEXT_TOKEN_BUDGET", 8000))
+
+# Cortex audit log (services/cortex/audit.py). Durability: async | write | fsync;
+# see the module docstring for what each mode survives. "async" keeps audit
+# I/O off the request path: rows are queued and written by a background
+# thread, and drained on exit. "write" / "fsync" make generate() wait until
+# its row is on file.
+CORTEX_AUDIT_DURABILITY = os.environ.get("NEXUS_CORTEX_AUDIT_DURABILITY", "async")
+CORTEX_AUDIT_FSYNC_INTERVAL_MS = float(os.environ.get("NEXUS_CORTEX_AUDIT_FSYNC_INTERVAL_MS", 1000))
+CORTEX_AUDIT_MAX_BYTES = int(os.environ.get("NEXUS_CORTEX_AUDIT_MAX_BYTES", 64 * 1024 * 1024))
+CORTEX_AUDIT_BACKUPS = int(os.environ.get("NEXUS_CORTEX_AUDIT_BACKUPS", 5))
+CORTEX_AUDIT_QUEUE_SIZE = int(os.environ.get("NEXUS_CORTEX_AUDIT_QUEUE_SIZE", 10_000))
+
+# Source tree cache (nexus.bricks.source_reader): parsed tree files kept in
+# memory for brick-meta / brick-full, revalidated by mtime and size. Bounded
+# by file count and by the trees' total size on disk; a parsed tree takes a
+# few times its file size in memory. Larger trees are read but not cached.
+SOURCE_READER_CACHE_FILES = int(os.environ.get("NEXUS_SOURCE_READER_CACHE_FILES", 256))
+SOURCE_READER_CACHE_MAX_BYTES = int(os.environ.get("NEXUS_SOURCE_READER_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Most brick ids accepted by one /jarvis/bricks-meta or /jarvis/bricks-full call
+BRICK_BATCH_MAX = int(os.environ.get("NEXUS_BRICK_BATCH_MAX", 200))
+
+# Concept graph queries (/jarvis/graph/*)
+GRAPH_PAGE_MAX = int(os.environ.get("NEXUS_GRAPH_PAGE_MAX", 1000))
+GRAPH_MAX_HOPS = int(os.environ.get("NEXUS_GRAPH_MAX_HOPS", 3))
+GRAPH_NEIGHBORHOOD_MAX_NODES = int(os.environ.get("NEXUS_GRAPH_NEIGHBORHOOD_MAX_NODES", 2000))
+
+# Concept graph builder (nexus.graph.builder): co-occurrence counts kept
+# between syncs, and the pruning applied when nodes.json / edges.json are written.
+GRAPH_STATE_PATH = os.environ.get("NEXUS_GRAPH_STATE_PATH", os.path.join(DATA_DIR, "index", "graph_state.sqlite"))
+GRAPH_MIN_DF = int(os.environ.get("NEXUS_GRAPH_MIN_DF", 3))
+GRAPH_TOP_K = int(os.environ.get("NEXUS_GRAPH_TOP_K", 10))
+GRAPH_MAX_NODES = int(os.environ.get("NEXUS_GRAPH_MAX_NODES", 50_000))
+
+# Metrics (nexus.observability.metrics): counters, gauges and latency
+# histograms for recall, reranking, brick reads and sync, served at /metrics
+# by Cortex. 0 turns updates into no-ops. Sync, which is not scraped, also
+# writes them to NEXUS_METRICS_TEXTFILE if set (node_exporter textfile format).
+METRICS_ENABLED = os.environ.get("NEXUS_METRICS", "1") != "0"
+METRICS_TEXTFILE = os.environ.get("NEXUS_METRICS_TEXTFILE") or None
+
+# Logging (nexus.observability.logs): level, "json" lines or "text", and the
+# file to write (default stderr). Records are written by a background thread.
+# Records below WARNING are kept for this fraction of requests (decided per
+# request ID, so a sampled request is logged in full).
+LOG_LEVEL = os.environ.get("NEXUS_LOG_LEVEL", "INFO")
+LOG_FORMAT = os.environ.get("NEXUS_LOG_FORMAT", "json")
+LOG_FILE = os.environ.get("NEXUS_LOG_FILE") or None
+LOG_SAMPLE_RATE = float(os.environ.get("NEXUS_LOG_SAMPLE_RATE", 1.0))
+
+# Tracing (nexus.observability.tracing): spans through recall, rerank and
+# generate. This fraction of requests is traced (decided when the root span
+# opens). Finished traces are kept in memory for /cortex/traces and appended
+# to NEXUS_TRACE_FILE, if set, in the Chrome trace event format.
+TRACE_SAMPLE_RATE = float(os.environ.get("NEXUS_TRACE_SAMPLE_RATE", 0.01))
+TRACE_FILE = os.environ.get("NEXUS_TRACE_FILE") or None
+TRACE_BUFFER = int(os.environ.get("NEXUS_TRACE_BUFFER", 100))
+
+# Profiling (nexus.observability.profiling), for the Cortex servers; the CLI
+# uses `nexus profile <command>`. NEXUS_PROFILE picks the CPU profiler:
+# "sample" (stack sampling, all threads, collapsed stacks for flamegraphs)
+# or "cprofile" (deterministic, per profiled section). NEXUS_PROFILE_MEMORY=1
+# adds tracemalloc allocation snapshots. Output goes to NEXUS_PROFILE_DIR
+# when the process exits. Unset, nothing is started.
+PROFILE_MODE = os.environ.get("NEXUS_PROFILE") or None
+PROFILE_MEMORY = os.environ.get("NEXUS_PROFILE_MEMORY", "0") != "0"
+PROFILE_DIR = os.environ.get("NEXUS_PROFILE_DIR", os.path.join(DATA_DIR, "profiles"))
+PROFILE_INTERVAL_MS = float(os.environ.get("NEXUS_PROFILE_INTERVAL_MS", 5))
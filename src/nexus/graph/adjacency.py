@@ -0,0 +1,147 @@
+"""
+In-memory adjacency index over the concept graph.
+
+Edges are stored once as int32 endpoint arrays, plus an undirected CSR
+(indptr / neighbor rows / edge ids) so a node's relations are a contiguous
+slice. Labels are kept sorted for prefix search. Backs the paginated and
+subgraph endpoints under /jarvis/graph/*.
+"""
+import bisect
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def _unwrap(data, key: str) -> List:
+    # nodes.json / edges.json may be a bare list or {"nodes": [...]} / {"edges": [...]}
+    if isinstance(data, dict):
+        data = data.get(key, [])
+    return data if isinstance(data, list) else []
+
+
+class GraphAdjacency:
+    def __init__(self, nodes, edges):
+        self.nodes: List[Dict] = [n for n in _unwrap(nodes, "nodes") if isinstance(n, dict) and "id" in n]
+        self.row_of: Dict[str, int] = {}
+        for row, node in enumerate(self.nodes):
+            self.row_of.setdefault(node["id"], row)
+        n = len(self.nodes)
+
+        # Edges whose endpoints are not nodes are dropped
+        src, dst, type_codes = [], [], []
+        self.edge_types: List[str] = []
+        type_code: Dict[str, int] = {}
+        for edge in _unwrap(edges, "edges"):
+            if not isinstance(edge, dict):
+                continue
+            s = self.row_of.get(edge.get("source"))
+            t = self.row_of.get(edge.get("target"))
+            if s is None or t is None:
+                continue
+            edge_type = edge.get("type", "")
+            if edge_type not in type_code:
+                type_code[edge_type] = len(self.edge_types)
+                self.edge_types.append(edge_type)
+            src.append(s)
+            dst.append(t)
+            type_codes.append(type_code[edge_type])
+        self.edge_src = np.asarray(src, dtype=np.int32)
+        self.edge_dst = np.asarray(dst, dtype=np.int32)
+        self.edge_type = np.asarray(type_codes, dtype=np.int32)
+
+        # Undirected CSR: each edge appears under both endpoints
+        m = len(self.edge_src)
+        rows = np.concatenate([self.edge_src, self.edge_dst])
+        order = np.argsort(rows, kind="stable")
+        self.neighbors = np.concatenate([self.edge_dst, self.edge_src])[order]
+        self.neighbor_edges = np.concatenate([np.arange(m, dtype=np.int32)] * 2)[order]
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=self.indptr[1:])
+
+        # Prefix search over lowercased labels (falls back to the id)
+        keyed = sorted((str(node.get("label") or node["id"]).lower(), row) for row, node in enumerate(self.nodes))
+        self._sorted_labels = [label for label, _ in keyed]
+        self._label_rows = [row for _, row in keyed]
+
+    @property
+    def node_count(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edge_src)
+
+    def edge(self, e: int) -> Dict:
+        return {
+            "source": self.nodes[self.edge_src[e]]["id"],
+            "target": self.nodes[self.edge_dst[e]]["id"],
+            "type": self.edge_types[self.edge_type[e]]
+        }
+
+    def degree(self, node_id: str) -> int:
+        row = self.row_of.get(node_id)
+        return 0 if row is None else int(self.indptr[row + 1] - self.indptr[row])
+
+    def list_nodes(self, offset: int, limit: int) -> List[Dict]:
+        return self.nodes[offset:offset + limit]
+
+    def list_edges(self, offset: int, limit: int) -> List[Dict]:
+        return [self.edge(e) for e in range(offset, min(offset + limit, self.edge_count))]
+
+    def search(self, prefix: str, limit: int) -> List[Dict]:
+        """Nodes whose label starts with prefix (case-insensitive), in label order."""
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._sorted_labels, prefix)
+        found = []
+        for i in range(start, len(self._sorted_labels)):
+            if len(found) >= limit or not self._sorted_labels[i].startswith(prefix):
+                break
+            found.append(self.nodes[self._label_rows[i]])
+        return found
+
+    def neighborhood(self, node_id: str, hops: int, max_nodes: int) -> Optional[Dict]:
+        """
+        Breadth-first k-hop neighborhood (edges taken as undirected), capped
+        at max_nodes. Returns the nodes with their hop distance and every
+        edge between returned nodes; None if node_id is unknown.
+        """
+        center = self.row_of.get(node_id)
+        if center is None:
+            return None
+
+        depth = {center: 0}
+        frontier = [center]
+        truncated = False
+        for hop in range(1, hops + 1):
+            if not frontier or truncated:
+                break
+            nxt = []
+            for row in frontier:
+                for neighbor in self.neighbors[self.indptr[row]:self.indptr[row + 1]].tolist():
+                    if neighbor in depth:
+                        continue
+                    if len(depth) >= max_nodes:
+                        truncated = True
+                        break
+                    depth[neighbor] = hop
+                    nxt.append(neighbor)
+                if truncated:
+                    break
+            frontier = nxt
+
+        # Edges with both endpoints inside the returned set
+        rows = np.fromiter(depth.keys(), dtype=np.int64, count=len(depth))
+        inside = np.zeros(self.node_count, dtype=bool)
+        inside[rows] = True
+        edge_ids = set()
+        for row in rows.tolist():
+            lo, hi = self.indptr[row], self.indptr[row + 1]
+            keep = inside[self.neighbors[lo:hi]]
+            edge_ids.update(self.neighbor_edges[lo:hi][keep].tolist())
+
+        return {
+            "center": node_id,
+            "nodes": [dict(self.nodes[row], depth=d) for row, d in depth.items()],
+            "edges": [self.edge(e) for e in sorted(edge_ids)],
+            "truncated": truncated
+        }
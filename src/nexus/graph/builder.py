@@ -0,0 +1,314 @@
+"""
+Concept graph builder: derives concept nodes and co-occurrence edges from
+bricks and writes nodes.json / edges.json for GraphStore.
+
+A concept is a content term (term_index.tokenize, minus stopwords, short and
+numeric tokens). Each brick contributes its most frequent terms and every
+pair of them once. Counts live in a SQLite state file, not in memory. Bricks
+are consumed in chunks; pair counts are summed in a dict keyed by packed
+term ids and upserted in key order whenever it reaches a fixed size, so
+memory is bounded by the chunk size and that cap, however large the corpus.
+Each node keeps only its top-k neighbours. An update re-ranks the terms
+that occur in new bricks, plus the terms co-occurring (min_count times or
+more) with a term whose df just reached min_df: that term is a new
+candidate in their top-k. The ranking is otherwise approximate. When a
+neighbour's df grows through bricks that do not contain a term, its weight
+in that term's top-k is not recomputed until the term itself is re-ranked.
+Re-ranking every neighbour of every changed term would touch most of the
+vocabulary on each update.
+"""
+import glob
+import json
+import os
+import sqlite3
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List
+
+from nexus.config import GRAPH_MAX_NODES, GRAPH_MIN_DF, GRAPH_STATE_PATH, GRAPH_TOP_K
+from nexus.rerank.term_index import tokenize
+from .store import EDGES_FILE, INDEX_FILE, NODES_FILE
+
+EDGE_TYPE = "co_occurs"
+
+STOPWORDS = frozenset("""
+about above after again against all also and any are aren because been before being below
+between both but can cannot could did didn does doesn doing don down during each even every
+few for from further get got had has have having her here hers herself him himself his how
+however into isn its itself just let like made make many may more most much must myself need
+nor not now off once one only other our ours ourselves out over own really same see she
+should shouldn so some such than that the their theirs them themselves then there these they
+thing things this those through too under until use used using very want was wasn way well
+were weren what when where which while who whom why will with without would wouldn yes yet
+you your yours yourself yourselves
+""".split())
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS terms ("
+    " id INTEGER PRIMARY KEY, term TEXT UNIQUE NOT NULL, df INTEGER NOT NULL DEFAULT 0)",
+    "CREATE INDEX IF NOT EXISTS terms_df ON terms (df)",
+    "CREATE TABLE IF NOT EXISTS bricks (brick_id TEXT PRIMARY KEY) WITHOUT ROWID",
+    # Unordered pairs stored once with a < b
+    "CREATE TABLE IF NOT EXISTS pairs ("
+    " a INTEGER NOT NULL, b INTEGER NOT NULL, count INTEGER NOT NULL,"
+    " PRIMARY KEY (a, b)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS pairs_b ON pairs (b)",
+    # First max_bricks_per_node bricks seen for each term
+    "CREATE TABLE IF NOT EXISTS term_bricks ("
+    " term_id INTEGER NOT NULL, brick_id TEXT NOT NULL,"
+    " PRIMARY KEY (term_id, brick_id)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS top_neighbors ("
+    " term_id INTEGER NOT NULL, neighbor_id INTEGER NOT NULL, count INTEGER NOT NULL,"
+    " PRIMARY KEY (term_id, neighbor_id)) WITHOUT ROWID",
+    # Terms touched since their top-k was last computed
+    "CREATE TABLE IF NOT EXISTS dirty (term_id INTEGER PRIMARY KEY)",
+)
+
+_SQL_BATCH = 500
+
+
+def _batches(items: List, size: int = _SQL_BATCH) -> Iterator[List]:
+    # Stay under SQLite's bound-parameter limit
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def concept_id(term: str) -> str:
+    return f"concept_{term}"
+
+
+def iter_brick_files(bricks_dir: str) -> Iterator[Dict]:
+    """Streams bricks from the extractor's <bricks_dir>/<conversation>/*_bricks.json files."""
+    for path in sorted(glob.glob(os.path.join(bricks_dir, "*", "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+
+
+class GraphBuilder:
+    def __init__(self, state_path: str = GRAPH_STATE_PATH, top_k: int = GRAPH_TOP_K,
+                 min_df: int = GRAPH_MIN_DF, max_nodes: int = GRAPH_MAX_NODES,
+                 max_terms_per_brick: int = 16, max_bricks_per_node: int = 20,
+                 min_count: int = 2, chunk_size: int = 5000, max_pending_pairs: int = 250_000,
+                 cache_mb: int = 64):
+        self.state_path = state_path
+        self.top_k = top_k
+        self.min_df = min_df
+        self.max_nodes = max_nodes
+        self.max_terms_per_brick = max_terms_per_brick
+        self.max_bricks_per_node = max_bricks_per_node
+        self.min_count = min_count
+        self.chunk_size = chunk_size
+        self.max_pending_pairs = max_pending_pairs
+
+        if state_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+        self._db = sqlite3.connect(state_path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(f"PRAGMA cache_size=-{cache_mb * 1024}")
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def brick_terms(self, content: str) -> List[str]:
+        """The concept terms a brick contributes: its most frequent content terms."""
+        counts = Counter(
+            t for t in tokenize(content)
+            if len(t) >= 3 and not t.isdigit() and t not in STOPWORDS
+        )
+        return [t for t, _ in counts.most_common(self.max_terms_per_brick)]
+
+    def add_bricks(self, bricks: Iterable[Dict]) -> int:
+        """
+        Counts bricks not seen before, chunk by chunk. Pair counts are summed
+        in memory across chunks and upserted once max_pending_pairs distinct
+        pairs are pending (and at the end), each flush in one transaction.
+        Returns the number of bricks added.
+        """
+        added = 0
+        chunk = []
+        # Hashed pair counter: (a, b) packed into one int, a < b
+        pairs: Counter = Counter()
+        try:
+            for brick in bricks:
+                chunk.append(brick)
+                if len(chunk) >= self.chunk_size:
+                    added += self._add_chunk(chunk, pairs)
+                    chunk = []
+                    if len(pairs) >= self.max_pending_pairs:
+                        self._flush(pairs)
+            if chunk:
+                added += self._add_chunk(chunk, pairs)
+            self._flush(pairs)
+        except BaseException:
+            self._db.rollback()
+            raise
+        return added
+
+    def _flush(self, pairs: Counter):
+        self._db.executemany(
+            "INSERT INTO pairs (a, b, count) VALUES (?, ?, ?) "
+            "ON CONFLICT (a, b) DO UPDATE SET count = count + excluded.count",
+            # In key order, so upserts walk the primary-key B-tree sequentially
+            [(key >> 32, key & 0xFFFFFFFF, pairs[key]) for key in sorted(pairs)]
+        )
+        pairs.clear()
+        self._db.commit()
+
+    def _add_chunk(self, chunk: List[Dict], pairs: Counter) -> int:
+        # Runs inside the transaction that the next _flush commits
+        ids = list({b["brick_id"]: None for b in chunk})
+        seen = set()
+        for batch in _batches(ids):
+            placeholders = ",".join("?" * len(batch))
+            seen.update(r[0] for r in self._db.execute(
+                f"SELECT brick_id FROM bricks WHERE brick_id IN ({placeholders})", batch))
+
+        new_bricks = []
+        for brick in chunk:
+            if brick["brick_id"] not in seen:
+                seen.add(brick["brick_id"])
+                new_bricks.append((brick["brick_id"], self.brick_terms(brick.get("content", ""))))
+        if not new_bricks:
+            return 0
+
+        vocab = sorted({t for _, terms in new_bricks for t in terms})
+        self._db.executemany("INSERT OR IGNORE INTO terms (term) VALUES (?)", [(t,) for t in vocab])
+        term_id, df_before = {}, {}
+        for batch in _batches(vocab):
+            placeholders = ",".join("?" * len(batch))
+            for tid, term, df in self._db.execute(
+                    f"SELECT id, term, df FROM terms WHERE term IN ({placeholders})", batch):
+                term_id[term] = tid
+                df_before[tid] = df
+
+        df_delta: Counter = Counter()
+        term_bricks = []
+        for brick_id, terms in new_bricks:
+            tids = sorted(term_id[t] for t in terms)
+            for i, a in enumerate(tids):
+                if df_before[a] + df_delta[a] < self.max_bricks_per_node:
+                    term_bricks.append((a, brick_id))
+                df_delta[a] += 1
+                for b in tids[i + 1:]:
+                    pairs[(a << 32) | b] += 1
+
+        self._db.executemany("INSERT INTO bricks (brick_id) VALUES (?)", [(b,) for b, _ in new_bricks])
+        self._db.executemany("UPDATE terms SET df = df + ? WHERE id = ?",
+                             [(d, tid) for tid, d in df_delta.items()])
+        self._db.executemany("INSERT OR IGNORE INTO term_bricks (term_id, brick_id) VALUES (?, ?)", term_bricks)
+        self._db.executemany("INSERT OR IGNORE INTO dirty (term_id) VALUES (?)", [(t,) for t in df_delta])
+        self._mark_neighbors_dirty(
+            [tid for tid, d in df_delta.items() if df_before[tid] < self.min_df <= df_before[tid] + d]
+        )
+        return len(new_bricks)
+
+    def _mark_neighbors_dirty(self, tids: List[int]):
+        # Terms that just became nodes are new top-k candidates for the terms
+        # they co-occur with. Pairs still pending in memory come from new
+        # bricks, whose terms are dirty already.
+        for batch in _batches(tids, _SQL_BATCH // 2):
+            placeholders = ",".join("?" * len(batch))
+            self._db.execute(
+                "INSERT OR IGNORE INTO dirty (term_id) "
+                f"SELECT b FROM pairs WHERE a IN ({placeholders}) AND count >= ? "
+                f"UNION SELECT a FROM pairs WHERE b IN ({placeholders}) AND count >= ?",
+                batch + [self.min_count] + batch + [self.min_count]
+            )
+
+    def refresh(self) -> int:
+        """
+        Recomputes the top-k neighbours of every dirty term. Neighbours are
+        nodes (df >= min_df) co-occurring at least min_count times, ranked
+        by count^2 / df(neighbour) so that ubiquitous terms do not crowd out
+        specific ones. Returns the number of terms re-ranked.
+        """
+        refreshed = 0
+        while True:
+            dirty = [r[0] for r in self._db.execute("SELECT term_id FROM dirty LIMIT ?", (_SQL_BATCH,))]
+            if not dirty:
+                return refreshed
+            with self._db:
+                for tid in dirty:
+                    rows = self._db.execute(
+                        "SELECT p.n, p.c FROM ("
+                        " SELECT b AS n, count AS c FROM pairs WHERE a = ?"
+                        " UNION ALL SELECT a AS n, count AS c FROM pairs WHERE b = ?"
+                        ") AS p JOIN terms ON terms.id = p.n "
+                        "WHERE terms.df >= ? AND p.c >= ? "
+                        "ORDER BY p.c * p.c * 1.0 / terms.df DESC, p.n LIMIT ?",
+                        (tid, tid, self.min_df, self.min_count, self.top_k)
+                    ).fetchall()
+                    self._db.execute("DELETE FROM top_neighbors WHERE term_id = ?", (tid,))
+                    self._db.executemany(
+                        "INSERT INTO top_neighbors (term_id, neighbor_id, count) VALUES (?, ?, ?)",
+                        [(tid, n, c) for n, c in rows]
+                    )
+                self._db.executemany("DELETE FROM dirty WHERE term_id = ?", [(t,) for t in dirty])
+            refreshed += len(dirty)
+
+    def write(self, graph_dir: str) -> Dict[str, int]:
+        """
+        Writes nodes.json and edges.json (each replaced atomically) for the
+        max_nodes most frequent terms with df >= min_df. An edge is kept if
+        either endpoint has the other in its top-k. Creates a stub index.md
+        if the directory has none; existing curated files are left alone.
+        """
+        os.makedirs(graph_dir, exist_ok=True)
+        nodes = self._db.execute(
+            "SELECT id, term, df FROM terms WHERE df >= ? ORDER BY df DESC, term LIMIT ?",
+            (self.min_df, self.max_nodes)
+        ).fetchall()
+        term_of = {tid: term for tid, term, _ in nodes}
+
+        def node_records():
+            for tid, term, df in nodes:
+                bricks = [r[0] for r in self._db.execute(
+                    "SELECT brick_id FROM term_bricks WHERE term_id = ? ORDER BY brick_id", (tid,))]
+                yield {"id": concept_id(term), "label": term, "bricks": bricks, "df": df}
+
+        edge_count = 0
+
+        def edge_records():
+            nonlocal edge_count
+            for a, b, count in self._db.execute(
+                    "SELECT MIN(term_id, neighbor_id) AS a, MAX(term_id, neighbor_id) AS b, MAX(count) "
+                    "FROM top_neighbors GROUP BY a, b ORDER BY a, b"):
+                if a in term_of and b in term_of:
+                    edge_count += 1
+                    yield {"source": concept_id(term_of[a]), "target": concept_id(term_of[b]),
+                           "type": EDGE_TYPE, "weight": count}
+
+        self._write_list(os.path.join(graph_dir, NODES_FILE), node_records())
+        self._write_list(os.path.join(graph_dir, EDGES_FILE), edge_records())
+
+        index_path = os.path.join(graph_dir, INDEX_FILE)
+        if not os.path.exists(index_path):
+            with open(index_path, "w", encoding="utf-8") as f:
+                f.write("# Concept Index\n")
+        return {"nodes": len(nodes), "edges": edge_count}
+
+    @staticmethod
+    def _write_list(path: str, records: Iterable[Dict]):
+        # One record per line, streamed to a temp file and swapped in
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("[")
+            for i, record in enumerate(records):
+                f.write(",\n" if i else "\n")
+                f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n]\n")
+        os.replace(tmp, path)
+
+    def update(self, bricks: Iterable[Dict], graph_dir: str) -> Dict[str, int]:
+        """Adds new bricks, re-ranks the terms they affected and rewrites the graph files."""
+        added = self.add_bricks(bricks)
+        refreshed = self.refresh()
+        if not refreshed and os.path.exists(os.path.join(graph_dir, NODES_FILE)):
+            # Nothing changed: leave the files (and GraphStore's ETag) alone
+            return {"bricks_added": added, "terms_refreshed": 0}
+        stats = self.write(graph_dir)
+        stats.update(bricks_added=added, terms_refreshed=refreshed)
+        return stats
@@ -0,0 +1,176 @@
+"""
+Precomputed concept-graph views for /jarvis/graph-index and /jarvis/graph/*.
+
+Files are read from the built graph directory, or from a read-only fallback
+directory (the curated graph bundled with the package) while the former
+lacks a required file.
+
+GraphStore reads nodes.json, edges.json, index.md and anchors.override.json
+only when one of them changes (mtime / size). It keeps the response body
+serialized and gzip-compressed, with a content-hash ETag per encoding. A request then
+costs a few stat calls, and a poll whose If-None-Match matches gets a 304.
+Read-only.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from nexus.config import GRAPH_DIR, GRAPH_BUNDLED_DIR
+from .adjacency import GraphAdjacency
+
+NODES_FILE = "nodes.json"
+EDGES_FILE = "edges.json"
+INDEX_FILE = "index.md"
+OVERRIDES_FILE = "anchors.override.json"
+
+
+class GraphPayload:
+    """One serialized graph-index response."""
+    def __init__(self, body: bytes):
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=6)
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        # The gzip body is a different representation: it gets its own strong tag
+        self.gzip_etag = self.etag[:-1] + '-gz"'
+
+    def matches(self, if_none_match: Optional[str], gzip: bool = False) -> bool:
+        """True if an If-None-Match header value covers this payload's identity (or gzip) body."""
+        if not if_none_match:
+            return False
+        etag = self.gzip_etag if gzip else self.etag
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return True
+            # Weak comparison: W/"x" matches "x"
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag == etag:
+                return True
+        return False
+
+
+class GraphSnapshot:
+    """
+    Every view of one version of the graph files, built together. The
+    parsed edge list is not kept (the adjacency index holds edges as
+    arrays), but the node dicts are: GraphAdjacency.nodes keeps every node
+    for the node and search views, next to their serialized copy in the
+    payload.
+    """
+    def __init__(self, data: Dict):
+        self.index_content: str = data["index_content"]
+        self.anchor_overrides: List = data["anchor_overrides"]
+        self.payload = GraphPayload(GraphStore._serialize(data))
+        self.adjacency = GraphAdjacency(data["nodes"], data["edges"])
+
+
+class GraphStore:
+    """
+    Graph files plus the views derived from them (serialized payload,
+    adjacency index). Views are built on first use, all at once, and
+    replaced as one snapshot when any file changes.
+    """
+    def __init__(self, graph_dir: str = GRAPH_DIR, fallback_dir: Optional[str] = None):
+        self.graph_dir = graph_dir
+        self.fallback_dir = fallback_dir
+        self.builds = 0
+        self._snapshot: Optional[GraphSnapshot] = None
+        self._stamp: Optional[Tuple] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "GraphStore":
+        """The built graph, falling back to the curated graph bundled with the package."""
+        return cls(GRAPH_DIR, fallback_dir=GRAPH_BUNDLED_DIR)
+
+    def _current_stamp(self) -> Optional[Tuple]:
+        """(directory, file stamps) of the first directory with every required file."""
+        for graph_dir in (self.graph_dir, self.fallback_dir):
+            if graph_dir is None:
+                continue
+            stamp = []
+            for name in (NODES_FILE, EDGES_FILE, INDEX_FILE, OVERRIDES_FILE):
+                try:
+                    st = os.stat(os.path.join(graph_dir, name))
+                    stamp.append((st.st_mtime_ns, st.st_size))
+                except OSError:
+                    if name != OVERRIDES_FILE:
+                        break
+                    stamp.append(None)
+            else:
+                return graph_dir, tuple(stamp)
+        return None
+
+    def snapshot(self) -> Optional[GraphSnapshot]:
+        """
+        Views of the current files, rebuilt if any graph file changed.
+        None if a required file is missing; parse errors propagate.
+        """
+        with self._lock:
+            stamp = self._current_stamp()
+            if stamp is None:
+                return None
+            if stamp != self._stamp or self._snapshot is None:
+                self._snapshot = GraphSnapshot(self._load(stamp[0]))
+                self._stamp = stamp
+                self.builds += 1
+            return self._snapshot
+
+    def get(self) -> Optional[GraphPayload]:
+        """The current graph-index payload (same rules as snapshot())."""
+        snapshot = self.snapshot()
+        return snapshot.payload if snapshot is not None else None
+
+    def adjacency(self) -> Optional[GraphAdjacency]:
+        """The adjacency index for the current files (same rules as snapshot())."""
+        snapshot = self.snapshot()
+        return snapshot.adjacency if snapshot is not None else None
+
+    def summary(self) -> Optional[Dict]:
+        """Everything in the graph-index payload except nodes and edges, plus their counts."""
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return None
+        return {
+            "index_content": snapshot.index_content,
+            "anchor_overrides": snapshot.anchor_overrides,
+            "node_count": snapshot.adjacency.node_count,
+            "edge_count": snapshot.adjacency.edge_count
+        }
+
+    @staticmethod
+    def _load(graph_dir: str) -> Dict:
+        def path(name):
+            return os.path.join(graph_dir, name)
+
+        with open(path(NODES_FILE), "r", encoding="utf-8") as f:
+            nodes = json.load(f)
+
+        with open(path(EDGES_FILE), "r", encoding="utf-8") as f:
+            edges = json.load(f)
+
+        with open(path(INDEX_FILE), "r", encoding="utf-8") as f:
+            index_content = f.read()
+
+        overrides = []
+        if os.path.exists(path(OVERRIDES_FILE)):
+            try:
+                with open(path(OVERRIDES_FILE), "r", encoding="utf-8") as f:
+                    overrides = json.load(f).get("overrides", [])
+            except Exception:
+                overrides = []
+
+        return {
+            "nodes": nodes,
+            "edges": edges,
+            "index_content": index_content,
+            "anchor_overrides": overrides
+        }
+
+    @staticmethod
+    def _serialize(payload: Dict) -> bytes:
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,240 @@
+"""
+Structured logging for Nexus and Cortex, on top of the stdlib logging module.
+
+Code logs through ordinary loggers, with fields passed as `extra`:
+
+    log = logging.getLogger(__name__)
+    log.debug("source reload", extra={"bricks": len(brick_ids)})
+
+A debug call below the configured level costs one cached level check, and
+its message is never formatted.
+
+configure() is called once by each entry point (CLI, Cortex servers). It
+sets the root logger to NEXUS_LOG_LEVEL and installs a QueueHandler, so
+callers only enqueue records. A writer thread formats them and writes them
+to stderr or NEXUS_LOG_FILE, draining the queue in batches with one write
+and flush per batch. JSON lines are the default format:
+
+    {"ts": "...", "level": "DEBUG", "logger": "nexus.ask.recall",
+     "msg": "source reload", "request_id": "9f1c...", "bricks": 12}
+
+Every record carries the current request ID, taken from a contextvar that
+the Cortex servers set per request (request_context). Records below
+WARNING are sampled at NEXUS_LOG_SAMPLE_RATE, decided once per request ID,
+so a request is either logged in full or not at all.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import uuid
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, Optional, Tuple
+
+from nexus.config import LOG_LEVEL, LOG_FORMAT, LOG_FILE, LOG_SAMPLE_RATE
+
+REQUEST_ID_HEADER = "X-Request-Id"
+
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("nexus_request_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def get_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def bind_request_id(request_id: Optional[str] = None) -> Tuple[str, contextvars.Token]:
+    """Sets the current request ID (a new one if None); unbind_request_id(token) undoes it."""
+    request_id = request_id or new_request_id()
+    return request_id, _request_id.set(request_id)
+
+
+def unbind_request_id(token: contextvars.Token):
+    _request_id.reset(token)
+
+
+@contextmanager
+def request_context(request_id: Optional[str] = None) -> Iterator[str]:
+    """Tags records logged inside the block (and in copied contexts) with request_id."""
+    request_id, token = bind_request_id(request_id)
+    try:
+        yield request_id
+    finally:
+        unbind_request_id(token)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Stamps the request ID on each record and samples records below WARNING.
+    Runs in the calling thread, before the record is queued.
+    """
+    def __init__(self, sample_rate: float = 1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = _request_id.get()
+        record.request_id = request_id
+        if self.sample_rate >= 1.0 or record.levelno >= logging.WARNING:
+            return True
+        if request_id is None:
+            return random.random() < self.sample_rate
+        return (zlib.crc32(request_id.encode()) % 10_000) < self.sample_rate * 10_000
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, msg, request_id, extra fields."""
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            payload["request_id"] = request_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Renders the message and traceback in the caller; formatting happens on the writer thread."""
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The record is not copied: handlers after this one see the same text
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _Writer:
+    """Background thread writing queued records in batches."""
+    _STOP = None
+    BATCH = 1024
+
+    def __init__(self, records: queue.SimpleQueue, stream, formatter: logging.Formatter, close_stream: bool):
+        self.queue = records
+        self.stream = stream
+        self.formatter = formatter
+        self.close_stream = close_stream
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="nexus-log-writer", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            self.queue.put(self._STOP)
+            self.thread.join()
+            self.thread = None
+        if self.close_stream:
+            self.stream.close()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.BATCH:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = self._STOP in batch
+            lines = []
+            for record in batch:
+                if record is not self._STOP:
+                    try:
+                        lines.append(self.formatter.format(record))
+                    except Exception:
+                        lines.append(json.dumps({"level": "ERROR", "msg": "unformattable log record",
+                                                 "logger": getattr(record, "name", None)}))
+            if lines:
+                try:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+                except (OSError, ValueError):
+                    pass
+            if stop:
+                return
+
+
+class _State:
+    writer: Optional[_Writer] = None
+    handler: Optional[_QueueHandler] = None
+    lock = threading.Lock()
+    atexit_registered = False
+
+
+def configure(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, path: Optional[str] = LOG_FILE,
+              sample_rate: float = LOG_SAMPLE_RATE):
+    """
+    Routes the root logger through a queue to a JSON (or text) writer on a
+    background thread. Calling it again replaces the previous setup.
+    """
+    with _State.lock:
+        shutdown()
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            stream, close_stream = open(path, "a", encoding="utf-8"), True
+        else:
+            stream, close_stream = sys.stderr, False
+        if fmt == "json":
+            formatter: logging.Formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+
+        handler = _QueueHandler(queue.SimpleQueue())
+        handler.addFilter(ContextFilter(sample_rate))
+        writer = _Writer(handler.queue, stream, formatter, close_stream)
+        writer.start()
+
+        root = logging.getLogger()
+        root.setLevel(level.upper())
+        root.addHandler(handler)
+        _State.handler, _State.writer = handler, writer
+        if not _State.atexit_registered:
+            # Flush what is still queued when the process exits
+            atexit.register(shutdown)
+            _State.atexit_registered = True
+
+
+def shutdown():
+    """Flushes queued records and stops the writer thread."""
+    if _State.writer is not None:
+        logging.getLogger().removeHandler(_State.handler)
+        _State.writer.stop()
+        _State.writer = _State.handler = None
+
+
+def after_fork():
+    """
+    Restarts the writer thread in a forked child (threads do not survive
+    fork). Records the parent had queued but not written are dropped.
+    """
+    writer = _State.writer
+    if writer is not None:
+        writer.queue = _State.handler.queue = queue.SimpleQueue()
+        writer.start()
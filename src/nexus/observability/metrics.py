@@ -0,0 +1,259 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and histograms, optionally labelled:
+
+    RECALL_SECONDS = histogram("nexus_recall_seconds", "End-to-end recall latency")
+    with RECALL_SECONDS.time():
+        ...
+    STAGE_SECONDS = histogram("nexus_recall_stage_seconds", "...", ("stage",))
+    STAGE_SECONDS.labels("search").observe(0.004)
+
+A labelled child is created once and then cached; instrumented code keeps
+it in a module constant so the hot path is one lock and a bisect. Gauges
+and counters may instead read a callable at scrape time (set_function),
+for values other objects already track.
+
+Values are per process: under gunicorn each worker exposes its own.
+NEXUS_METRICS=0 turns every update into a no-op. Processes that are not
+scraped (nexus sync) can write the registry to a textfile for
+node_exporter's textfile collector (write_textfile).
+"""
+import bisect
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from nexus.config import METRICS_ENABLED
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds: 0.5 ms .. 10 s, for request and stage latencies
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Child:
+    def __init__(self, registry: "Registry"):
+        self._registry = registry
+        self._lock = threading.Lock()
+        self._value = 0.0
+        self._fn: Optional[Callable[[], float]] = None
+
+    def set_function(self, fn: Callable[[], float]):
+        """Reads the value from fn at scrape time instead."""
+        self._fn = fn
+
+    def get(self) -> float:
+        if self._fn is not None:
+            try:
+                return float(self._fn())
+            except Exception:
+                return math.nan
+        return self._value
+
+
+class Counter(_Child):
+    def inc(self, amount: float = 1.0):
+        if not self._registry.enabled:
+            return
+        with self._lock:
+            self._value += amount
+
+
+class Gauge(_Child):
+    def set(self, value: float):
+        if not self._registry.enabled:
+            return
+        self._value = value
+
+    def inc(self, amount: float = 1.0):
+        if not self._registry.enabled:
+            return
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+
+class Histogram:
+    def __init__(self, registry: "Registry", buckets: Sequence[float]):
+        self._registry = registry
+        self._lock = threading.Lock()
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+
+    def observe(self, value: float):
+        if not self._registry.enabled:
+            return
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Cumulative bucket counts (last is +Inf, i.e. the total) and the sum."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        for i in range(1, len(counts)):
+            counts[i] += counts[i - 1]
+        return counts, total
+
+
+class Metric:
+    """A metric family: one child per label-value tuple."""
+    def __init__(self, registry: "Registry", kind: str, name: str, documentation: str,
+                 labelnames: Sequence[str], buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.registry = registry
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values: str):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    if self.kind == "histogram":
+                        child = Histogram(self.registry, self.buckets)
+                    else:
+                        child = (Counter if self.kind == "counter" else Gauge)(self.registry)
+                    self._children[key] = child
+        return child
+
+    # Unlabelled shortcuts
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def set_function(self, fn: Callable[[], float]):
+        self._default.set_function(fn)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        # Copied under the lock: labels() may add a child while we render
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in sorted(children):
+            if self.kind == "histogram":
+                counts, total = child.snapshot()
+                for bound, count in zip(self.buckets + (math.inf,), counts):
+                    le = 'le="' + _format_value(bound) + '"'
+                    lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, le)} {count}")
+                labels = _label_text(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {counts[-1]}")
+            else:
+                lines.append(f"{self.name}{_label_text(self.labelnames, key)} {_format_value(child.get())}")
+        return lines
+
+
+class Registry:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, kind: str, name: str, documentation: str, labelnames: Sequence[str],
+                       **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Metric(self, kind, name, documentation, labelnames, **kwargs)
+            elif metric.kind != kind or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered as a {metric.kind} {metric.labelnames}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Metric:
+        return self._get_or_create("counter", name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Metric:
+        return self._get_or_create("gauge", name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Metric:
+        return self._get_or_create("histogram", name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format (CONTENT_TYPE)."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """Atomically writes render() to path (node_exporter textfile collector)."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+# Process-wide default registry
+REGISTRY = Registry(enabled=METRICS_ENABLED)
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+render = REGISTRY.render
@@ -0,0 +1,248 @@
+"""
+Built-in CPU and allocation profiling.
+
+A Profiler runs one of two CPU profilers, optionally with tracemalloc:
+
+- "sample": a background thread reads every thread's stack each
+  interval_ms (sys._current_frames). It writes <name>-<pid>.folded in the
+  collapsed-stack format ("thread;section;frame;frame count" per line),
+  which flamegraph.pl, inferno and speedscope read. This is wall-clock
+  sampling, so threads blocked on I/O or locks show up as well.
+- "cprofile": deterministic cProfile of the starting thread, plus each
+  profiled section entered on other threads. Writes <name>-<pid>.prof and
+  <name>-<pid>-<section>.prof (pstats; snakeviz, flameprof).
+- memory=True: tracemalloc from start to stop. Writes
+  <name>-<pid>.alloc.folded (live bytes by allocation stack, for
+  flamegraphs) and <name>-<pid>.alloc.txt (top allocating lines).
+
+Hot paths are marked as sections (@profiled("recall")). With no active
+profiler a section costs one global check. `nexus profile <command>` wraps
+a CLI command. The Cortex servers call start_from_env(), which starts a
+profiler only when NEXUS_PROFILE or NEXUS_PROFILE_MEMORY is set and writes
+the output when the process (or gunicorn worker) exits.
+"""
+import atexit
+import cProfile
+import functools
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from nexus.config import PROFILE_MODE, PROFILE_MEMORY, PROFILE_DIR, PROFILE_INTERVAL_MS
+
+MODES = ("sample", "cprofile")
+
+# The active profiler; sections are no-ops while it is None
+_active: Optional["Profiler"] = None
+
+
+class _Sampler(threading.Thread):
+    """Samples every other thread's stack into collapsed-stack counts."""
+    def __init__(self, interval_s: float, sections: Dict[int, str]):
+        super().__init__(name="nexus-profile-sampler", daemon=True)
+        self.interval_s = interval_s
+        self.sections = sections
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+        self._labels: Dict = {}
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            label = self._labels[code] = f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval_s):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(self.sections.get(ident) or "-")
+                stack.append(names.get(ident, str(ident)))
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class Profiler:
+    def __init__(self, name: str, mode: Optional[str] = "sample", memory: bool = False,
+                 out_dir: str = PROFILE_DIR, interval_ms: float = PROFILE_INTERVAL_MS,
+                 memory_frames: int = 32):
+        if mode not in MODES + (None,):
+            raise ValueError(f"unknown profile mode {mode!r} (expected one of {', '.join(MODES)})")
+        self.name = name
+        self.mode = mode
+        self.memory = memory
+        self.out_dir = out_dir
+        self.interval_ms = interval_ms
+        self.memory_frames = memory_frames
+        # Section each thread is in, read by the sampler
+        self._sections: Dict[int, str] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._section_stats: Dict[str, pstats.Stats] = {}
+        self._sampler: Optional[_Sampler] = None
+        self._main_profile: Optional[cProfile.Profile] = None
+        self._started_tracemalloc = False
+        self.written: List[str] = []
+
+    def start(self) -> "Profiler":
+        global _active
+        if _active is not None:
+            raise RuntimeError("a profiler is already running")
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(self.memory_frames)
+            self._started_tracemalloc = True
+        if self.mode == "sample":
+            self._sampler = _Sampler(self.interval_ms / 1000.0, self._sections)
+            self._sampler.start()
+        elif self.mode == "cprofile":
+            self._main_profile = cProfile.Profile()
+            self._local.profiling = True
+            self._main_profile.enable()
+        _active = self
+        return self
+
+    def stop(self) -> List[str]:
+        """Stops profiling and writes the output files; returns their paths."""
+        global _active
+        if _active is not self:
+            return []
+        _active = None
+        if self._main_profile is not None:
+            self._main_profile.disable()
+            self._local.profiling = False
+        if self._sampler is not None:
+            self._sampler.stop()
+        snapshot = None
+        if self.memory and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ))
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+        self.written = self._write(snapshot)
+        return self.written
+
+    def __enter__(self) -> "Profiler":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def section(self, name: str, fn: Callable, *args, **kwargs):
+        """Runs fn inside a named section of this profile."""
+        ident = threading.get_ident()
+        outer = self._sections.get(ident)
+        self._sections[ident] = name
+        profile = None
+        if self.mode == "cprofile" and not getattr(self._local, "profiling", False):
+            # cProfile hooks one thread; a section on another thread gets its own
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                self._local.profiling = True
+            except ValueError:
+                # Python 3.12+ allows one active cProfile per process
+                profile = None
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._local.profiling = False
+                with self._lock:
+                    if name in self._section_stats:
+                        self._section_stats[name].add(profile)
+                    else:
+                        self._section_stats[name] = pstats.Stats(profile)
+            if outer is None:
+                self._sections.pop(ident, None)
+            else:
+                self._sections[ident] = outer
+
+    def _write(self, snapshot: Optional[tracemalloc.Snapshot]) -> List[str]:
+        os.makedirs(self.out_dir, exist_ok=True)
+        prefix = os.path.join(self.out_dir, f"{self.name}-{os.getpid()}")
+        written = []
+        if self._sampler is not None:
+            with open(prefix + ".folded", "w", encoding="utf-8") as f:
+                for stack, count in self._sampler.counts.most_common():
+                    f.write(f"{stack} {count}\n")
+            written.append(prefix + ".folded")
+        if self._main_profile is not None:
+            self._main_profile.dump_stats(prefix + ".prof")
+            written.append(prefix + ".prof")
+        for section, stats in self._section_stats.items():
+            stats.dump_stats(f"{prefix}-{section}.prof")
+            written.append(f"{prefix}-{section}.prof")
+        if snapshot is not None:
+            written.extend(self._write_allocations(snapshot, prefix))
+        return written
+
+    @staticmethod
+    def _write_allocations(snapshot: tracemalloc.Snapshot, prefix: str, top: int = 50) -> List[str]:
+        with open(prefix + ".alloc.folded", "w", encoding="utf-8") as f:
+            for stat in snapshot.statistics("traceback"):
+                # Traceback frames run from the oldest call to the allocation site
+                stack = ";".join(f"{os.path.basename(fr.filename)}:{fr.lineno}" for fr in stat.traceback)
+                f.write(f"{stack} {stat.size}\n")
+        with open(prefix + ".alloc.txt", "w", encoding="utf-8") as f:
+            stats = snapshot.statistics("lineno")
+            f.write(f"# live: {sum(s.size for s in stats)} bytes in {sum(s.count for s in stats)} blocks\n")
+            for stat in stats[:top]:
+                frame = stat.traceback[0]
+                f.write(f"{stat.size:>12} B {stat.count:>8} blocks  {frame.filename}:{frame.lineno}\n")
+        return [prefix + ".alloc.folded", prefix + ".alloc.txt"]
+
+
+def profiled(section: str):
+    """Marks a function as a profile section; a plain call when no profiler is active."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return fn(*args, **kwargs)
+            return profiler.section(section, fn, *args, **kwargs)
+        return inner
+    return wrap
+
+
+def active() -> Optional[Profiler]:
+    return _active
+
+
+def start_from_env(name: str) -> Optional[Profiler]:
+    """
+    Starts a process-wide profiler if NEXUS_PROFILE / NEXUS_PROFILE_MEMORY
+    ask for one (output written at exit). Returns it, or None.
+    """
+    if not (PROFILE_MODE or PROFILE_MEMORY) or _active is not None:
+        return None
+    profiler = Profiler(name, mode=PROFILE_MODE, memory=PROFILE_MEMORY).start()
+    atexit.register(profiler.stop)
+    return profiler
+
+
+def stop() -> List[str]:
+    """Stops the active profiler, if any, and writes its output."""
+    profiler = _active
+    return profiler.stop() if profiler is not None else []
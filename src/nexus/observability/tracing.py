@@ -0,0 +1,219 @@
+"""
+Request tracing: timed spans with parent/child links and attributes.
+
+    with tracing.span("recall_bricks", k=k) as span:
+        ...
+        span.set(candidates=len(candidates))
+
+The current span lives in a contextvar. Spans opened inside it become its
+children, including on executor threads that run in a copied context (the
+async Cortex server's run_blocking). A span opened with no current span is
+the root of a new trace. Its trace ID is the request ID when there is one
+(nexus.observability.logs), so traces and log lines can be matched.
+
+Sampling is decided once, at the root: NEXUS_TRACE_SAMPLE_RATE of traces
+are recorded. In the rest, every span is a shared no-op object, and opening
+one costs a contextvar lookup. When a recorded root span ends, the trace is
+added to an in-memory ring (recent(), served at /cortex/traces). If
+NEXUS_TRACE_FILE is set, it is also appended there as Chrome trace events
+("X" complete events in the JSON array format, where the closing bracket
+is optional). The file opens in chrome://tracing or ui.perfetto.dev.
+"""
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from nexus.config import TRACE_SAMPLE_RATE, TRACE_FILE, TRACE_BUFFER
+from nexus.observability import logs
+
+# perf_counter_ns is monotonic but has no epoch; shift it to wall time once
+_WALL_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+
+class _Trace:
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List["Span"] = []
+
+
+class Span:
+    __slots__ = ("name", "trace", "span_id", "parent_id", "start_ns", "end_ns", "attrs", "tid")
+
+    def __init__(self, name: str, trace: _Trace, parent_id: Optional[int], attrs: Dict):
+        self.name = name
+        self.trace = trace
+        self.span_id = random.getrandbits(63)
+        self.parent_id = parent_id
+        self.attrs = attrs
+        self.tid = threading.get_native_id()
+        self.end_ns: Optional[int] = None
+        self.start_ns = time.perf_counter_ns()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e6
+
+    def to_chrome(self, pid: int) -> Dict:
+        return {
+            "name": self.name, "ph": "X", "pid": pid, "tid": self.tid,
+            "ts": (self.start_ns + _WALL_OFFSET_NS) / 1000,
+            "dur": ((self.end_ns or self.start_ns) - self.start_ns) / 1000,
+            "args": {"trace_id": self.trace.trace_id, "span_id": self.span_id,
+                     "parent_id": self.parent_id, **self.attrs},
+        }
+
+
+class _NoopSpan:
+    """Stands in for every span of an unsampled trace."""
+    __slots__ = ()
+    name = None
+    duration_ms = None
+
+    def set(self, **attrs):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _NoopScope:
+    """span() inside an unsampled trace: the current span is already NOOP_SPAN."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return NOOP_SPAN
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+class _Scope:
+    __slots__ = ("tracer", "name", "attrs", "span", "token")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.span, self.token = self.tracer.start_span(self.name, **self.attrs)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.span.set(error=exc_type.__name__)
+        self.tracer.end_span(self.span, self.token)
+        return False
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("nexus_span", default=None)
+
+
+def current_span():
+    """The innermost open span: a Span, NOOP_SPAN in an unsampled trace, or None."""
+    return _current.get()
+
+
+class Tracer:
+    def __init__(self, sample_rate: float = TRACE_SAMPLE_RATE, path: Optional[str] = TRACE_FILE,
+                 buffer: int = TRACE_BUFFER):
+        self.sample_rate = sample_rate
+        self.path = path
+        self._recent: deque = deque(maxlen=buffer)
+        self._pid = os.getpid()
+
+    def start_span(self, name: str, **attrs) -> Tuple[object, contextvars.Token]:
+        """Opens a span and makes it current; end_span(span, token) closes it."""
+        parent = _current.get()
+        if parent is None:
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                return NOOP_SPAN, _current.set(NOOP_SPAN)
+            span = Span(name, _Trace(logs.get_request_id() or logs.new_request_id()), None, attrs)
+        elif parent is NOOP_SPAN:
+            return NOOP_SPAN, _current.set(NOOP_SPAN)
+        else:
+            span = Span(name, parent.trace, parent.span_id, attrs)
+        return span, _current.set(span)
+
+    def end_span(self, span, token: contextvars.Token):
+        _current.reset(token)
+        if span is NOOP_SPAN:
+            return
+        span.end_ns = time.perf_counter_ns()
+        span.trace.spans.append(span)
+        if span.parent_id is None:
+            self._finish(span.trace)
+
+    def span(self, name: str, **attrs):
+        """Context manager for start_span/end_span; records the exception type on error."""
+        if _current.get() is NOOP_SPAN:
+            return _NOOP_SCOPE
+        return _Scope(self, name, attrs)
+
+    def _finish(self, trace: _Trace):
+        self._recent.append(trace)
+        if self.path:
+            try:
+                self._append(trace)
+            except OSError:
+                pass
+
+    def _append(self, trace: _Trace):
+        try:
+            # Whoever creates the file writes the opening bracket
+            fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            os.write(fd, b"[\n")
+        except FileExistsError:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        try:
+            # One write per trace, so concurrent writers (gunicorn workers) do not interleave
+            os.write(fd, "".join(json.dumps(s.to_chrome(self._pid), default=str) + ",\n"
+                                 for s in trace.spans).encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict]:
+        """Finished traces, newest last: [{"trace_id", "spans": [...]}]."""
+        traces = list(self._recent)[-limit:] if limit else list(self._recent)
+        return [{"trace_id": t.trace_id,
+                 "spans": [{"name": s.name, "span_id": s.span_id, "parent_id": s.parent_id,
+                            "ms": round(s.duration_ms, 3), **s.attrs} for s in t.spans]}
+                for t in traces]
+
+    def chrome_trace(self, limit: Optional[int] = None) -> Dict:
+        """The recent traces as a Chrome trace JSON object."""
+        traces = list(self._recent)[-limit:] if limit else list(self._recent)
+        return {"traceEvents": [s.to_chrome(self._pid) for t in traces for s in t.spans],
+                "displayTimeUnit": "ms"}
+
+    def after_fork(self):
+        self._pid = os.getpid()
+        self._recent.clear()
+
+
+def read_trace_file(path: str) -> List[Dict]:
+    """Events of a NEXUS_TRACE_FILE (an unterminated JSON array)."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read().rstrip()
+    if not text:
+        return []
+    return json.loads(text.rstrip(",") + ("" if text.endswith("]") else "]"))
+
+
+TRACER = Tracer()
+span = TRACER.span
+start_span = TRACER.start_span
+end_span = TRACER.end_span
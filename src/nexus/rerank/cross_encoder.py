@@ -1,17 +1,56 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+
+from nexus.config import (
+    CROSS_ENCODER_MAX_LENGTH, CROSS_ENCODER_BATCH_SIZE, CROSS_ENCODER_NUM_THREADS, CROSS_ENCODER_INT8
+)
+from .score_cache import ScoreCache, candidate_hash
+
+DEFAULT_CROSS_ENCODER_MODEL = 'cross-encoder/ms-marco-TinyBERT-L-2-v2'
 
 class CrossEncoderReranker:
     """
     Secondary reranker (Fallback).
     Uses sentence-transformers CrossEncoder.
+    Raw logits are memoized in an optional ScoreCache.
+
+    Pairs are bucketed by length and predicted batch_size at a time, with
+    inputs truncated to max_length tokens. num_threads pins torch intra-op
+    threads; int8 applies dynamic quantization to the Linear layers (CPU).
     """
-    def __init__(self):
+    def __init__(self, model_name: str = DEFAULT_CROSS_ENCODER_MODEL, model=None,
+                 score_cache: Optional[ScoreCache] = None,
+                 max_length: int = CROSS_ENCODER_MAX_LENGTH,
+                 batch_size: int = CROSS_ENCODER_BATCH_SIZE,
+                 num_threads: Optional[int] = CROSS_ENCODER_NUM_THREADS,
+                 int8: bool = CROSS_ENCODER_INT8,
+                 length_buckets: bool = True):
+        self.model_id = f"cross_encoder:{model_name}:{max_length}" + (":int8" if int8 else "")
+        self.score_cache = score_cache
+        self.max_length = max_length
+        self.batch_size = max(1, batch_size)
+        self.length_buckets = length_buckets
+
+        if model is not None:
+            # Injected model (tests, benchmarks, shared instances)
+            self.model = model
+            return
+
         try:
             from sentence_transformers import CrossEncoder
             import torch
             # Lightweight model, deterministic on CPU
             torch.manual_seed(42)
-            self.model = CrossEncoder('cross-encoder/ms-marco-TinyBERT-L-2-v2') 
+            if num_threads:
+                # Default is one thread per core, which oversubscribes the
+                # CPU when several server workers each hold a model
+                torch.set_num_threads(num_threads)
+            self.model = CrossEncoder(model_name, max_length=max_length)
+            if int8:
+                # In place: on sentence-transformers >= 5 CrossEncoder is a
+                # Sequential and assigning .model would add a stage instead
+                torch.quantization.quantize_dynamic(
+                    self.model.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+                )
         except ImportError:
             raise ImportError("sentence_transformers or torch not installed")
         except Exception as e:
@@ -23,33 +62,78 @@ class CrossEncoderReranker:
         """
         if not candidates:
             return candidates
-            
-        # Prepare pairs
-        pairs = [[query, c.get("brick_text", "")] for c in candidates]
-        
-        # Predict
-        scores = self.model.predict(pairs)
-        
+        return self.rank_many([(query, candidates)])[0]
+
+    def rank_many(self, requests: List[Tuple[str, List[Dict]]]) -> List[List[Dict]]:
+        """
+        Ranks several (query, candidates) requests with one pooled predict
+        call, so concurrent callers share batches (see nexus.rerank.service).
+        """
+        # Text past max_length tokens is truncated by the model anyway, so
+        # don't pay to tokenize it (~8 chars per token is generous)
+        max_chars = self.max_length * 8
+        all_scores = []
+        pending = []
+        pairs = []
+        for r, (query, candidates) in enumerate(requests):
+            hashes = [candidate_hash(c) for c in candidates] if self.score_cache is not None else []
+            cached = self.score_cache.get_many(self.model_id, query, hashes) if hashes else {}
+            scores = [cached.get(h) for h in hashes] if hashes else [None] * len(candidates)
+            for i, score in enumerate(scores):
+                if score is None:
+                    pending.append((r, i))
+                    pairs.append([query, candidates[i].get("brick_text", "")[:max_chars]])
+            all_scores.append(scores)
+
+        # Predict (only uncached pairs reach the model)
+        fresh = {}
+        for (r, i), score in zip(pending, self.predict_pairs(pairs)):
+            all_scores[r][i] = score
+            fresh.setdefault(r, {})[candidate_hash(requests[r][1][i])] = score
+        if self.score_cache is not None:
+            for r, scores in fresh.items():
+                self.score_cache.put_many(self.model_id, requests[r][0], scores)
+
+        return [self._apply_scores(candidates, all_scores[r]) for r, (_, candidates) in enumerate(requests)]
+
+    def _apply_scores(self, candidates: List[Dict], scores: List[float]) -> List[Dict]:
         # Normalize scores to [0, 1] for consistency
         # Logits can be anything, but we want a confident float.
         # Sigmoid is standard for cross-encoder logits if not already applied.
         # But for ranking, relative order matters. We'll do simple MinMax over the batch.
-        
+
         if len(scores) > 0:
             min_s = float(min(scores))
             max_s = float(max(scores))
             range_s = max_s - min_s
-            
+
             for i, cand in enumerate(candidates):
                 raw_score = float(scores[i])
                 if range_s > 0:
                     norm_score = (raw_score - min_s) / range_s
                 else:
                     norm_score = 0.5
-                
+
                 cand["final_score"] = norm_score
                 cand["reranker_used"] = "cross_encoder"
-        
+
         # Sort
         candidates.sort(key=lambda x: x["final_score"], reverse=True)
         return candidates
+
+    def predict_pairs(self, pairs: List[List[str]]) -> List[float]:
+        """Raw logits for (query, text) pairs, predicted in length-sorted batches."""
+        if not pairs:
+            return []
+        order = list(range(len(pairs)))
+        if self.length_buckets:
+            order.sort(key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+
+        scores = [0.0] * len(pairs)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            preds = self.model.predict([pairs[i] for i in batch], batch_size=len(batch),
+                                       show_progress_bar=False)
+            for i, score in zip(batch, preds):
+                scores[i] = float(score)
+        return scores
@@ -1,44 +1,78 @@
-import re
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from .term_index import TermIndex, contains_phrase, tokenize
 
 class HeuristicReranker:
     """
     Tertiary reranker (Safety Net).
     Uses token overlap and span proximity.
-    Always available, zero dependencies.
+    Always available, no model dependencies.
+
+    Candidates present in the sync-time TermIndex are scored as one NumPy
+    batch; anything else (or everything, without an index) falls back to
+    tokenizing the candidate text. Both paths apply the same rules: overlap
+    counts distinct query tokens, and the exact phrase is the query's
+    tokens as a contiguous run of whole tokens ("apple pie" does not match
+    "pineapple pie"), so one batch is scored consistently.
     """
-    
+    def __init__(self, term_index: Optional[TermIndex] = None):
+        self.term_index = term_index
+
     def rank(self, query: str, candidates: List[Dict]) -> List[Dict]:
         """
         Ranks candidates based on heuristic signals.
         Returns modified list with 'final_score' and 'reranker_used'.
         """
-        query_tokens = set(re.findall(r'\w+', query.lower()))
-        
+        query_token_list = tokenize(query)
+        query_tokens = set(query_token_list)
+
+        indexed = []
+        if self.term_index is not None and query_token_list:
+            indexed = [c for c in candidates if c.get("brick_id") in self.term_index]
+        if indexed:
+            self._rank_indexed(query_token_list, indexed)
+
+        indexed_ids = {id(c) for c in indexed}
         for cand in candidates:
-            text = cand.get("brick_text", "").lower()
+            if id(cand) in indexed_ids:
+                continue
+            token_list = tokenize(cand.get("brick_text", ""))
             score = 0.0
-            
+
             # 1. Token Overlap
             # Simple intersection count
-            tokens = set(re.findall(r'\w+', text))
-            overlap = query_tokens.intersection(tokens)
+            overlap = query_tokens.intersection(token_list)
             # Normalize by query length to keep somewhat bounded
             if query_tokens:
                 score += (len(overlap) / len(query_tokens)) * 0.5
-            
-            # 2. Exact Phrase Match (Boost)
-            if query.lower() in text:
+
+            # 2. Exact Phrase Match (Boost), on whole tokens
+            if contains_phrase(token_list, query_token_list):
                 score += 0.4
-                
+
             # 3. Base Confidence Preservation (small factor)
             # If heuristic is weak, trust original vector recall slightly
             score += cand.get("base_confidence", 0.0) * 0.1
-                
+
             # Clamp to [0, 1]
             cand["final_score"] = max(0.0, min(1.0, score))
             cand["reranker_used"] = "heuristic"
-            
+
         # Sort descending by score
         candidates.sort(key=lambda x: x["final_score"], reverse=True)
         return candidates
+
+    def _rank_indexed(self, query_token_list: List[str], candidates: List[Dict]):
+        """Same signals as the text path, computed for the whole batch at once."""
+        overlap, phrase = self.term_index.score_batch(query_token_list, [c["brick_id"] for c in candidates])
+        base = np.fromiter((c.get("base_confidence", 0.0) for c in candidates), dtype=np.float64,
+                           count=len(candidates))
+
+        scores = (overlap / len(set(query_token_list))) * 0.5 + phrase * 0.4 + base * 0.1
+        scores = np.clip(scores, 0.0, 1.0)
+
+        for cand, score in zip(candidates, scores.tolist()):
+            cand["final_score"] = score
+            cand["reranker_used"] = "heuristic"
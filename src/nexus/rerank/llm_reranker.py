@@ -1,16 +1,46 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import os
+import re
+
+from nexus.config import LLM_RERANK_MODE, LLM_RERANK_BATCH_SIZE, LLM_RERANK_PROMPT_CHARS
+from .score_cache import ScoreCache
+
+_SCORE_RE = re.compile(r"0\.\d+|1\.0|0|1")
+# Matches "3: 0.8", "[3] 0.8", "3 = 0.8" ... one per line of listwise output
+_LISTWISE_LINE_RE = re.compile(r"^\s*\[?(\d+)\]?\s*[:=\-]?\s*(0?\.\d+|1(?:\.0+)?|0)\b", re.MULTILINE)
 
 class LlmReranker:
     """
     Primary reranker.
     Uses local quantized LLM (e.g., via llama-cpp-python).
+
+    In "listwise" mode candidates are scored batch_size at a time with one
+    prompt, so the query and instructions are evaluated once per batch
+    instead of once per candidate. A listwise score depends on the other
+    passages in the batch, so it is not cached. Pointwise scores are
+    memoized in an optional ScoreCache, so only unseen (query, brick) pairs
+    reach the model.
     """
-    def __init__(self, model_path: str = "models/llama-3-8b-quantized.gguf"):
+    def __init__(self, model_path: str = "models/llama-3-8b-quantized.gguf", llm=None,
+                 mode: str = LLM_RERANK_MODE, batch_size: int = LLM_RERANK_BATCH_SIZE,
+                 score_cache: Optional[ScoreCache] = None):
+        if mode not in ("listwise", "pointwise"):
+            raise ValueError(f"Unknown LLM rerank mode: {mode}")
+        self.mode = mode
+        self.batch_size = max(1, batch_size)
+        self.score_cache = score_cache
+        # Listwise and pointwise prompts can score the same pair differently
+        self.model_id = f"llm_reranker:{os.path.basename(model_path)}:{mode}"
+
+        if llm is not None:
+            # Injected model (tests, benchmarks, shared instances)
+            self.llm = llm
+            return
+
         if not os.path.exists(model_path):
              # If model not found, fail fast so Orchestrator picks fallback
             raise FileNotFoundError(f"Model file not found at {model_path}")
-            
+
         try:
             from llama_cpp import Llama
             # Initialize with deterministic settings
@@ -31,35 +61,86 @@ class LlmReranker:
         """
         if not candidates:
             return candidates
-            
-        for cand in candidates:
-            text = cand.get("brick_text", "")
-            # Truncate text to avoid context overflow
-            prompt = f"""Query: {query}
-Text: {text[:800]}
-Rate relevance (0.0-1.0):"""
-            
-            try:
-                output = self.llm(
-                    prompt, 
-                    max_tokens=6, 
-                    stop=["\n"], 
-                    echo=False,
-                    temperature=0.0 # Deterministic
-                )
-                score_str = output['choices'][0]['text'].strip()
-                # Parse float, handle potential extra chars
-                import re
-                match = re.search(r"0\.\d+|1\.0|0|1", score_str)
-                if match:
-                    score = float(match.group(0))
-                else:
-                    score = 0.0
-            except Exception:
-                score = 0.0
-                
+
+        if self.score_cache is not None and self.mode == "pointwise":
+            scores = self.score_cache.score(self.model_id, query, candidates,
+                                            lambda cands: self._score(query, cands))
+        else:
+            scores = self._score(query, candidates)
+
+        for cand, score in zip(candidates, scores):
             cand["final_score"] = max(0.0, min(1.0, score))
             cand["reranker_used"] = "llm_reranker"
-            
+
         candidates.sort(key=lambda x: x["final_score"], reverse=True)
         return candidates
+
+    def _score(self, query: str, candidates: List[Dict]) -> List[float]:
+        if self.mode == "listwise":
+            scores = []
+            for start in range(0, len(candidates), self.batch_size):
+                batch = candidates[start:start + self.batch_size]
+                scores.extend(self._score_listwise(query, batch))
+            return scores
+        return [self._score_pointwise(query, c.get("brick_text", "")) for c in candidates]
+
+    def _score_pointwise(self, query: str, text: str) -> float:
+        # Query comes first so llama-cpp can reuse the cached prefix between calls
+        # Truncate text to avoid context overflow
+        prompt = f"""Query: {query}
+Text: {text[:800]}
+Rate relevance (0.0-1.0):"""
+
+        try:
+            output = self.llm(
+                prompt,
+                max_tokens=6,
+                stop=["\n"],
+                echo=False,
+                temperature=0.0 # Deterministic
+            )
+            score_str = output['choices'][0]['text'].strip()
+            # Parse float, handle potential extra chars
+            match = _SCORE_RE.search(score_str)
+            if match:
+                return float(match.group(0))
+        except Exception:
+            pass
+        return 0.0
+
+    def _score_listwise(self, query: str, batch: List[Dict]) -> List[float]:
+        """
+        Scores a batch of candidates with a single prompt.
+        Candidates whose score line is missing from the output are retried pointwise.
+        """
+        # Share the prompt budget between passages so the batch fits in context
+        per_passage = min(800, LLM_RERANK_PROMPT_CHARS // len(batch))
+        passages = "\n".join(
+            f"[{i}] {c.get('brick_text', '')[:per_passage]}".replace("\n\n", "\n")
+            for i, c in enumerate(batch, start=1)
+        )
+        prompt = f"""Query: {query}
+Rate the relevance of each passage to the query from 0.0 to 1.0.
+{passages}
+Answer with one line per passage in the form "<number>: <score>".
+Scores:
+"""
+
+        parsed = {}
+        try:
+            output = self.llm(
+                prompt,
+                max_tokens=8 * len(batch) + 8,
+                stop=["\n\n"],
+                echo=False,
+                temperature=0.0 # Deterministic
+            )
+            for idx, score in _LISTWISE_LINE_RE.findall(output['choices'][0]['text']):
+                parsed.setdefault(int(idx), float(score))
+        except Exception:
+            parsed = {}
+
+        return [
+            parsed[i] if i in parsed else self._score_pointwise(query, c.get("brick_text", ""))
+            for i, c in enumerate(batch, start=1)
+        ]
@@ -1,56 +1,175 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import logging
+import time
 
 from .llm_reranker import LlmReranker
 from .cross_encoder import CrossEncoderReranker
 from .heuristic import HeuristicReranker
+from .score_cache import ScoreCache
+from .term_index import TermIndex
+from nexus.config import (
+    RERANK_BUDGET_MS, RERANK_STAGE_TOP_N, RERANK_SCORE_CACHE_SIZE, RERANK_SCORE_CACHE_PATH,
+    TERM_INDEX_PATH, RERANK_SERVICE_SOCKET
+)
+from nexus.observability import metrics, tracing
+
+_STAGE_SECONDS = metrics.histogram(
+    "nexus_rerank_stage_seconds", "Rerank cascade stage latency, by outcome (ok|error|timeout|skipped)",
+    ("stage", "status")
+)
+_RERANKER_USED = metrics.counter(
+    "nexus_rerank_requests_total", "Rerank requests, by the stage that ranked the top result", ("reranker",)
+)
+
+def _above(head: List[Dict], tail: List[Dict]) -> List[Dict]:
+    """Maps a stage's head scores into [max tail score, 1], keeping the stage's own score."""
+    floor = max((c.get("final_score", 0.0) for c in tail), default=0.0)
+    for c in head:
+        score = max(0.0, min(1.0, c.get("final_score", 0.0)))
+        c["stage_score"] = score
+        c["final_score"] = floor + score * (1.0 - floor)
+    return head
 
 class RerankOrchestrator:
     """
-    Manages the 3-stage reranking pipeline.
-    Try (2) LLM -> (1) CrossEncoder -> (3) Heuristic
+    Manages the 3-stage reranking cascade.
+    (3) Heuristic over all candidates -> (1) CrossEncoder on the top N
+    -> (2) LLM on the top N of that. Each stage only refines the head of the
+    previous stage's ranking; candidates below the cut keep their earlier
+    order behind the head. A stage that is missing or fails leaves the
+    previous ranking in place.
+
+    final_score is one scale down the whole list and never increases
+    along it. Each stage scores its head in [0, 1] on its own scale (kept
+    as stage_score). The head's scores are then mapped into
+    [best tail score, 1], above the candidates it did not see. So a
+    confidence is comparable with its neighbours, and reranker_used names
+    the stage that placed each candidate.
+
+    With a latency budget, each model stage runs on its own worker thread
+    and is abandoned once the request deadline passes, so the best ranking
+    completed within budget is returned.
+
+    If RERANK_SERVICE_SOCKET is set, the model stages are clients of the
+    shared rerank service rather than per-process model copies.
     """
-    def __init__(self):
+    def __init__(self, budget_ms: Optional[float] = RERANK_BUDGET_MS,
+                 stage_top_n: Optional[Dict[str, int]] = None):
+        self.budget_ms = budget_ms
+        self.stage_top_n = dict(RERANK_STAGE_TOP_N if stage_top_n is None else stage_top_n)
         self.primary = None
         self.secondary = None
-        self.tertiary = HeuristicReranker() # Always safe
-        
+        self.tertiary = HeuristicReranker(TermIndex.load_if_exists(TERM_INDEX_PATH)) # Always safe
+        # Shared by both model stages; keys include the model id
+        self.score_cache = ScoreCache(RERANK_SCORE_CACHE_SIZE, RERANK_SCORE_CACHE_PATH)
+        # One worker per local model stage: models are not thread-safe, and a
+        # stage that is still busy from a timed-out request just queues.
+        # Remote stages declare more so the service can batch across requests.
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+
+        if RERANK_SERVICE_SOCKET:
+            from .service import remote_stages
+            remote = remote_stages(RERANK_SERVICE_SOCKET)
+            self.primary = remote.get("llm_reranker")
+            self.secondary = remote.get("cross_encoder")
+            return
+
         # Try loading Primary
         try:
-            self.primary = LlmReranker()
+            self.primary = LlmReranker(score_cache=self.score_cache)
         except Exception:
             # Silent fallback during init
             pass
-            
+
         # Try loading Secondary
         try:
-            self.secondary = CrossEncoderReranker()
+            self.secondary = CrossEncoderReranker(score_cache=self.score_cache)
         except Exception:
             # Silent fallback during init
             pass
 
-    def rerank(self, query: str, candidates: List[Dict]) -> List[Dict]:
+    def rerank(self, query: str, candidates: List[Dict], budget_ms: Optional[float] = None,
+               timings: Optional[Dict] = None) -> List[Dict]:
         """
-        Executes reranking with fallback logic.
+        Executes the reranking cascade.
+        budget_ms overrides the orchestrator default for this request.
+        If timings is given it is filled with {stage: {"status", "ms", "n"}}.
         """
         if not candidates:
             return candidates
 
-        # 1. Try Primary (LLM)
-        if self.primary:
-            try:
-                return self.primary.rank(query, candidates)
-            except Exception:
-                # Fallback to next
-                pass
-                
-        # 2. Try Secondary (CrossEncoder)
-        if self.secondary:
+        if budget_ms is None:
+            budget_ms = self.budget_ms
+        deadline = time.monotonic() + budget_ms / 1000.0 if budget_ms is not None else None
+        if timings is None:
+            timings = {}
+
+        with tracing.span("rerank", candidates=len(candidates), budget_ms=budget_ms) as span:
+            # 1. Cheap pass over the full (over-fetched) candidate set
+            with tracing.span("rerank.heuristic", n=len(candidates)):
+                start = time.perf_counter()
+                ranked = self.tertiary.rank(query, candidates)
+                timings["heuristic"] = {"status": "ok", "ms": (time.perf_counter() - start) * 1000, "n": len(ranked)}
+
+            # 2. Progressively narrower, more expensive stages
+            for name, stage in (("cross_encoder", self.secondary), ("llm_reranker", self.primary)):
+                if stage is None:
+                    continue
+                top_n = self.stage_top_n.get(name)
+                head = ranked[:top_n] if top_n else ranked
+                tail = ranked[len(head):]
+                with tracing.span(f"rerank.{name}", n=len(head)) as stage_span:
+                    result = self._run_stage(name, stage, query, head, deadline, timings)
+                    stage_span.set(status=timings[name]["status"])
+                timings[name]["n"] = len(head)
+                if result is not None:
+                    ranked = _above(result, tail) + tail
+            span.set(reranker_used=ranked[0].get("reranker_used", "none"))
+
+        for name, timing in timings.items():
+            _STAGE_SECONDS.labels(name, timing["status"]).observe(timing["ms"] / 1000.0)
+        _RERANKER_USED.labels(ranked[0].get("reranker_used", "none")).inc()
+        return ranked
+
+    def _run_stage(self, name: str, stage, query: str, candidates: List[Dict],
+                   deadline: Optional[float], timings: Dict) -> Optional[List[Dict]]:
+        """Runs one model stage; returns None if it failed or missed the deadline."""
+        start = time.perf_counter()
+
+        if deadline is None:
             try:
-                return self.secondary.rank(query, candidates)
+                result = stage.rank(query, candidates)
+                timings[name] = {"status": "ok", "ms": (time.perf_counter() - start) * 1000}
+                return result
             except Exception:
                 # Fallback to next
-                pass
-                
-        # 3. Fallback to Tertiary (Heuristic)
-        return self.tertiary.rank(query, candidates)
+                timings[name] = {"status": "error", "ms": (time.perf_counter() - start) * 1000}
+                return None
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timings[name] = {"status": "skipped", "ms": 0.0}
+            return None
+
+        executor = self._executors.get(name)
+        if executor is None:
+            executor = self._executors.setdefault(
+                name, ThreadPoolExecutor(max_workers=getattr(stage, "max_concurrency", 1),
+                                         thread_name_prefix=f"rerank-{name}")
+            )
+
+        # Stages mutate and sort in place; an abandoned stage must not touch
+        # the dicts that a later stage returns.
+        future = executor.submit(stage.rank, query, [dict(c) for c in candidates])
+        try:
+            result = future.result(timeout=remaining)
+            timings[name] = {"status": "ok", "ms": (time.perf_counter() - start) * 1000}
+            return result
+        except FutureTimeoutError:
+            future.cancel()
+            logging.getLogger(__name__).warning("Reranker %s exceeded deadline, skipping", name)
+            timings[name] = {"status": "timeout", "ms": (time.perf_counter() - start) * 1000}
+        except Exception:
+            timings[name] = {"status": "error", "ms": (time.perf_counter() - start) * 1000}
+        return None
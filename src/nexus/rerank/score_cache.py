@@ -0,0 +1,142 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+def candidate_hash(cand: Dict) -> str:
+    """Brick content hash; falls back to hashing the text like the extractor does."""
+    brick_hash = cand.get("brick_hash")
+    if brick_hash:
+        return brick_hash
+    return hashlib.sha256(cand.get("brick_text", "").encode()).hexdigest()
+
+class ScoreCache:
+    """
+    Rerank score cache keyed by (model id, query, brick hash).
+    In-memory LRU in front of an optional on-disk SQLite tier.
+    The query is the exact string the model scores; case or whitespace
+    differences are different keys. Only pointwise scores belong here: a
+    score must be a pure function of the key, so entries never need
+    invalidating. The LLM reranker therefore memoizes in pointwise mode
+    only; its listwise scores depend on the rest of the batch and are
+    never cached.
+    """
+    def __init__(self, max_entries: int = 100_000, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        if db_path:
+            self._connect()
+
+    def _connect(self):
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+        # WAL lets several Cortex workers read while one writes
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            " model_id TEXT NOT NULL, query TEXT NOT NULL, brick_hash TEXT NOT NULL,"
+            " score REAL NOT NULL, PRIMARY KEY (model_id, query, brick_hash)"
+            ") WITHOUT ROWID"
+        )
+        self._db.commit()
+
+    def after_fork(self):
+        """
+        Opens a fresh SQLite connection in a forked child. Connections must
+        not be shared across fork; the inherited one is dropped, not closed.
+        """
+        if self._db is not None:
+            self._lock = threading.Lock()
+            self._connect()
+
+    def get_many(self, model_id: str, query: str, hashes: List[str]) -> Dict[str, float]:
+        found = {}
+        missing = []
+        with self._lock:
+            for h in hashes:
+                key = (model_id, query, h)
+                score = self._entries.get(key)
+                if score is None:
+                    missing.append(h)
+                else:
+                    self._entries.move_to_end(key)
+                    found[h] = score
+
+            if missing and self._db is not None:
+                from_disk = self._read_db(model_id, query, missing)
+                for h, score in from_disk.items():
+                    self._insert((model_id, query, h), score)
+                found.update(from_disk)
+
+            self.hits += len(found)
+            self.misses += len(hashes) - len(found)
+        return found
+
+    def put_many(self, model_id: str, query: str, scores: Dict[str, float]):
+        if not scores:
+            return
+        with self._lock:
+            for h, score in scores.items():
+                self._insert((model_id, query, h), float(score))
+            if self._db is not None:
+                try:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO scores (model_id, query, brick_hash, score) VALUES (?, ?, ?, ?)",
+                        [(model_id, query, h, float(s)) for h, s in scores.items()]
+                    )
+                    self._db.commit()
+                except sqlite3.Error:
+                    # Disk tier is best-effort (e.g. locked by another writer)
+                    pass
+
+    def score(self, model_id: str, query: str, candidates: List[Dict],
+              score_fn: Callable[[List[Dict]], List[float]]) -> List[float]:
+        """
+        Returns one score per candidate, calling score_fn only for candidates
+        that are not cached yet.
+        """
+        hashes = [candidate_hash(c) for c in candidates]
+        cached = self.get_many(model_id, query, hashes)
+
+        pending = [i for i, h in enumerate(hashes) if h not in cached]
+        if pending:
+            fresh = score_fn([candidates[i] for i in pending])
+            new_scores = {hashes[i]: float(s) for i, s in zip(pending, fresh)}
+            self.put_many(model_id, query, new_scores)
+            cached.update(new_scores)
+
+        return [cached[h] for h in hashes]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _insert(self, key: Tuple[str, str, str], score: float):
+        # Caller holds the lock
+        self._entries[key] = score
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_db(self, model_id: str, query: str, hashes: List[str]) -> Dict[str, float]:
+        found = {}
+        try:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._db.execute(
+                    f"SELECT brick_hash, score FROM scores WHERE model_id = ? AND query = ? "
+                    f"AND brick_hash IN ({placeholders})",
+                    [model_id, query, *chunk]
+                ).fetchall()
+                found.update(rows)
+        except sqlite3.Error:
+            pass
+        return found
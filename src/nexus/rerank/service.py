@@ -0,0 +1,287 @@
+"""
+Shared rerank model service.
+
+One long-lived process holds the CrossEncoder / LLM rerankers and serves
+every Cortex worker and CLI call over a Unix socket, instead of each process
+loading its own copy in RerankOrchestrator.__init__. Requests that arrive
+within a short window are scored together, so concurrent callers share
+model batches.
+
+Wire format: 4-byte big-endian length prefix + UTF-8 JSON, both directions.
+"""
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+# Only these candidate fields cross the socket
+_WIRE_FIELDS = ("brick_id", "brick_text", "brick_hash", "base_confidence")
+
+def _send(sock: socket.socket, obj: Dict):
+    payload = json.dumps(obj).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+def _recv_exact(sock: socket.socket, n: int) -> Optional[bytes]:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            if buf:
+                raise ConnectionError("Rerank service connection closed mid-message")
+            return None
+        buf.extend(chunk)
+    return bytes(buf)
+
+def _recv(sock: socket.socket) -> Optional[Dict]:
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    payload = _recv_exact(sock, _HEADER.unpack(header)[0])
+    if payload is None:
+        raise ConnectionError("Rerank service connection closed mid-message")
+    return json.loads(payload.decode("utf-8"))
+
+def _require_unix_sockets():
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("The rerank service needs Unix domain sockets (AF_UNIX)")
+
+
+class RerankService:
+    """
+    Serves rank requests for a set of named stages over a Unix socket.
+    Each stage has a batcher thread that drains concurrent requests for up
+    to batch_window_ms (or max_batch_pairs pairs) and scores them together
+    when the stage supports rank_many.
+    """
+    def __init__(self, socket_path: str, stages: Dict[str, object],
+                 batch_window_ms: float = 2.0, max_batch_pairs: int = 256):
+        _require_unix_sockets()
+        self.socket_path = socket_path
+        self.stages = stages
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch_pairs = max_batch_pairs
+        self._queues: Dict[str, "queue.Queue"] = {name: queue.Queue() for name in stages}
+        self._server = None
+
+    def start(self):
+        """Binds the socket and starts the batcher threads (non-blocking)."""
+        self._remove_stale_socket()
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+
+        service = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        request = _recv(self.request)
+                    except (ConnectionError, OSError, ValueError):
+                        return
+                    if request is None:
+                        return
+                    _send(self.request, service.handle(request))
+
+        class Server(socketserver.ThreadingUnixStreamServer):
+            # Default backlog of 5 makes a burst of worker connects fail
+            # with EAGAIN on Unix sockets
+            request_queue_size = 128
+            daemon_threads = True
+
+        self._server = Server(self.socket_path, Handler)
+
+        for name in self.stages:
+            threading.Thread(target=self._batch_loop, args=(name,), daemon=True,
+                             name=f"rerank-batcher-{name}").start()
+
+    def serve_forever(self):
+        if self._server is None:
+            self.start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+
+    def close(self):
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def handle(self, request: Dict) -> Dict:
+        op = request.get("op")
+        if op == "info":
+            return {"stages": sorted(self.stages)}
+        if op == "rank":
+            stage = request.get("stage")
+            if stage not in self.stages:
+                return {"error": f"Unknown stage: {stage}"}
+            future = Future()
+            self._queues[stage].put((request.get("query", ""), request.get("candidates", []), future))
+            try:
+                ranked = future.result()
+            except Exception as e:
+                return {"error": str(e)}
+            return {"candidates": [
+                {"i": c["i"], "final_score": c.get("final_score", 0.0), "reranker_used": c.get("reranker_used", stage)}
+                for c in ranked
+            ]}
+        return {"error": f"Unknown op: {op}"}
+
+    def _batch_loop(self, name: str):
+        stage = self.stages[name]
+        q = self._queues[name]
+        while True:
+            batch = [q.get()]
+            pairs = len(batch[0][1])
+            deadline = time.monotonic() + self.batch_window
+            while pairs < self.max_batch_pairs:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = q.get(timeout=remaining) if remaining > 0 else q.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+                pairs += len(item[1])
+
+            if not hasattr(stage, "rank_many"):
+                # No cross-request batching (e.g. LLM); still serialised on one model
+                self._rank_each(stage, batch)
+                continue
+            try:
+                results = stage.rank_many([(query, cands) for query, cands, _ in batch])
+            except Exception:
+                # Retry one by one, so only the failing request gets the error
+                self._rank_each(stage, batch)
+                continue
+            for (_, _, future), result in zip(batch, results):
+                future.set_result(result)
+
+    @staticmethod
+    def _rank_each(stage, batch: List):
+        """Scores each request on its own; every caller gets its own result or error."""
+        for query, cands, future in batch:
+            try:
+                future.set_result(stage.rank(query, cands))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            # Nobody listening: left over from a crashed service
+            os.unlink(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"Rerank service already running on {self.socket_path}")
+
+
+class RemoteReranker:
+    """
+    Client for RerankService with the same rank() interface as the local
+    rerankers. One persistent connection per calling thread; any transport
+    error raises so the orchestrator falls back to the next stage.
+    """
+    # The service serialises model access itself, so the orchestrator may
+    # keep several requests in flight to let them share batches
+    max_concurrency = 8
+
+    def __init__(self, socket_path: str, stage: str, timeout: float = 30.0):
+        _require_unix_sockets()
+        self.socket_path = socket_path
+        self.stage = stage
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _request(self, request: Dict) -> Dict:
+        try:
+            sock = self._connection()
+            _send(sock, request)
+            response = _recv(sock)
+            if response is None:
+                raise ConnectionError("Rerank service closed the connection")
+        except Exception:
+            # Drop the connection; the next call reconnects
+            sock = getattr(self._local, "sock", None)
+            if sock is not None:
+                sock.close()
+            self._local.sock = None
+            raise
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response
+
+    def info(self) -> Dict:
+        return self._request({"op": "info"})
+
+    def rank(self, query: str, candidates: List[Dict]) -> List[Dict]:
+        if not candidates:
+            return candidates
+        wire = [dict({f: c[f] for f in _WIRE_FIELDS if f in c}, i=i) for i, c in enumerate(candidates)]
+        response = self._request({"op": "rank", "stage": self.stage, "query": query, "candidates": wire})
+
+        ranked = []
+        for item in response["candidates"]:
+            cand = candidates[item["i"]]
+            cand["final_score"] = item["final_score"]
+            cand["reranker_used"] = item["reranker_used"]
+            ranked.append(cand)
+        return ranked
+
+
+def remote_stages(socket_path: str) -> Dict[str, RemoteReranker]:
+    """
+    Clients for the stages a running service offers. If the service is not
+    up yet, assume both model stages; calls fail over until it starts.
+    """
+    stages = ["cross_encoder", "llm_reranker"]
+    try:
+        stages = RemoteReranker(socket_path, "info", timeout=2.0).info()["stages"]
+    except Exception:
+        pass
+    return {name: RemoteReranker(socket_path, name) for name in stages}
+
+
+def load_local_stages() -> Dict[str, object]:
+    """Loads whichever model rerankers are available in this process."""
+    from nexus.config import RERANK_SCORE_CACHE_SIZE, RERANK_SCORE_CACHE_PATH
+    from .cross_encoder import CrossEncoderReranker
+    from .llm_reranker import LlmReranker
+    from .score_cache import ScoreCache
+
+    score_cache = ScoreCache(RERANK_SCORE_CACHE_SIZE, RERANK_SCORE_CACHE_PATH)
+    stages = {}
+    for name, factory in (("cross_encoder", CrossEncoderReranker), ("llm_reranker", LlmReranker)):
+        try:
+            stages[name] = factory(score_cache=score_cache)
+        except Exception as e:
+            log.warning("Rerank service: %s unavailable (%s)", name, e)
+    return stages
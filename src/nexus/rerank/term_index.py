@@ -0,0 +1,175 @@
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r'\w+')
+
+def tokenize(text: str) -> List[str]:
+    """Tokenizer shared by the term index and the heuristic reranker."""
+    return _TOKEN_RE.findall(text.lower())
+
+def contains_phrase(tokens: List[str], phrase: List[str]) -> bool:
+    """True if phrase occurs as a contiguous run of whole tokens (the rule TermIndex applies)."""
+    m = len(phrase)
+    if m == 0:
+        return False
+    first = phrase[0]
+    return any(tokens[i:i + m] == phrase for i in range(len(tokens) - m + 1) if tokens[i] == first)
+
+def _pack(strings: List[str]) -> np.ndarray:
+    # \w+ tokens and brick ids never contain newlines
+    return np.frombuffer("\n".join(strings).encode("utf-8"), dtype=np.uint8)
+
+def _unpack(packed: np.ndarray) -> List[str]:
+    text = packed.tobytes().decode("utf-8")
+    return text.split("\n") if text else []
+
+class TermIndex:
+    """
+    Array-backed token index over brick content, built at sync time.
+    Token IDs for every brick are stored in document order in one int32
+    array with CSR-style offsets, plus token -> brick-row postings. Overlap
+    for a batch of candidates is then a sorted-array membership test per
+    query token, independent of how long the bricks are; token runs are only
+    gathered to confirm exact phrases.
+    """
+    def __init__(self):
+        self.vocab: Dict[str, int] = {}
+        self.brick_rows: Dict[str, int] = {}
+        self.tokens = np.zeros(0, dtype=np.int32)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        # Postings: rows containing token t are post_rows[post_offsets[t]:post_offsets[t + 1]]
+        self.post_rows = np.zeros(0, dtype=np.int32)
+        self.post_offsets = np.zeros(1, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.brick_rows)
+
+    def __contains__(self, brick_id: str) -> bool:
+        return brick_id in self.brick_rows
+
+    def add_bricks(self, bricks: Iterable[Dict]) -> int:
+        """Indexes bricks not seen before. Returns the number added."""
+        new_tokens = []
+        new_lengths = []
+        for brick in bricks:
+            brick_id = brick["brick_id"]
+            if brick_id in self.brick_rows:
+                continue
+            ids = [self.vocab.setdefault(t, len(self.vocab)) for t in tokenize(brick.get("content", ""))]
+            self.brick_rows[brick_id] = len(self.offsets) - 1 + len(new_lengths)
+            new_tokens.append(np.asarray(ids, dtype=np.int32))
+            new_lengths.append(len(ids))
+
+        if new_lengths:
+            self.tokens = np.concatenate([self.tokens, *new_tokens])
+            self.offsets = np.concatenate([
+                self.offsets,
+                self.offsets[-1] + np.cumsum(np.asarray(new_lengths, dtype=np.int64))
+            ])
+            self._build_postings()
+        return len(new_lengths)
+
+    def _build_postings(self):
+        n_rows = len(self.offsets) - 1
+        row_of = np.repeat(np.arange(n_rows, dtype=np.int64), np.diff(self.offsets))
+        # Unique (token, row) pairs, sorted by token then row
+        pairs = np.unique(self.tokens.astype(np.int64) * max(n_rows, 1) + row_of)
+        post_tokens = pairs // max(n_rows, 1)
+        self.post_rows = (pairs % max(n_rows, 1)).astype(np.int32)
+        self.post_offsets = np.searchsorted(post_tokens, np.arange(len(self.vocab) + 1)).astype(np.int64)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        terms = sorted(self.vocab, key=self.vocab.get)
+        brick_ids = sorted(self.brick_rows, key=self.brick_rows.get)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, tokens=self.tokens, offsets=self.offsets,
+                     post_rows=self.post_rows, post_offsets=self.post_offsets,
+                     vocab=_pack(terms), brick_ids=_pack(brick_ids))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TermIndex":
+        index = cls()
+        with np.load(path, allow_pickle=False) as data:
+            index.tokens = data["tokens"]
+            index.offsets = data["offsets"]
+            index.post_rows = data["post_rows"]
+            index.post_offsets = data["post_offsets"]
+            index.vocab = {t: i for i, t in enumerate(_unpack(data["vocab"]))}
+            index.brick_rows = {b: i for i, b in enumerate(_unpack(data["brick_ids"]))}
+        return index
+
+    @classmethod
+    def load_if_exists(cls, path: Optional[str]) -> Optional["TermIndex"]:
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            return cls.load(path)
+        except Exception:
+            return None
+
+    def score_batch(self, query_tokens: List[str], brick_ids: List[str]):
+        """
+        For each brick, returns (distinct query tokens present, exact phrase hit).
+        All brick_ids must be in the index.
+        """
+        n = len(brick_ids)
+        rows = np.fromiter((self.brick_rows[b] for b in brick_ids), dtype=np.int64, count=n)
+        overlap = np.zeros(n, dtype=np.int64)
+        phrase = np.zeros(n, dtype=bool)
+
+        contains_all = np.ones(n, dtype=bool)
+        for t in set(query_tokens):
+            tid = self.vocab.get(t)
+            if tid is None:
+                contains_all[:] = False
+                continue
+            postings = self.post_rows[self.post_offsets[tid]:self.post_offsets[tid + 1]]
+            if len(postings) == 0:
+                contains_all[:] = False
+                continue
+            pos = np.searchsorted(postings, rows)
+            present = postings[np.minimum(pos, len(postings) - 1)] == rows
+            overlap += present
+            contains_all &= present
+
+        # Exact phrase: only bricks holding every query token can match
+        m = len(query_tokens)
+        if m == 1:
+            phrase = contains_all
+        elif m > 1 and contains_all.any():
+            subset = np.flatnonzero(contains_all)
+            phrase[subset] = self._phrase_hits(rows[subset], [self.vocab[t] for t in query_tokens])
+
+        return overlap, phrase
+
+    def _phrase_hits(self, rows: np.ndarray, seq: List[int]) -> np.ndarray:
+        """True where the token sequence appears contiguously within the brick."""
+        n = len(rows)
+        m = len(seq)
+        starts = self.offsets[rows]
+        lengths = self.offsets[rows + 1] - starts
+        total = int(lengths.sum())
+        hits = np.zeros(n, dtype=bool)
+        if total < m:
+            return hits
+
+        # Gather the bricks' token runs into one flat array without a Python loop
+        seg_of = np.repeat(np.arange(n), lengths)
+        seg_start = np.cumsum(lengths) - lengths
+        flat = self.tokens[np.repeat(starts - seg_start, lengths) + np.arange(total)]
+
+        hit = flat[:total - m + 1] == seq[0]
+        for j in range(1, m):
+            hit &= flat[j:total - m + 1 + j] == seq[j]
+        positions = np.flatnonzero(hit)
+        segs = seg_of[positions]
+        # Reject matches that run past the end of their brick
+        valid = positions + m <= seg_start[segs] + lengths[segs]
+        hits[segs[valid]] = True
+        return hits
@@ -1,24 +1,54 @@
 import os
 import sys
 import json
+import time
 from nexus.extract.tree_splitter import load_conversations, process_conversation
 from nexus.bricks.extractor import extract_bricks_from_file
 from nexus.walls.builder import build_walls
 from nexus.vector.local_index import LocalVectorIndex
+from nexus.rerank.term_index import TermIndex
+from nexus.graph.builder import GraphBuilder
+from nexus.config import TERM_INDEX_PATH, GRAPH_DIR, METRICS_TEXTFILE
+from nexus.observability import metrics, profiling
 from datetime import datetime, timezone
 
+_STAGE_SECONDS = metrics.histogram(
+    "nexus_sync_stage_seconds", "Sync stage duration", ("stage",),
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+)
+_RUNS = metrics.counter("nexus_sync_runs_total", "Sync runs, by result", ("result",))
+_BRICKS = metrics.gauge("nexus_sync_bricks", "Bricks extracted by the last sync")
+_LAST_SUCCESS = metrics.gauge("nexus_sync_last_success_timestamp_seconds", "Unix time the last sync completed")
+
+def _lap(stage: str, since: float) -> float:
+    """Records the stage that started at `since`; returns now, the next stage's start."""
+    now = time.perf_counter()
+    _STAGE_SECONDS.labels(stage).observe(now - since)
+    return now
+
+def _write_metrics():
+    if METRICS_TEXTFILE:
+        try:
+            metrics.REGISTRY.write_textfile(METRICS_TEXTFILE)
+        except OSError as e:
+            print(f"[{datetime.now(timezone.utc).isoformat()}] WARNING: metrics not written to {METRICS_TEXTFILE}: {e}")
+
+@profiling.profiled("sync")
 def run_sync(input_json: str, output_dir: str):
     print(f"[{datetime.now(timezone.utc).isoformat()}] Starting Sync...")
     
+    t = time.perf_counter()
     try:
         # 1. Load Conversations
         conversations = load_conversations(input_json)
+        t = _lap("load", t)
         
         # 2. Extract Trees
         all_tree_files = []
         for conv in conversations:
             tree_files = process_conversation(conv, output_dir)
             all_tree_files.extend(tree_files)
+        t = _lap("trees", t)
         print(f"[{datetime.now(timezone.utc).isoformat()}] EVENT: memory_extracted. {len(all_tree_files)} trees generated.")
         
         # 3. Extract Bricks
@@ -28,19 +58,44 @@ def run_sync(input_json: str, output_dir: str):
             if brick_file:
                 with open(brick_file, "r", encoding="utf-8") as f:
                     all_bricks.extend(json.load(f))
+        _BRICKS.set(len(all_bricks))
+        t = _lap("bricks", t)
         
         # 4. Build Walls
         wall_count = build_walls(all_tree_files, os.path.join(output_dir, "walls"))
+        t = _lap("walls", t)
         print(f"[{datetime.now(timezone.utc).isoformat()}] Walls built: {wall_count}")
         
         # 5. Vector Embedding
         index = LocalVectorIndex()
         index.add_bricks(all_bricks)
         index.save()
+        t = _lap("vectors", t)
         print(f"[{datetime.now(timezone.utc).isoformat()}] EVENT: vector_embedded. Bricks indexed.")
+
+        # 6. Term Index (pre-tokenized bricks for the heuristic reranker)
+        term_index = TermIndex.load_if_exists(TERM_INDEX_PATH) or TermIndex()
+        added = term_index.add_bricks(all_bricks)
+        term_index.save(TERM_INDEX_PATH)
+        t = _lap("terms", t)
+        print(f"[{datetime.now(timezone.utc).isoformat()}] EVENT: terms_indexed. {added} new bricks tokenized.")
+
+        # 7. Concept Graph (incremental: only terms in new bricks are re-ranked)
+        builder = GraphBuilder()
+        try:
+            stats = builder.update(all_bricks, GRAPH_DIR)
+        finally:
+            builder.close()
+        t = _lap("graph", t)
+        print(f"[{datetime.now(timezone.utc).isoformat()}] EVENT: graph_built. {stats['bricks_added']} new bricks, {stats['terms_refreshed']} concepts updated.")
         
+        _RUNS.labels("success").inc()
+        _LAST_SUCCESS.set(time.time())
+        _write_metrics()
         print(f"[{datetime.now(timezone.utc).isoformat()}] Sync Complete.")
         
     except Exception as e:
         print(f"[{datetime.now(timezone.utc).isoformat()}] ERROR: Sync aborted due to corruption/failure: {e}")
+        _RUNS.labels("failure").inc()
+        _write_metrics()
         sys.exit(1) # Fail-closed
@@ -0,0 +1,186 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+# Rough per-entry bookkeeping cost (OrderedDict node, key string, ndarray header)
+_ENTRY_OVERHEAD_BYTES = 200
+
+
+class EmbeddingCache:
+    """
+    Bounded, thread-safe LRU cache of query embeddings.
+    Keyed on (embedder version, query text). Capacity is measured in bytes.
+    Optionally persists each embedding as a .npy file so restarts stay warm.
+    The files are an LRU too, capped at disk_max_bytes. On startup the
+    existing files are indexed oldest mtime first, so files left by an old
+    embedder version are the first to go. Processes sharing a directory
+    each enforce the cap on the files they know about.
+    """
+    def __init__(self, max_bytes: int, embedder_version: str, cache_dir: Optional[str] = None,
+                 disk_max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.embedder_version = embedder_version
+        self.cache_dir = cache_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.current_bytes = 0
+        self.disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Disk tier: key -> file size, least recently used first
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_lock = threading.Lock()
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._scan_disk()
+
+    def _key(self, query: str) -> str:
+        return hashlib.sha256(f"{self.embedder_version}\x00{query}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _entry_size(key: str, vector: np.ndarray) -> int:
+        return vector.nbytes + len(key) + _ENTRY_OVERHEAD_BYTES
+
+    def get(self, query: str) -> Optional[np.ndarray]:
+        key = self._key(query)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+
+        vector = self._read_disk(key)
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._insert(key, vector)
+        return vector
+
+    def put(self, query: str, vector: np.ndarray) -> np.ndarray:
+        key = self._key(query)
+        # Cached vectors are shared between callers, so freeze them
+        vector = np.array(vector, copy=True)
+        vector.flags.writeable = False
+        with self._lock:
+            self._insert(key, vector)
+        self._write_disk(key, vector)
+        return vector
+
+    def get_or_compute(self, query: str, embed: Callable[[str], np.ndarray]) -> np.ndarray:
+        vector = self.get(query)
+        if vector is None:
+            # Computed outside the lock; concurrent misses on the same query
+            # may both embed, which is cheaper than serialising all misses.
+            vector = self.put(query, embed(query))
+        return vector
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _insert(self, key: str, vector: np.ndarray):
+        # Caller holds the lock
+        size = self._entry_size(key, vector)
+        if size > self.max_bytes:
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.current_bytes -= self._entry_size(key, old)
+
+        self._entries[key] = vector
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= self._entry_size(evicted_key, evicted)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.npy")
+
+    def _scan_disk(self):
+        found = []
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".npy"):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    found.append((st.st_mtime_ns, entry.name[:-4], st.st_size))
+        with self._disk_lock:
+            for _, key, size in sorted(found):
+                self._files[key] = size
+                self.disk_bytes += size
+            self._evict_disk()
+
+    def _read_disk(self, key: str) -> Optional[np.ndarray]:
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            vector = np.load(path, allow_pickle=False)
+        except Exception:
+            return None
+        vector.flags.writeable = False
+        with self._disk_lock:
+            if key in self._files:
+                self._files.move_to_end(key)
+        try:
+            # Carry the recency over to the next startup scan
+            os.utime(path)
+        except OSError:
+            pass
+        return vector
+
+    def _write_disk(self, key: str, vector: np.ndarray):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write-then-rename so concurrent readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, vector, allow_pickle=False)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError:
+            # Persistence is best-effort; the in-memory tier is authoritative
+            return
+        with self._disk_lock:
+            self.disk_bytes += size - self._files.pop(key, 0)
+            self._files[key] = size
+            self._evict_disk()
+
+    def _evict_disk(self):
+        # Caller holds the disk lock
+        if self.disk_max_bytes is None:
+            return
+        while self._files and self.disk_bytes > self.disk_max_bytes:
+            key, size = self._files.popitem(last=False)
+            self.disk_bytes -= size
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                # Already gone (another process sharing the directory)
+                pass
@@ -2,10 +2,13 @@ from pathlib import Path
 import json
 import numpy as np
 import faiss
+import logging
 import os
 from typing import List, Dict
 from nexus.config import INDEX_PATH, BRICK_IDS_PATH
 
+log = logging.getLogger(__name__)
+
 class LocalVectorIndex:
     def __init__(self):
         self.index_file = Path(INDEX_PATH)
@@ -17,7 +20,7 @@ class LocalVectorIndex:
 
         if self.index_file.exists() and self.meta_file.exists():
             self.load()
-        print("DEBUG FAISS index ntotal =", self.index.ntotal)
+        log.debug("FAISS index ready", extra={"ntotal": self.index.ntotal})
 
 
     def load(self):
@@ -48,7 +51,7 @@ class LocalVectorIndex:
 
     def search(self, query_vector: np.ndarray, k: int = 5):
         if self.index.ntotal == 0:
-            return [], []
+            return np.empty(0, dtype="float32"), np.empty(0, dtype="int64")
 
         distances, indices = self.index.search(query_vector, k)
         return distances[0], indices[0]
@@ -4,6 +4,7 @@ import yaml
 import tiktoken
 from datetime import datetime, timezone
 from typing import List, Dict
+from nexus.observability import profiling
 
 def get_tokenizer(model="gpt-4"):
     try:
@@ -11,6 +12,7 @@ def get_tokenizer(model="gpt-4"):
     except KeyError:
         return tiktoken.get_encoding("cl100k_base")
 
+@profiling.profiled("walls")
 def build_walls(tree_files: List[str], output_dir: str, target_size: int = 32000):
     """
     Build token-aware walls from extracted trees.
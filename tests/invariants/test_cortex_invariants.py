@@ -15,17 +15,25 @@ class TestCortexInvariants(unittest.TestCase):
         self.api = CortexAPI(audit_log_path=self.audit_log)
 
     def tearDown(self):
+        self.api.audit.close()
         if os.path.exists(self.test_dir):
             shutil.rmtree(self.test_dir)
 
     def test_vector_hit_without_raw_reload_blocks(self):
         """❌ Vector hit without raw reload → Cortex BLOCK"""
         # Mocking _reload_source_text to fail
-        with patch.object(CortexAPI, '_reload_source_text', return_value=""):
+        with patch.object(CortexAPI, '_reload_source_text', return_value=None):
             result = self.api.generate("user1", "agent1", "query", ["brick1"])
             self.assertEqual(result["status"], "blocked")
             self.assertIn("Violation", result["error"])
 
+    def test_unknown_brick_blocks(self):
+        """❌ Brick that cannot be reloaded from source → Cortex BLOCK, no audit row"""
+        with patch("nexus.ask.recall.get_recall_brick_blocks", return_value={"brick1": "text"}):
+            result = self.api.generate("user1", "agent1", "query", ["brick1", "missing_brick"])
+        self.assertEqual(result["status"], "blocked")
+        self.assertFalse(os.path.exists(self.audit_log))
+
     def test_llm_call_without_audit_row_fail(self):
         """❌ Any LLM call without audit row → FAIL"""
         # Count audit rows before
@@ -34,8 +42,12 @@ class TestCortexInvariants(unittest.TestCase):
             with open(self.audit_log, "r") as f:
                 initial_count = len(f.readlines())
         
-        self.api.generate("user1", "agent1", "query", ["brick1"])
-        
+        # Reload succeeds, so the LLM is called
+        with patch.object(CortexAPI, '_reload_source_text', return_value="Content for brick1"):
+            self.api.generate("user1", "agent1", "query", ["brick1"])
+        # Rows are written in the background (async durability): wait for it
+        self.api.audit.flush()
+
         # Count after
         with open(self.audit_log, "r") as f:
             after_count = len(f.readlines())
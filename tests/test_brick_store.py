@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from nexus.bricks.brick_store import BrickStore
+
+
+def _brick(brick_id, content, source="tree.json"):
+    return {
+        "brick_id": brick_id,
+        "source_file": source,
+        "source_span": {"message_id": "m1", "block_index": 0},
+        "content": content,
+        "hash": f"hash-{brick_id}",
+    }
+
+
+class TestBrickStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        conv_dir = os.path.join(self.tmp, "conv_a")
+        os.makedirs(conv_dir)
+        with open(os.path.join(conv_dir, "path_1_bricks.json"), "w", encoding="utf-8") as f:
+            json.dump([_brick("a1", "alpha one"), _brick("a2", "alpha two"), _brick("a3", "alpha three")], f)
+        with open(os.path.join(conv_dir, "path_2_bricks.json"), "w", encoding="utf-8") as f:
+            json.dump([_brick("b1", "beta one")], f)
+        self.store = BrickStore(self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_bulk_texts_match_single_lookups(self):
+        ids = ["a1", "a3", "b1", "unknown"]
+        texts = self.store.get_brick_texts(ids)
+
+        self.assertEqual(texts, {i: self.store.get_brick_text(i) for i in ["a1", "a3", "b1"]})
+        self.assertEqual(self.store.get_brick_metadata("a1")["hash"], "hash-a1")
+
+    def test_each_file_read_once(self):
+        real_open = open
+        opened = []
+
+        def counting_open(path, *args, **kwargs):
+            opened.append(path)
+            return real_open(path, *args, **kwargs)
+
+        with patch("builtins.open", side_effect=counting_open):
+            texts = self.store.get_brick_texts(["a1", "a2", "a3", "b1", "a1"])
+
+        self.assertEqual(len(texts), 4)
+        self.assertEqual(len(opened), 2)
+        self.assertEqual(len(set(opened)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
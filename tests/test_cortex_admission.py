@@ -0,0 +1,215 @@
+import unittest
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+from cortex import admission
+from cortex.admission import (
+    AsyncConcurrencyLimiter, ClientRateLimiter, ConcurrencyLimiter, Rejected, TokenBucket
+)
+
+try:
+    from aiohttp.test_utils import TestServer, TestClient
+    from cortex import async_server
+    from cortex.api import CortexAPI
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimiting(unittest.TestCase):
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=2.0, burst=3, now=0.0)
+        self.assertEqual([bucket.take(0.0) for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(bucket.take(0.0), 0.5)
+        # Refills at 2/s, capped at the burst
+        self.assertEqual(bucket.take(0.5), 0.0)
+        bucket.take(100.0)
+        self.assertAlmostEqual(bucket.tokens, 2.0)
+
+    def test_per_client_limits(self):
+        clock = FakeClock()
+        limiter = ClientRateLimiter(rate=1.0, burst=2, max_clients=2, clock=clock)
+        limiter.check("a")
+        limiter.check("a")
+        with self.assertRaises(Rejected) as ctx:
+            limiter.check("a")
+        self.assertEqual(ctx.exception.status, 429)
+        self.assertEqual(ctx.exception.response()[2], {"Retry-After": "1"})
+
+        # Other clients have their own buckets
+        limiter.check("b")
+        clock.now += 1.0
+        limiter.check("a")
+        self.assertEqual(limiter.stats()["limited"], 1)
+
+        # Least recently seen client is evicted past max_clients
+        limiter.check("c")
+        self.assertEqual(list(limiter._buckets), ["a", "c"])
+
+    def test_client_id_header_needs_trust(self):
+        headers = {admission.CLIENT_ID_HEADER: "gateway-user"}
+        self.assertEqual(admission.client_id(headers, "10.0.0.1"), "10.0.0.1")
+        self.assertEqual(admission.client_id({}, None), "unknown")
+        with patch.object(admission, "CORTEX_TRUST_CLIENT_ID", True):
+            self.assertEqual(admission.client_id(headers, "10.0.0.1"), "gateway-user")
+            self.assertEqual(admission.client_id({}, "10.0.0.1"), "10.0.0.1")
+
+    def test_disabled(self):
+        limiter = ClientRateLimiter(rate=0)
+        for _ in range(100):
+            limiter.check("a")
+
+
+class TestConcurrencyLimiter(unittest.TestCase):
+    def test_queue_full_sheds_immediately(self):
+        limiter = ConcurrencyLimiter("recall", limit=1, max_queue=0)
+        limiter.acquire()
+        with self.assertRaises(Rejected) as ctx:
+            limiter.acquire()
+        self.assertEqual(ctx.exception.status, 503)
+        limiter.release()
+        limiter.acquire()
+        self.assertEqual(limiter.stats()["shed_queue_full"], 1)
+
+    def test_waiters_are_served_in_order_then_time_out(self):
+        limiter = ConcurrencyLimiter("recall", limit=1, max_queue=4, queue_timeout_s=5)
+        limiter.acquire()
+        order = []
+
+        def waiter(i):
+            with limiter.slot():
+                order.append(i)
+
+        threads = []
+        for i in range(3):
+            threads.append(threading.Thread(target=waiter, args=(i,)))
+            threads[-1].start()
+            while limiter.stats()["queued"] < i + 1:
+                time.sleep(0.001)
+        limiter.release()
+        for t in threads:
+            t.join()
+        self.assertEqual(order, [0, 1, 2])
+        self.assertEqual(limiter.stats()["in_flight"], 0)
+        self.assertEqual(limiter.stats()["peak_queued"], 3)
+
+        limiter.queue_timeout_s = 0.01
+        limiter.acquire()
+        with self.assertRaises(Rejected):
+            limiter.acquire()
+        self.assertEqual(limiter.stats()["shed_timeout"], 1)
+        self.assertEqual(limiter.stats()["queued"], 0)
+
+
+class TestAsyncConcurrencyLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_bounded_concurrency_and_shedding(self):
+        limiter = AsyncConcurrencyLimiter("generate", limit=2, max_queue=3, queue_timeout_s=5)
+        active = peak = 0
+
+        async def one():
+            nonlocal active, peak
+            async with limiter.slot():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        results = await asyncio.gather(*(one() for _ in range(8)), return_exceptions=True)
+        shed = [r for r in results if isinstance(r, Rejected)]
+        self.assertEqual(len(shed), 3)
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.stats()["admitted"], 5)
+        self.assertEqual(limiter.in_flight, 0)
+
+    async def test_timeout_and_cancelled_waiters_leave_the_queue(self):
+        limiter = AsyncConcurrencyLimiter("generate", limit=1, max_queue=4, queue_timeout_s=0.01)
+        await limiter.acquire()
+        with self.assertRaises(Rejected) as ctx:
+            await limiter.acquire()
+        self.assertEqual(ctx.exception.status, 503)
+
+        limiter.queue_timeout_s = 5
+        task = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(limiter.stats()["queued"], 0)
+        limiter.release()
+        self.assertEqual(limiter.in_flight, 0)
+
+
+@unittest.skipUnless(HAS_AIOHTTP, "aiohttp not installed")
+class TestAsyncServerAdmission(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.release = threading.Event()
+
+        def blocking_recall(query, rerank_budget_ms=None, rerank_timings=None):
+            self.release.wait(5)
+            return []
+
+        app = async_server.create_app(
+            executor_workers=4,
+            cortex_api=CortexAPI(audit_log_path=os.path.join(self.tmp, "audit.jsonl")),
+            recall=blocking_recall,
+            rate_limiter=admission.ClientRateLimiter(rate=1.0, burst=3),
+            recall_limiter=admission.AsyncConcurrencyLimiter("recall", limit=1, max_queue=1),
+        )
+        self.client = TestClient(TestServer(app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        self.release.set()
+        await self.client.close()
+        shutil.rmtree(self.tmp)
+
+    async def test_sheds_with_retry_after(self):
+        preview = lambda: self.client.get("/jarvis/ask-preview", params={"query": "q"})
+        first = asyncio.create_task(preview())
+        second = asyncio.create_task(preview())
+        while (await (await self.client.get("/cortex/admission")).json())["limiters"]["recall"]["queued"] < 1:
+            await asyncio.sleep(0.005)
+
+        # One running, one queued: the third is shed
+        shed = await preview()
+        self.assertEqual(shed.status, 503)
+        self.assertEqual(shed.headers["Retry-After"], "1")
+
+        # Burst of 3 spent: rate limited
+        limited = await preview()
+        self.assertEqual(limited.status, 429)
+        self.assertIn("Retry-After", limited.headers)
+
+        self.release.set()
+        self.assertEqual([(await first).status, (await second).status], [200, 200])
+        stats = (await (await self.client.get("/cortex/admission")).json())
+        self.assertEqual(stats["limiters"]["recall"]["shed_queue_full"], 1)
+        self.assertEqual(stats["rate_limit"]["limited"], 1)
+        self.assertIn("generate", stats["limiters"])
+
+        # X-Client-Id is ignored unless trusted: same peer, same bucket
+        other = await self.client.get("/jarvis/ask-preview", params={"query": "q"},
+                                      headers={admission.CLIENT_ID_HEADER: "other"})
+        self.assertEqual(other.status, 429)
+        with patch.object(async_server.admission, "CORTEX_TRUST_CLIENT_ID", True):
+            other = await self.client.get("/jarvis/ask-preview", params={"query": "q"},
+                                          headers={admission.CLIENT_ID_HEADER: "other"})
+        self.assertEqual(other.status, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+import unittest
+import asyncio
+import os
+import json
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+from nexus.observability import logs, tracing
+
+try:
+    from aiohttp.test_utils import TestServer, TestClient
+    from cortex.async_server import create_app
+    from cortex.model_client import AsyncModelClient, StubModelServer
+    from cortex.api import CortexAPI
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+
+class SlowRecall:
+    """Recall stand-in: blocks its thread like CPU-bound recall + rerank."""
+    def __init__(self, seconds=0.005):
+        self.seconds = seconds
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, query, rerank_budget_ms=None, rerank_timings=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.seconds)
+        with self.lock:
+            self.active -= 1
+        return [{"brick_id": f"b-{query}", "confidence": 0.9, "reranker_used": "heuristic"}]
+
+
+@unittest.skipUnless(HAS_AIOHTTP, "aiohttp not installed")
+class TestAsyncCortex(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.audit_log = os.path.join(self.tmp, "audit.jsonl")
+        self.stub = StubModelServer(delay_ms=5)
+        self.model_url = await self.stub.start()
+        self.recall = SlowRecall()
+        app = create_app(
+            executor_workers=4,
+            model_client=AsyncModelClient(self.model_url, max_connections=4),
+            cortex_api=CortexAPI(audit_log_path=self.audit_log),
+            recall=self.recall,
+        )
+        self.client = TestClient(TestServer(app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.stub.stop()
+        shutil.rmtree(self.tmp)
+
+    async def test_hundreds_of_previews_queue_on_bounded_executor(self):
+        async def one(i):
+            resp = await self.client.get("/jarvis/ask-preview", params={"query": f"q{i}"})
+            return resp.status, await resp.json()
+
+        results = await asyncio.gather(*(one(i) for i in range(300)))
+
+        self.assertTrue(all(status == 200 for status, _ in results))
+        self.assertEqual(results[7][1]["top_bricks"], [{"brick_id": "b-q7", "confidence": 0.9}])
+        self.assertLessEqual(self.recall.peak, 4)
+
+    async def test_preview_requires_query(self):
+        resp = await self.client.get("/jarvis/ask-preview")
+        self.assertEqual(resp.status, 400)
+
+    async def test_generate_uses_pooled_model_client_and_audits(self):
+        with patch.object(CortexAPI, "_reload_source_text", return_value="source text"):
+            responses = await asyncio.gather(*(
+                self.client.post("/cortex/generate", json={"user_id": "u", "agent_id": "a",
+                                                           "query": f"question {i}", "brick_ids": ["b1"]})
+                for i in range(40)
+            ))
+            bodies = [await r.json() for r in responses]
+
+        self.assertTrue(all(b["status"] == "success" for b in bodies))
+        self.assertTrue(bodies[0]["response"].startswith("Stub response"))
+        self.assertEqual(self.stub.requests, 40)
+        # 40 calls over a pool of 4 keep-alive connections
+        self.assertLessEqual(len(self.stub.peers), 4)
+        with open(self.audit_log, "r", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(len(rows), 40)
+        self.assertEqual(rows[0]["brick_ids_used"], ["b1"])
+
+    async def test_generate_blocks_on_failed_reload(self):
+        with patch.object(CortexAPI, "_reload_source_text", return_value=None):
+            resp = await self.client.post("/cortex/generate", json={"query": "q", "brick_ids": ["missing"]})
+
+        self.assertEqual(resp.status, 422)
+        self.assertEqual((await resp.json())["status"], "blocked")
+        self.assertEqual(self.stub.requests, 0)
+        self.assertFalse(os.path.exists(self.audit_log))
+
+    async def test_generate_rejects_malformed_bodies(self):
+        bodies = [[], "x", 3, {"brick_ids": []}, {"query": "q", "brick_ids": "b1"},
+                  {"query": "q", "brick_ids": ["b1", 2]}]
+        for path in ("/cortex/generate", "/cortex/generate-stream"):
+            for body in bodies:
+                resp = await self.client.post(path, json=body)
+                self.assertEqual(resp.status, 400, (path, body))
+                self.assertIn("error", await resp.json())
+            resp = await self.client.post(path, data=b"{", headers={"Content-Type": "application/json"})
+            self.assertEqual(resp.status, 400)
+        self.assertEqual(self.stub.requests, 0)
+        self.assertFalse(os.path.exists(self.audit_log))
+
+    async def test_generate_stream_sends_tokens_as_they_arrive(self):
+        streaming = StubModelServer(token_delay_ms=20, tokens=5)
+        url = await streaming.start()
+        app = create_app(executor_workers=2, model_client=AsyncModelClient(url),
+                         cortex_api=CortexAPI(audit_log_path=self.audit_log))
+        async with TestClient(TestServer(app)) as client:
+            with patch.object(CortexAPI, "_reload_source_text", return_value="source text"):
+                start = time.perf_counter()
+                resp = await client.post("/cortex/generate-stream", json={"query": "q", "brick_ids": ["b1"]})
+                self.assertEqual(resp.headers["Content-Type"], "text/event-stream")
+                frames = []
+                first_token_at = None
+                async for line in resp.content:
+                    if line.startswith(b"event: token") and first_token_at is None:
+                        first_token_at = time.perf_counter() - start
+                    if line.startswith(b"data: "):
+                        frames.append(json.loads(line[6:]))
+                total = time.perf_counter() - start
+
+            blocked = await client.post("/cortex/generate-stream", json={"query": "q", "brick_ids": ["missing"]})
+            self.assertEqual(blocked.status, 422)
+        await streaming.stop()
+
+        text = "".join(f["text"] for f in frames[:-1])
+        self.assertEqual(text, "Stub response for: source text\n\nq" + " lorem" * 5)
+        self.assertEqual(frames[-1], {"model": "gpt-4o", "status": "success"})
+        # 9 tokens 20ms apart: the first one arrives well before the last
+        self.assertLess(first_token_at, total / 2)
+        with open(self.audit_log, "r", encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+    async def test_generate_stream_reports_the_backend_model(self):
+        # The backend answers with another model than the one requested
+        serving = StubModelServer(model="gpt-4o-mini")
+        url = await serving.start()
+        app = create_app(executor_workers=2, model_client=AsyncModelClient(url),
+                         cortex_api=CortexAPI(audit_log_path=self.audit_log))
+        async with TestClient(TestServer(app)) as client:
+            with patch.object(CortexAPI, "_reload_source_text", return_value="source text"):
+                resp = await client.post("/cortex/generate-stream", json={"query": "q", "brick_ids": ["b1"]})
+                frames = [json.loads(line[6:]) async for line in resp.content if line.startswith(b"data: ")]
+        await serving.stop()
+
+        self.assertEqual(frames[-1], {"model": "gpt-4o-mini", "status": "success"})
+        with open(self.audit_log, "r", encoding="utf-8") as f:
+            self.assertEqual(json.loads(f.readline())["model"], "gpt-4o-mini")
+
+    async def test_request_id_reaches_executor_threads(self):
+        seen = []
+
+        def recall(query, rerank_budget_ms=None, rerank_timings=None):
+            seen.append(logs.get_request_id())
+            return []
+
+        app = create_app(executor_workers=2, cortex_api=CortexAPI(audit_log_path=self.audit_log), recall=recall)
+        async with TestClient(TestServer(app)) as client:
+            given = await client.get("/jarvis/ask-preview", params={"query": "q"}, headers={"X-Request-Id": "req-42"})
+            fresh = await client.get("/jarvis/ask-preview", params={"query": "q"})
+
+        self.assertEqual(given.headers["X-Request-Id"], "req-42")
+        self.assertEqual(seen[0], "req-42")
+        self.assertEqual(seen[1], fresh.headers["X-Request-Id"])
+        self.assertIsNone(logs.get_request_id())
+
+    async def test_request_trace_spans_executor_work(self):
+        def recall(query, rerank_budget_ms=None, rerank_timings=None):
+            with tracing.span("recall_bricks", k=10):
+                return []
+
+        app = create_app(executor_workers=2, cortex_api=CortexAPI(audit_log_path=self.audit_log), recall=recall)
+        with patch.object(tracing.TRACER, "sample_rate", 1.0):
+            async with TestClient(TestServer(app)) as client:
+                await client.get("/jarvis/ask-preview", params={"query": "q"}, headers={"X-Request-Id": "req-t"})
+                recent = await (await client.get("/cortex/traces", params={"limit": 2})).json()
+                chrome = await (await client.get("/cortex/traces", params={"format": "chrome"})).json()
+
+        traces = [t for t in recent["traces"] if t["trace_id"] == "req-t"]
+        recall_span, root = traces[0]["spans"]
+        self.assertEqual((root["name"], root["path"], root["status"]), ("http", "/jarvis/ask-preview", 200))
+        self.assertEqual(recall_span["parent_id"], root["span_id"])
+        self.assertIn("recall_bricks", [e["name"] for e in chrome["traceEvents"]])
+
+    async def test_metrics_endpoint(self):
+        await self.client.get("/jarvis/ask-preview", params={"query": "q"})
+        resp = await self.client.get("/metrics")
+        self.assertEqual(resp.status, 200)
+        self.assertTrue(resp.headers["Content-Type"].startswith("text/plain; version=0.0.4"))
+        lines = (await resp.text()).splitlines()
+        self.assertIn("# TYPE cortex_admission_queued gauge", lines)
+        self.assertIn('cortex_admission_admitted_total{limiter="recall"} 1', lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
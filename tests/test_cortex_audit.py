@@ -0,0 +1,140 @@
+import unittest
+import sys
+import os
+import json
+import glob
+import shutil
+import tempfile
+import threading
+import subprocess
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+sys.path.insert(0, os.path.join(os.getcwd(), "services"))
+
+from cortex.audit import AuditWriter, AuditWriteError, fcntl
+
+
+def _read_rows(path):
+    rows = []
+    for name in [path] + sorted(glob.glob(path + ".*")):
+        if name.endswith(".lock"):
+            continue
+        with open(name, "r", encoding="utf-8") as f:
+            rows.extend(json.loads(line) for line in f)
+    return rows
+
+
+def _write_from_process(path, worker, count):
+    writer = AuditWriter(path, durability="write", max_bytes=4096, backups=1000)
+    for i in range(count):
+        writer.write({"worker": worker, "i": i, "pad": "x" * 40})
+    writer.close()
+
+
+class TestAuditWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "audit", "trace.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_concurrent_writes_are_group_committed(self):
+        writer = AuditWriter(self.path, durability="write")
+        self.assertFalse(os.path.exists(self.path))
+
+        def worker(n):
+            for i in range(200):
+                writer.write({"worker": n, "i": i})
+                # write mode: the row is in the file when write() returns
+                if i == 0:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self.assertIn(f'"worker": {n}, "i": 0', f.read())
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        writer.close()
+
+        rows = _read_rows(self.path)
+        self.assertEqual(len(rows), 1600)
+        for n in range(8):
+            self.assertEqual([r["i"] for r in rows if r["worker"] == n], list(range(200)))
+        self.assertEqual(writer.records, 1600)
+        self.assertLess(writer.batches, writer.records)
+
+    def test_async_mode_and_flush(self):
+        writer = AuditWriter(self.path, durability="async", fsync_interval_ms=10_000)
+        for i in range(100):
+            writer.write({"i": i})
+        self.assertTrue(writer.flush(timeout=5))
+        self.assertEqual([r["i"] for r in _read_rows(self.path)], list(range(100)))
+        writer.close()
+
+        # Restarts after close
+        writer.write({"i": 100})
+        writer.close()
+        self.assertEqual(len(_read_rows(self.path)), 101)
+
+    def test_rotation_keeps_backups(self):
+        writer = AuditWriter(self.path, durability="fsync", max_bytes=200, backups=2)
+        for i in range(30):
+            writer.write({"i": i, "pad": "y" * 20})
+        writer.close()
+
+        self.assertTrue(os.path.exists(self.path + ".2"))
+        self.assertFalse(os.path.exists(self.path + ".3"))
+        for name in (self.path, self.path + ".1", self.path + ".2"):
+            self.assertLessEqual(os.path.getsize(name), 200)
+        # Oldest rows were rotated out; the newest survive in order
+        kept = sorted(r["i"] for r in _read_rows(self.path))
+        self.assertEqual(kept, list(range(30 - len(kept), 30)))
+
+    def test_failed_write_raises(self):
+        os.makedirs(self.path)
+        writer = AuditWriter(self.path, durability="write")
+        with self.assertRaises(AuditWriteError):
+            writer.write({"i": 0})
+        self.assertEqual(writer.errors, 1)
+        writer.close()
+
+        with self.assertRaises(ValueError):
+            AuditWriter(self.path, durability="sometimes")
+
+    def test_exit_drains_every_writer(self):
+        # Default durability only queues; the one exit hook drains every writer
+        # still running, including ones the caller no longer references
+        script = (
+            "from cortex.audit import AuditWriter\n"
+            "keep = AuditWriter(PATH + '.kept')\n"
+            "keep.write({'n': 'kept'})\n"
+            "AuditWriter(PATH + '.dropped').write({'n': 'dropped'})\n"
+        ).replace("PATH", repr(self.path))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(["src", "services"]))
+        subprocess.run([sys.executable, "-c", script], check=True, env=env, cwd=os.getcwd())
+        for name in ("kept", "dropped"):
+            with open(f"{self.path}.{name}", "r", encoding="utf-8") as f:
+                self.assertEqual([json.loads(line) for line in f], [{"n": name}])
+
+    @unittest.skipIf(fcntl is None, "needs POSIX file locking")
+    def test_processes_share_one_rotating_file(self):
+        ctx = multiprocessing.get_context("fork")
+        procs = [ctx.Process(target=_write_from_process, args=(self.path, w, 300)) for w in range(3)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+            self.assertEqual(p.exitcode, 0)
+
+        # No lost, torn or interleaved lines across rotations
+        rows = _read_rows(self.path)
+        self.assertEqual(len(rows), 900)
+        for w in range(3):
+            self.assertEqual(sorted(r["i"] for r in rows if r["worker"] == w), list(range(300)))
+
+
+if __name__ == '__main__':
+    unittest.main()
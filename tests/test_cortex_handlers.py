@@ -0,0 +1,71 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from cortex import handlers
+from nexus.ask import recall
+from nexus.bricks.source_reader import SourceReader
+
+
+class TestBrickBatchHandlers(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.metadata = {}
+        for t in range(2):
+            path = os.path.join(self.tmp, f"path_{t}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"messages": [
+                    {"message_id": "m1", "role": "user", "created_at": None, "content": f"t{t} first\n\nt{t} second"}
+                ]}, f)
+            for idx in range(2):
+                self.metadata[f"b{t}{idx}"] = {
+                    "source_file": path, "source_span": {"message_id": "m1", "block_index": idx}
+                }
+        # Span that no longer resolves
+        self.metadata["stale"] = {"source_file": path, "source_span": {"message_id": "m1", "block_index": 9}}
+
+        self.reader = SourceReader()
+        patchers = [
+            patch.object(recall, "_source_reader", self.reader),
+            patch.object(recall._brick_store, "get_brick_metadata", side_effect=self.metadata.get),
+        ]
+        for p in patchers:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_batch_meta_matches_single_calls_one_read_per_file(self):
+        ids = ["b11", "b00", "unknown", "b01", "b00", "stale"]
+        payload, status = handlers.bricks_meta({"brick_ids": ids})
+
+        self.assertEqual(status, 200)
+        self.assertEqual([b["brick_id"] for b in payload["bricks"]], ["b11", "b00", "b01", "stale"])
+        self.assertEqual(payload["not_found"], ["unknown"])
+        self.assertEqual(self.reader.misses, 2)
+        for brick in payload["bricks"]:
+            self.assertEqual(brick, handlers.brick_meta(brick["brick_id"])[0])
+        self.assertEqual(payload["bricks"][-1]["text_sample"], "")
+
+    def test_batch_full(self):
+        payload, status = handlers.bricks_full({"brick_ids": ["b01", "stale", "b10"]})
+
+        self.assertEqual(status, 200)
+        self.assertEqual([b["full_text"] for b in payload["bricks"]], ["t0 second", "t1 first"])
+        self.assertEqual(payload["not_found"], ["stale"])
+        self.assertEqual(payload["bricks"][0], handlers.brick_full("b01")[0])
+
+    def test_batch_validation(self):
+        self.assertEqual(handlers.bricks_meta(None)[1], 400)
+        self.assertEqual(handlers.bricks_meta({"brick_ids": "b00"})[1], 400)
+        self.assertEqual(handlers.bricks_full({"brick_ids": [1, 2]})[1], 400)
+        with patch.object(handlers, "BRICK_BATCH_MAX", 2):
+            self.assertEqual(handlers.bricks_meta({"brick_ids": ["a", "b", "c"]})[1], 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from cortex.api import CortexAPI
+from nexus.ask import recall
+from nexus.bricks.brick_store import BrickStore
+from nexus.bricks.extractor import extract_bricks_from_file
+from nexus.bricks.source_reader import SourceReader
+
+
+class TestMode1Reload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.tree = os.path.join(self.tmp, "trees", "conv", "path_1.json")
+        os.makedirs(os.path.dirname(self.tree))
+        self._write_tree([f"block {i} " + "x" * 30 for i in range(200)])
+
+        out = os.path.join(self.tmp, "out")
+        with open(extract_bricks_from_file(self.tree, out), "r", encoding="utf-8") as f:
+            self.ids = [b["brick_id"] for b in json.load(f)]
+
+        self.reader = SourceReader()
+        patchers = [
+            patch.object(recall, "_brick_store", BrickStore(os.path.join(out, "bricks"))),
+            patch.object(recall, "_source_reader", self.reader),
+        ]
+        for p in patchers:
+            p.start()
+            self.addCleanup(p.stop)
+        self.api = CortexAPI(audit_log_path=os.path.join(self.tmp, "audit.jsonl"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _write_tree(self, blocks):
+        with open(self.tree, "w", encoding="utf-8") as f:
+            json.dump({"messages": [{"message_id": "m1", "role": "assistant", "content": "\n\n".join(blocks)}]}, f)
+        st = os.stat(self.tree)
+        os.utime(self.tree, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    def test_reloads_source_blocks_in_brick_order(self):
+        wanted = [self.ids[5], self.ids[0], self.ids[199], self.ids[5]]
+        text = self.api._reload_source_text(wanted)
+        self.assertEqual(text.split("\n"), ["block 5 " + "x" * 30, "block 0 " + "x" * 30, "block 199 " + "x" * 30])
+
+        # Hundreds of bricks from one tree: one parse, then cache hits
+        self.assertEqual(len(self.api._reload_source_text(self.ids, token_budget=10**6).split("\n")), 200)
+        self.assertEqual(self.reader.misses, 1)
+
+    def test_unresolvable_or_edited_source_blocks(self):
+        self.assertIsNone(self.api._reload_source_text([self.ids[0], "unknown"]))
+
+        # Same spans, different text: hashes no longer match
+        self._write_tree([f"edited {i}" for i in range(200)])
+        self.assertIsNone(self.api._reload_source_text([self.ids[0]]))
+
+        # Fewer blocks: the span is gone
+        self._write_tree(["block 0 " + "x" * 30])
+        self.assertEqual(self.api._reload_source_text([self.ids[0]]), "block 0 " + "x" * 30)
+        self.assertIsNone(self.api._reload_source_text([self.ids[0], self.ids[1]]))
+
+    def test_token_budget(self):
+        # 38-char blocks: 40 tokens = 160 chars fits four (4 * 38 + 3 newlines)
+        text = self.api._reload_source_text(self.ids[:10], token_budget=40)
+        self.assertEqual(len(text.split("\n")), 4)
+
+        # The first brick is always kept, cut to the budget
+        self.assertEqual(self.api._reload_source_text(self.ids[:10], token_budget=2), "block 0 ")
+
+        # Still blocked when a brick past the budget cannot be reloaded
+        self.assertIsNone(self.api._reload_source_text(self.ids[:3] + ["unknown"], token_budget=2))
+
+    def test_non_text_blocks_do_not_reload(self):
+        # List content is kept as-is, so a span can point at a non-string block
+        source = {"block": {"type": "image"}, "hash": "0" * 64, "message": {}, "source_file": self.tree,
+                  "source_span": {}}
+        with patch.object(recall, "get_recall_brick_sources", return_value={"b1": source}):
+            self.assertEqual(recall.get_recall_brick_blocks(["b1"]), {})
+            self.assertIsNone(self.api.prepare_prompt("q", ["b1"]))
+
+    def test_empty_blocks_are_not_blocked(self):
+        # Reload succeeded, there just is no text: the query goes through alone
+        with patch.object(recall, "get_recall_brick_blocks", return_value={"b1": ""}):
+            self.assertEqual(self.api._reload_source_text(["b1"]), "")
+            self.assertEqual(self.api.prepare_prompt("q", ["b1"]), "q")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+
+from cortex.router import IntentRouter, RoutingTable
+from nexus.config import CORTEX_ROUTING_RULES_PATH
+
+
+class TestRoutingTable(unittest.TestCase):
+    def setUp(self):
+        self.table = RoutingTable({
+            "default": {"agent_id": "General", "model": "GPT"},
+            "rules": [
+                {"agent_id": "A", "model": "m1", "keywords": ["stock*", "price", "big data"]},
+                {"agent_id": "B", "model": "m2", "keywords": ["code", "stocking", "c++", "dat*"]},
+            ],
+        })
+
+    def test_whole_words_and_stems(self):
+        self.assertEqual(self.table.route("What is the PRICE?")["agent_id"], "A")
+        self.assertEqual(self.table.route("a priceless piece")["agent_id"], "General")
+        self.assertEqual(self.table.route("barcode scanner")["agent_id"], "General")
+        self.assertEqual(self.table.route("stocks and bonds")["agent_id"], "A")
+        self.assertEqual(self.table.route("review my code")["agent_id"], "B")
+        self.assertEqual(self.table.route("is c++ fast")["agent_id"], "B")
+        self.assertEqual(self.table.route("")["agent_id"], "General")
+
+    def test_earliest_rule_wins(self):
+        # Matched by stem "stock*" (rule 0) and exact "stocking" (rule 1)
+        self.assertEqual(self.table.route("stocking the shelves")["agent_id"], "A")
+        self.assertEqual(self.table.route("code that tracks the price")["agent_id"], "A")
+
+    def test_phrase_does_not_hide_earlier_keyword(self):
+        for keyword in ("code", "code*", "cod*"):
+            table = RoutingTable({"rules": [
+                {"agent_id": "A", "model": "m1", "keywords": [keyword]},
+                {"agent_id": "B", "model": "m2", "keywords": ["code review", "review"]},
+            ]})
+            self.assertEqual(table.route("please do a code review")["agent_id"], "A", keyword)
+            self.assertEqual(table.route("review")["agent_id"], "B", keyword)
+        # A keyword starting inside a later rule's phrase
+        table = RoutingTable({"rules": [
+            {"agent_id": "A", "model": "m1", "keywords": ["review*"]},
+            {"agent_id": "B", "model": "m2", "keywords": ["code review"]},
+        ]})
+        self.assertEqual(table.route("code reviewing")["agent_id"], "A")
+        # Still whole words: "code reviewer" is not the exact keyword "code review"
+        table = RoutingTable({"rules": [
+            {"agent_id": "A", "model": "m1", "keywords": ["code review"]},
+        ]})
+        self.assertEqual(table.route("code reviewer")["agent_id"], "General")
+
+    def test_phrases(self):
+        self.assertEqual(self.table.route("all about  Big\nData")["agent_id"], "A")
+        self.assertEqual(self.table.route("a database")["agent_id"], "B")
+
+    def test_bundled_rules(self):
+        with open(CORTEX_ROUTING_RULES_PATH, "r", encoding="utf-8") as f:
+            table = RoutingTable(json.load(f))
+        cases = {
+            "how is the stock market today": "Jarvis",
+            "implement a design for the parser": "Architect",
+            "who wrote this": "ResearchPro",
+            "write me a story": "VideoFactory",
+            "good morning": "General",
+        }
+        for query, agent in cases.items():
+            self.assertEqual(table.route(query)["agent_id"], agent, query)
+
+
+class TestIntentRouterReload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "rules.json")
+        self._write({"rules": [{"agent_id": "A", "model": "m", "keywords": ["alpha"]}]})
+        self.router = IntentRouter(self.path, reload_interval_s=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _write(self, config, raw=None):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(raw if raw is not None else json.dumps(config))
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    def test_hot_reload(self):
+        self.assertEqual(self.router.route("alpha")["agent_id"], "A")
+        self._write({"rules": [{"agent_id": "B", "model": "m", "keywords": ["alpha"]}]})
+        self.assertEqual(self.router.route("alpha")["agent_id"], "B")
+        self.assertEqual(self.router.reloads, 2)
+
+    def test_bad_file_keeps_previous_table(self):
+        self._write(None, raw="{not json")
+        self.assertEqual(self.router.route("alpha")["agent_id"], "A")
+        self._write({"rules": [{"agent_id": "C"}]})
+        self.assertEqual(self.router.route("alpha")["agent_id"], "A")
+
+    def test_missing_file_routes_to_default(self):
+        router = IntentRouter(os.path.join(self.tmp, "missing.json"))
+        self.assertEqual(router.route("alpha"), {"agent_id": "General", "model": "GPT"})
+
+
+if __name__ == '__main__':
+    unittest.main()
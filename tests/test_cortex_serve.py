@@ -0,0 +1,30 @@
+import unittest
+import os
+import tempfile
+import shutil
+
+from cortex.serve import gunicorn_options, reload, post_fork
+
+
+class TestCortexServe(unittest.TestCase):
+    def test_options_preload_threaded_workers(self):
+        options = gunicorn_options(bind="127.0.0.1:0", workers=0, threads=8, pidfile="/tmp/x.pid")
+
+        self.assertTrue(options["preload_app"])
+        self.assertEqual(options["worker_class"], "gthread")
+        self.assertEqual(options["workers"], 1)
+        self.assertEqual(options["threads"], 8)
+        self.assertIs(options["post_fork"], post_fork)
+        self.assertIsNone(options["accesslog"])
+
+    def test_reload_without_running_server(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            with self.assertRaises(RuntimeError):
+                reload(os.path.join(tmp, "cortex.pid"), timeout=0.1)
+        finally:
+            shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+try:
+    from cortex import server
+    HAS_FLASK = True
+except ImportError:
+    HAS_FLASK = False
+
+
+@unittest.skipUnless(HAS_FLASK, "flask not installed")
+class TestFlaskGenerate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.audit_log = os.path.join(self.tmp, "audit.jsonl")
+        self.api = type(server.cortex_api)(audit_log_path=self.audit_log)
+        # The route holds the module's limiter: shrink it to one slot, no queue
+        self.generate_limiter = server.generate_limiter
+        for target, name, value in ((server, "cortex_api", self.api), (self.generate_limiter, "limit", 1),
+                                    (self.generate_limiter, "max_queue", 0)):
+            patcher = patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = server.app.test_client()
+
+    def tearDown(self):
+        self.api.audit.close()
+        shutil.rmtree(self.tmp)
+
+    def _rows(self):
+        self.api.audit.flush()
+        if not os.path.exists(self.audit_log):
+            return []
+        with open(self.audit_log, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_generate_reloads_and_audits(self):
+        with patch.object(type(self.api), "_reload_source_text", return_value="source text"):
+            resp = self.client.post("/cortex/generate", json={"user_id": "u", "query": "q", "brick_ids": ["b1"]})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()["status"], "success")
+        self.assertEqual([r["brick_ids_used"] for r in self._rows()], [["b1"]])
+
+        with patch.object(type(self.api), "_reload_source_text", return_value=None):
+            blocked = self.client.post("/cortex/generate", json={"query": "q", "brick_ids": ["missing"]})
+        self.assertEqual(blocked.status_code, 422)
+        self.assertEqual(len(self._rows()), 1)
+
+        for body in ([], {"query": "q", "brick_ids": [1]}):
+            self.assertEqual(self.client.post("/cortex/generate", json=body).status_code, 400)
+
+    def test_generate_goes_through_admission(self):
+        # The one slot is taken and nothing may queue: shed with 503
+        self.generate_limiter.acquire()
+        try:
+            resp = self.client.post("/cortex/generate", json={"query": "q"})
+        finally:
+            self.generate_limiter.release()
+        self.assertEqual(resp.status_code, 503)
+        self.assertIn("Retry-After", resp.headers)
+        self.assertEqual(self.client.post("/cortex/generate", json={"query": "q"}).status_code, 200)
+
+    def test_generate_stream_sends_events_and_holds_the_slot(self):
+        with patch.object(type(self.api), "_reload_source_text", return_value="source text"):
+            resp = self.client.post("/cortex/generate-stream", json={"query": "what changed", "brick_ids": ["b1"]})
+            self.assertEqual(resp.headers["Content-Type"], "text/event-stream")
+            # Streamed: the slot stays taken until the response is closed
+            self.assertEqual(self.generate_limiter.in_flight, 1)
+            body = resp.get_data(as_text=True)
+            resp.close()
+        self.assertEqual(self.generate_limiter.in_flight, 0)
+
+        frames = [f.split("\n") for f in body.strip().split("\n\n")]
+        events = [(f[0][len("event: "):], json.loads(f[1][len("data: "):])) for f in frames]
+        self.assertTrue(all(name == "token" for name, _ in events[:-1]))
+        self.assertEqual("".join(p["text"] for _, p in events[:-1]), "Simulated response for: what changed...")
+        self.assertEqual(events[-1], ("done", {"model": "gpt-4o", "status": "success"}))
+        self.assertEqual(len(self._rows()), 1)
+
+        with patch.object(type(self.api), "_reload_source_text", return_value=None):
+            blocked = self.client.post("/cortex/generate-stream", json={"query": "q", "brick_ids": ["missing"]})
+        self.assertEqual(blocked.status_code, 422)
+        self.assertEqual(blocked.get_json()["status"], "blocked")
+        self.assertEqual(self.client.post("/cortex/generate-stream", json=[]).status_code, 400)
+        self.assertEqual(len(self._rows()), 1)
+        self.assertEqual(self.generate_limiter.in_flight, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from cortex.api import CortexAPI
+from cortex.simulated import SimulatedModel, split_tokens
+
+
+class TestGenerateStream(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.audit_log = os.path.join(self.tmp, "audit.jsonl")
+        self.api = CortexAPI(audit_log_path=self.audit_log)
+
+    def tearDown(self):
+        self.api.audit.close()
+        shutil.rmtree(self.tmp)
+
+    def _audit_rows(self):
+        self.api.audit.flush()
+        if not os.path.exists(self.audit_log):
+            return []
+        with open(self.audit_log, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_tokens_then_done_then_audit(self):
+        with patch.object(CortexAPI, "_reload_source_text", return_value="context"):
+            events = list(self.api.generate_stream("u", "a", "what changed in the graph", ["b1"]))
+
+        self.assertEqual([e["event"] for e in events[-2:]], ["token", "done"])
+        text = "".join(e["text"] for e in events if e["event"] == "token")
+        self.assertEqual(text, self.api.generate("u", "a", "what changed in the graph", [])["response"])
+        self.assertEqual(self._audit_rows()[0]["brick_ids_used"], ["b1"])
+
+    def test_blocked_reload_and_early_stop(self):
+        with patch.object(CortexAPI, "_reload_source_text", return_value=None):
+            events = list(self.api.generate_stream("u", "a", "q", ["missing"]))
+        self.assertEqual(events, [{"event": "error", "error": "MODE-1 Violation: Source reload failed.",
+                                   "status": "blocked"}])
+        self.assertEqual(self._audit_rows(), [])
+
+        # A consumer that stops after the first token still leaves an audit row
+        stream = self.api.generate_stream("u", "a", "q", [])
+        self.assertEqual(next(stream)["event"], "token")
+        stream.close()
+        self.assertEqual(len(self._audit_rows()), 1)
+
+    def test_split_tokens_round_trips(self):
+        for text in ["", "one", " lead and trail  ", "a\n\nb"]:
+            self.assertEqual("".join(split_tokens(text)), text)
+        self.assertEqual(split_tokens("a b"), ["a", " b"])
+        self.assertEqual(list(SimulatedModel(0).stream("x y")), ["x", " y"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from nexus.vector.embedding_cache import EmbeddingCache
+from nexus.bricks.brick_store import query_to_vector
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def _embed(self, query):
+        self.calls.append(query)
+        return query_to_vector(query)
+
+    def test_hit_skips_embedding(self):
+        cache = EmbeddingCache(1024 * 1024, "v1")
+        first = cache.get_or_compute("apple", self._embed)
+        second = cache.get_or_compute("apple", self._embed)
+
+        self.assertEqual(self.calls, ["apple"])
+        self.assertTrue(np.array_equal(first, second))
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_cached_vectors_are_read_only(self):
+        cache = EmbeddingCache(1024 * 1024, "v1")
+        vec = cache.get_or_compute("apple", self._embed)
+        with self.assertRaises(ValueError):
+            vec[0, 0] = 1.0
+
+    def test_byte_cap_evicts_least_recently_used(self):
+        # Each 384-d float32 vector is 1536 bytes plus overhead; room for two
+        cache = EmbeddingCache(4000, "v1")
+        cache.get_or_compute("a", self._embed)
+        cache.get_or_compute("b", self._embed)
+        cache.get_or_compute("a", self._embed)  # refresh "a"
+        cache.get_or_compute("c", self._embed)  # evicts "b"
+
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.current_bytes, 4000)
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+
+    def test_embedder_version_is_part_of_key(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            EmbeddingCache(1024 * 1024, "v1", cache_dir=tmp).get_or_compute("apple", self._embed)
+            self.assertIsNone(EmbeddingCache(1024 * 1024, "v2", cache_dir=tmp).get("apple"))
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_disk_tier_survives_restart(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            original = EmbeddingCache(1024 * 1024, "v1", cache_dir=tmp).get_or_compute("apple", self._embed)
+            restarted = EmbeddingCache(1024 * 1024, "v1", cache_dir=tmp)
+            restored = restarted.get_or_compute("apple", self._embed)
+
+            self.assertEqual(self.calls, ["apple"])
+            self.assertTrue(np.array_equal(original, restored))
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_disk_tier_is_capped_lru(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            # Each .npy file is 1664 bytes (128-byte header); room for two
+            cache = EmbeddingCache(1024 * 1024, "v1", cache_dir=tmp, disk_max_bytes=4000)
+            cache.get_or_compute("a", self._embed)
+            cache.get_or_compute("b", self._embed)
+            cache.clear()
+            cache.get("a")  # disk hit refreshes "a"
+            cache.get_or_compute("c", self._embed)  # evicts "b" from disk
+
+            files = [name for _, _, names in os.walk(tmp) for name in names]
+            self.assertEqual(len(files), 2)
+            self.assertLessEqual(cache.disk_bytes, 4000)
+
+            # A restart indexes the existing files and applies its own cap
+            restarted = EmbeddingCache(1024 * 1024, "v1", cache_dir=tmp, disk_max_bytes=2000)
+            self.assertEqual(len(restarted._files), 1)
+            self.assertIsNotNone(restarted.get("c"))
+            self.assertIsNone(restarted.get("a"))
+            self.assertIsNone(restarted.get("b"))
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_query_to_vector_leaves_global_rng_alone(self):
+        np.random.seed(7)
+        expected = np.random.random(3)
+        np.random.seed(7)
+        first = query_to_vector("apple")
+        self.assertTrue(np.array_equal(np.random.random(3), expected))
+        self.assertTrue(np.array_equal(query_to_vector("apple"), first))
+        self.assertFalse(np.array_equal(query_to_vector("pear"), first))
+
+    def test_concurrent_access(self):
+        cache = EmbeddingCache(64 * 1024, "v1")
+        queries = [f"q{i % 50}" for i in range(500)]
+
+        def worker():
+            for q in queries:
+                cache.get_or_compute(q, query_to_vector)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertLessEqual(cache.current_bytes, 64 * 1024)
+        self.assertEqual(
+            cache.current_bytes,
+            sum(cache._entry_size(k, v) for k, v in cache._entries.items())
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from nexus.graph.adjacency import GraphAdjacency
+from nexus.graph.store import GraphStore
+
+
+def _chain_graph(n):
+    nodes = [{"id": f"c{i}", "label": f"Concept {i}"} for i in range(n)]
+    edges = [{"source": f"c{i}", "target": f"c{i + 1}", "type": "next"} for i in range(n - 1)]
+    return nodes, edges
+
+
+class TestGraphAdjacency(unittest.TestCase):
+    def test_neighborhood_hops_and_edges(self):
+        nodes, edges = _chain_graph(6)
+        edges.append({"source": "c0", "target": "c2", "type": "skip"})
+        edges.append({"source": "c0", "target": "ghost", "type": "dangling"})
+        g = GraphAdjacency({"nodes": nodes}, {"edges": edges})
+
+        self.assertEqual((g.node_count, g.edge_count), (6, 6))
+        self.assertEqual(g.degree("c0"), 2)
+
+        one = g.neighborhood("c1", hops=1, max_nodes=100)
+        self.assertEqual({n["id"]: n["depth"] for n in one["nodes"]}, {"c1": 0, "c0": 1, "c2": 1})
+        # c0-c2 lies inside the returned set, so it is included too
+        self.assertEqual({(e["source"], e["target"]) for e in one["edges"]},
+                         {("c0", "c1"), ("c1", "c2"), ("c0", "c2")})
+        self.assertFalse(one["truncated"])
+
+        # Edges are walked in both directions
+        two = g.neighborhood("c3", hops=2, max_nodes=100)
+        self.assertEqual({n["id"]: n["depth"] for n in two["nodes"]},
+                         {"c3": 0, "c2": 1, "c4": 1, "c1": 2, "c0": 2, "c5": 2})
+
+        capped = g.neighborhood("c3", hops=3, max_nodes=3)
+        self.assertEqual(len(capped["nodes"]), 3)
+        self.assertTrue(capped["truncated"])
+
+        self.assertIsNone(g.neighborhood("ghost", hops=1, max_nodes=10))
+
+    def test_search_and_pages(self):
+        nodes = [{"id": "a", "label": "Alignment"}, {"id": "b", "label": "AI Safety"},
+                 {"id": "c", "label": "alpha"}, {"id": "d"}]
+        g = GraphAdjacency(nodes, [])
+
+        self.assertEqual([n["id"] for n in g.search("al", 10)], ["a", "c"])
+        self.assertEqual([n["id"] for n in g.search("AL", 1)], ["a"])
+        self.assertEqual([n["id"] for n in g.search("d", 10)], ["d"])
+        self.assertEqual(g.search("zz", 10), [])
+        self.assertEqual([n["id"] for n in g.list_nodes(1, 2)], ["b", "c"])
+        self.assertEqual(g.list_edges(0, 10), [])
+
+
+class TestGraphQueryHandlers(unittest.TestCase):
+    def setUp(self):
+        from cortex import handlers
+        self.handlers = handlers
+        self.tmp = tempfile.mkdtemp()
+        nodes, edges = _chain_graph(5)
+        for name, content in (("nodes.json", nodes), ("edges.json", edges)):
+            with open(os.path.join(self.tmp, name), "w", encoding="utf-8") as f:
+                json.dump(content, f)
+        with open(os.path.join(self.tmp, "index.md"), "w", encoding="utf-8") as f:
+            f.write("# Graph")
+        patcher = patch.object(handlers, "_graph_store", GraphStore(self.tmp))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_pagination(self):
+        page, status = self.handlers.graph_nodes({"limit": "2"})
+        self.assertEqual(status, 200)
+        self.assertEqual([n["id"] for n in page["nodes"]], ["c0", "c1"])
+        self.assertEqual((page["total"], page["next_offset"]), (5, 2))
+
+        last, _ = self.handlers.graph_nodes({"offset": "4", "limit": "2"})
+        self.assertEqual([n["id"] for n in last["nodes"]], ["c4"])
+        self.assertIsNone(last["next_offset"])
+
+        edges, _ = self.handlers.graph_edges({"offset": "3"})
+        self.assertEqual(edges["edges"], [{"source": "c3", "target": "c4", "type": "next"}])
+
+        self.assertEqual(self.handlers.graph_nodes({"limit": "0"})[1], 400)
+        self.assertEqual(self.handlers.graph_nodes({"offset": "x"})[1], 400)
+
+    def test_summary_search_neighborhood(self):
+        summary, _ = self.handlers.graph_summary({})
+        self.assertEqual((summary["node_count"], summary["edge_count"]), (5, 4))
+        self.assertEqual(summary["index_content"], "# Graph")
+
+        found, _ = self.handlers.graph_search({"prefix": "concept 3"})
+        self.assertEqual([n["id"] for n in found["nodes"]], ["c3"])
+        self.assertEqual(self.handlers.graph_search({})[1], 400)
+
+        hood, _ = self.handlers.graph_neighborhood({"node_id": "c0", "hops": "2"})
+        self.assertEqual(len(hood["nodes"]), 3)
+        self.assertEqual(self.handlers.graph_neighborhood({"node_id": "nope"})[1], 404)
+        self.assertEqual(self.handlers.graph_neighborhood({"node_id": "c0", "hops": "99"})[1], 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
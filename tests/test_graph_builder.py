@@ -0,0 +1,107 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from nexus.graph.builder import GraphBuilder, iter_brick_files
+from nexus.graph.store import GraphStore
+
+
+def _bricks(prefix, texts):
+    return [{"brick_id": f"{prefix}{i}", "content": text} for i, text in enumerate(texts)]
+
+
+class TestGraphBuilder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.graph_dir = os.path.join(self.tmp, "graph")
+        self.builder = GraphBuilder(os.path.join(self.tmp, "state.sqlite"), top_k=1, min_df=2,
+                                    min_count=2, max_bricks_per_node=2, chunk_size=2)
+
+    def tearDown(self):
+        self.builder.close()
+        shutil.rmtree(self.tmp)
+
+    def _read(self, name):
+        with open(os.path.join(self.graph_dir, name), encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_nodes_edges_and_pruning(self):
+        stats = self.builder.update(_bricks("b", [
+            "Alignment of the reward model",
+            "reward model alignment",
+            "reward model training",
+            "Safety and alignment, 2024",
+        ]), self.graph_dir)
+        self.assertEqual(stats["bricks_added"], 4)
+
+        nodes = {n["label"]: n for n in self._read("nodes.json")}
+        # "training" / "safety" appear once, stopwords and numbers never
+        self.assertEqual(set(nodes), {"alignment", "reward", "model"})
+        self.assertEqual(nodes["reward"]["df"], 3)
+        self.assertEqual(nodes["reward"]["bricks"], ["b0", "b1"])
+        self.assertEqual(nodes["alignment"]["id"], "concept_alignment")
+
+        # top_k=1: reward<->model (3) is kept by both; alignment keeps one of its two links
+        edges = {frozenset((e["source"], e["target"])): e for e in self._read("edges.json")}
+        self.assertEqual(len(edges), 2)
+        self.assertEqual(edges[frozenset(("concept_reward", "concept_model"))]["weight"], 3)
+        self.assertTrue(all(e["type"] == "co_occurs" for e in edges.values()))
+
+        # Output is readable by the server-side store
+        store = GraphStore(self.graph_dir)
+        self.assertEqual(store.summary()["node_count"], 3)
+        self.assertEqual(store.summary()["index_content"], "# Concept Index\n")
+
+    def test_incremental_update_touches_only_new_terms(self):
+        self.builder.update(_bricks("a", ["reward model", "reward model", "safety model"]), self.graph_dir)
+        self.assertEqual([n["label"] for n in self._read("nodes.json")], ["model", "reward"])
+
+        # Re-syncing the same bricks counts nothing and leaves the files alone
+        mtime = os.stat(os.path.join(self.graph_dir, "nodes.json")).st_mtime_ns
+        again = self.builder.update(_bricks("a", ["reward model", "reward model", "safety model"]), self.graph_dir)
+        self.assertEqual((again["bricks_added"], again["terms_refreshed"]), (0, 0))
+        self.assertEqual(os.stat(os.path.join(self.graph_dir, "nodes.json")).st_mtime_ns, mtime)
+
+        stats = self.builder.update(_bricks("c", ["safety review", "safety review"]), self.graph_dir)
+        self.assertEqual((stats["bricks_added"], stats["terms_refreshed"]), (2, 2))
+        nodes = {n["label"]: n["df"] for n in self._read("nodes.json")}
+        self.assertEqual(nodes, {"model": 3, "reward": 2, "safety": 3, "review": 2})
+        edges = {frozenset((e["source"], e["target"])) for e in self._read("edges.json")}
+        self.assertIn(frozenset(("concept_safety", "concept_review")), edges)
+
+    def test_term_reaching_min_df_reranks_its_neighbors(self):
+        builder = GraphBuilder(":memory:", top_k=1, min_df=3, min_count=2)
+        self.addCleanup(builder.close)
+        builder.update(_bricks("a", ["alpha beta", "alpha beta", "alpha gamma"]), self.graph_dir)
+        # beta (df 2) is not a node yet, so alpha has no neighbour
+        self.assertEqual([n["label"] for n in self._read("nodes.json")], ["alpha"])
+
+        # beta reaches min_df through bricks without alpha; beta's own top-1
+        # is delta, so the alpha-beta edge only exists if alpha was re-ranked
+        stats = builder.update(_bricks("b", ["beta delta"] * 3), self.graph_dir)
+        self.assertEqual(stats["terms_refreshed"], 3)
+        edges = {frozenset((e["source"], e["target"])) for e in self._read("edges.json")}
+        self.assertEqual(edges, {frozenset(("concept_alpha", "concept_beta")),
+                                 frozenset(("concept_beta", "concept_delta"))})
+
+    def test_state_survives_reopen_and_brick_files(self):
+        bricks_dir = os.path.join(self.tmp, "bricks", "conv")
+        os.makedirs(bricks_dir)
+        with open(os.path.join(bricks_dir, "t_bricks.json"), "w", encoding="utf-8") as f:
+            json.dump(_bricks("f", ["reward model", "reward model"]), f)
+        self.builder.add_bricks(iter_brick_files(os.path.join(self.tmp, "bricks")))
+        self.builder.close()
+
+        self.builder = GraphBuilder(os.path.join(self.tmp, "state.sqlite"), min_df=2)
+        self.assertEqual(self.builder.add_bricks(_bricks("f", ["reward model"])), 0)
+        self.assertEqual(self.builder.refresh(), 2)
+        self.assertEqual(self.builder.write(self.graph_dir), {"nodes": 2, "edges": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import unittest
+import sys
+import os
+import gzip
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from nexus.graph.store import GraphStore
+
+
+def _write(path, content):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content if isinstance(content, str) else json.dumps(content))
+
+
+class TestGraphStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        _write(os.path.join(self.tmp, "nodes.json"), [{"id": "c1", "label": "Concept"}])
+        _write(os.path.join(self.tmp, "edges.json"), [])
+        _write(os.path.join(self.tmp, "index.md"), "# Index")
+        self.store = GraphStore(self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _touch(self, name, content):
+        path = os.path.join(self.tmp, name)
+        _write(path, content)
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    def test_built_once_until_files_change(self):
+        first = self.store.get()
+        self.assertEqual(json.loads(first.body)["nodes"][0]["id"], "c1")
+        self.assertEqual(json.loads(first.body)["anchor_overrides"], [])
+        self.assertEqual(gzip.decompress(first.gzip_body), first.body)
+
+        with patch("builtins.open", side_effect=AssertionError("graph re-read")):
+            self.assertIs(self.store.get(), first)
+        self.assertEqual(self.store.builds, 1)
+
+        self._touch("anchors.override.json", {"overrides": [{"concept_id": "c1"}]})
+        second = self.store.get()
+        self.assertNotEqual(second.etag, first.etag)
+        self.assertEqual(json.loads(second.body)["anchor_overrides"], [{"concept_id": "c1"}])
+
+        # Rewritten with identical content: rebuilt, same ETag
+        self._touch("index.md", "# Index")
+        self.assertEqual(self.store.get().etag, second.etag)
+
+    def test_views_swap_in_together(self):
+        first = self.store.snapshot()
+        self.assertIs(self.store.get(), first.payload)
+        self.assertIs(self.store.adjacency(), first.adjacency)
+        self.assertFalse(hasattr(first, "nodes") or hasattr(first, "edges"))
+
+        self._touch("nodes.json", [{"id": "c1"}, {"id": "c2"}])
+        self._touch("edges.json", [{"source": "c1", "target": "c2", "type": "rel"}])
+        self._touch("index.md", "# Two")
+        summary = self.store.summary()
+        second = self.store.snapshot()
+        self.assertIsNot(second, first)
+        self.assertEqual((summary["index_content"], summary["node_count"], summary["edge_count"]),
+                         ("# Two", 2, 1))
+        self.assertEqual(len(json.loads(second.payload.body)["nodes"]), 2)
+        self.assertEqual(self.store.builds, 2)
+
+    def test_bundled_graph_is_a_read_only_fallback(self):
+        built = os.path.join(self.tmp, "built")
+        store = GraphStore(built, fallback_dir=self.tmp)
+        self.assertEqual(store.summary()["index_content"], "# Index")
+        self.assertFalse(os.path.exists(built))
+
+        os.makedirs(built)
+        _write(os.path.join(built, "nodes.json"), [{"id": "concept_reward"}])
+        _write(os.path.join(built, "edges.json"), [])
+        _write(os.path.join(built, "index.md"), "# Built")
+        self.assertEqual(store.summary()["index_content"], "# Built")
+
+    def test_missing_required_file(self):
+        os.remove(os.path.join(self.tmp, "edges.json"))
+        self.assertIsNone(self.store.get())
+
+    def test_if_none_match(self):
+        payload = self.store.get()
+        self.assertTrue(payload.matches(payload.etag))
+        self.assertTrue(payload.matches(f'"other", W/{payload.etag}'))
+        self.assertTrue(payload.matches("*"))
+        self.assertFalse(payload.matches('"other"'))
+        self.assertFalse(payload.matches(None))
+
+
+class TestGraphIndexHandler(unittest.TestCase):
+    def setUp(self):
+        from cortex import handlers
+        self.handlers = handlers
+        self.tmp = tempfile.mkdtemp()
+        _write(os.path.join(self.tmp, "nodes.json"), [])
+        _write(os.path.join(self.tmp, "edges.json"), [])
+        _write(os.path.join(self.tmp, "index.md"), "")
+        patcher = patch.object(handlers, "_graph_store", GraphStore(self.tmp))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_conditional_and_compressed(self):
+        body, status, headers = self.handlers.graph_index(None, "gzip, deflate")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(body))["nodes"], [])
+
+        gzip_etag = headers["ETag"]
+        body, status, _ = self.handlers.graph_index(gzip_etag, "gzip")
+        self.assertEqual((body, status), (b"", 304))
+
+        # The identity body has its own ETag; a gzip tag does not revalidate it
+        body, status, headers = self.handlers.graph_index(gzip_etag, "identity")
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers["ETag"], gzip_etag)
+        self.assertEqual(self.handlers.graph_index(headers["ETag"], "")[1], 304)
+
+        body, status, headers = self.handlers.graph_index('"stale"', "")
+        self.assertEqual(status, 200)
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertEqual(json.loads(body)["index_content"], "")
+
+        os.remove(os.path.join(self.tmp, "nodes.json"))
+        self.assertEqual(self.handlers.graph_index()[1], 404)
+
+    def test_accept_encoding_q_values(self):
+        accepts = self.handlers.accepts_gzip
+        self.assertTrue(accepts("gzip, deflate"))
+        self.assertTrue(accepts("deflate;q=1, GZIP;q=0.5"))
+        self.assertTrue(accepts("br, *"))
+        self.assertFalse(accepts("gzip;q=0"))
+        self.assertFalse(accepts("gzip; q=0.000, *"))
+        self.assertFalse(accepts("*;q=0"))
+        self.assertFalse(accepts("deflate, br"))
+        self.assertFalse(accepts(""))
+
+        body, status, headers = self.handlers.graph_index(None, "gzip;q=0, identity")
+        self.assertEqual(status, 200)
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertEqual(json.loads(body)["nodes"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import os
+import json
+import logging
+import shutil
+import tempfile
+
+from nexus.observability import logs
+
+
+class TestStructuredLogs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "logs", "nexus.jsonl")
+        self.root_level = logging.getLogger().level
+        self.log = logging.getLogger("nexus.test")
+
+    def tearDown(self):
+        logs.shutdown()
+        logging.getLogger().setLevel(self.root_level)
+        shutil.rmtree(self.tmp)
+
+    def _records(self):
+        logs.shutdown()
+        with open(self.path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_json_lines_with_fields_and_request_id(self):
+        logs.configure(level="DEBUG", path=self.path)
+        with logs.request_context("req-1"):
+            self.log.debug("reloading %s", "source", extra={"bricks": 3})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            self.log.exception("failed")
+
+        first, second = self._records()
+        self.assertEqual(first["level"], "DEBUG")
+        self.assertEqual(first["logger"], "nexus.test")
+        self.assertEqual(first["msg"], "reloading source")
+        self.assertEqual(first["request_id"], "req-1")
+        self.assertEqual(first["bricks"], 3)
+        self.assertNotIn("request_id", second)
+        self.assertIn("ValueError: boom", second["exc"])
+
+    def test_level_filters_debug(self):
+        logs.configure(level="INFO", path=self.path)
+        self.log.debug("dropped")
+        self.log.info("kept")
+        self.assertEqual([r["msg"] for r in self._records()], ["kept"])
+
+    def test_sampling_is_per_request_and_spares_warnings(self):
+        logs.configure(level="DEBUG", path=self.path, sample_rate=0.5)
+        for i in range(200):
+            with logs.request_context(f"req-{i}"):
+                self.log.debug("a")
+                self.log.info("b")
+                self.log.warning("c")
+
+        by_request = {}
+        for record in self._records():
+            by_request.setdefault(record["request_id"], []).append(record["msg"])
+        self.assertEqual(len(by_request), 200)
+        kept = [msgs for msgs in by_request.values() if msgs == ["a", "b", "c"]]
+        dropped = [msgs for msgs in by_request.values() if msgs == ["c"]]
+        self.assertEqual(len(kept) + len(dropped), 200)
+        self.assertTrue(50 < len(kept) < 150)
+
+    def test_text_format(self):
+        logs.configure(level="INFO", fmt="text", path=self.path)
+        with logs.request_context("req-9"):
+            self.log.info("hello")
+        logs.shutdown()
+        with open(self.path, "r", encoding="utf-8") as f:
+            line = f.read()
+        self.assertIn("INFO nexus.test [req-9] hello", line)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from nexus.observability import metrics
+from nexus.observability.metrics import Registry
+from nexus.rerank.orchestrator import RerankOrchestrator
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_and_gauge_exposition(self):
+        requests = self.registry.counter("app_requests_total", "Requests", ("route",))
+        requests.labels("a").inc()
+        requests.labels("a").inc(2)
+        requests.labels('q"x').inc()
+        depth = self.registry.gauge("app_depth", "Depth")
+        depth.set(3)
+        depth.dec()
+        size = self.registry.gauge("app_size", "Size")
+        size.set_function(lambda: 42)
+
+        lines = self.registry.render().splitlines()
+        self.assertIn("# TYPE app_requests_total counter", lines)
+        self.assertIn('app_requests_total{route="a"} 3', lines)
+        self.assertIn('app_requests_total{route="q\\"x"} 1', lines)
+        self.assertIn("app_depth 2", lines)
+        self.assertIn("app_size 42", lines)
+
+    def test_histogram_buckets_are_cumulative(self):
+        latency = self.registry.histogram("app_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.labels("x").observe(value)
+
+        lines = self.registry.render().splitlines()
+        self.assertIn('app_seconds_bucket{stage="x",le="0.1"} 2', lines)
+        self.assertIn('app_seconds_bucket{stage="x",le="1"} 3', lines)
+        self.assertIn('app_seconds_bucket{stage="x",le="+Inf"} 4', lines)
+        self.assertIn('app_seconds_count{stage="x"} 4', lines)
+        self.assertIn('app_seconds_sum{stage="x"} 3.65', lines)
+
+    def test_registration_is_idempotent_but_checked(self):
+        a = self.registry.counter("app_total", "A", ("x",))
+        self.assertIs(self.registry.counter("app_total", "A", ("x",)), a)
+        with self.assertRaises(ValueError):
+            self.registry.gauge("app_total", "A", ("x",))
+        with self.assertRaises(ValueError):
+            a.labels("1", "2")
+
+    def test_disabled_registry_ignores_updates(self):
+        registry = Registry(enabled=False)
+        c = registry.counter("app_total", "A")
+        h = registry.histogram("app_seconds", "B")
+        c.inc()
+        h.observe(1.0)
+        self.assertIn("app_total 0", registry.render())
+        self.assertIn("app_seconds_count 0", registry.render())
+
+    def test_write_textfile(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            self.registry.counter("app_total", "A").inc()
+            path = os.path.join(tmp, "prom", "nexus.prom")
+            self.registry.write_textfile(path)
+            with open(path, "r", encoding="utf-8") as f:
+                self.assertIn("app_total 1", f.read())
+            self.assertEqual(os.listdir(os.path.dirname(path)), ["nexus.prom"])
+        finally:
+            shutil.rmtree(tmp)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_rerank_stages_are_recorded(self):
+        with patch('nexus.rerank.orchestrator.LlmReranker', side_effect=ImportError), \
+             patch('nexus.rerank.orchestrator.CrossEncoderReranker', side_effect=ImportError):
+            orch = RerankOrchestrator()
+        stage = metrics.REGISTRY.histogram(
+            "nexus_rerank_stage_seconds", "", ("stage", "status")
+        ).labels("heuristic", "ok")
+        used = metrics.REGISTRY.counter("nexus_rerank_requests_total", "", ("reranker",)).labels("heuristic")
+        before_stage, before_used = stage.snapshot()[0][-1], used.get()
+
+        orch.rerank("alpha", [{"brick_id": "b1", "base_confidence": 0.5, "brick_text": "alpha beta"}])
+
+        self.assertEqual(stage.snapshot()[0][-1], before_stage + 1)
+        self.assertEqual(used.get(), before_used + 1)
+        self.assertIn('nexus_rerank_stage_seconds_count{stage="heuristic",status="ok"}', metrics.render())
+
+
+if __name__ == '__main__':
+    unittest.main()
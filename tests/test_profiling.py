@@ -0,0 +1,122 @@
+import unittest
+import os
+import pstats
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from nexus.observability import profiling
+from nexus.observability.profiling import Profiler
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+@profiling.profiled("busy")
+def busy_section(seconds):
+    return spin(seconds)
+
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    n = 0
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+@profiling.profiled("alloc")
+def allocate():
+    return [bytes(1024) for _ in range(2000)]
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        profiling.stop()
+        shutil.rmtree(self.tmp)
+
+    def _run_in_thread(self, fn, *args):
+        t = threading.Thread(target=fn, args=args, name="worker")
+        t.start()
+        t.join()
+
+    def test_sections_are_plain_calls_when_disabled(self):
+        self.assertIsNone(profiling.active())
+        self.assertGreater(busy_section(0.001), 0)
+
+    def test_sampling_writes_collapsed_stacks(self):
+        with Profiler("test", mode="sample", out_dir=self.tmp, interval_ms=1) as profiler:
+            self._run_in_thread(busy_section, 0.2)
+
+        [path] = profiler.written
+        self.assertTrue(path.endswith(".folded"))
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [line.rsplit(" ", 1) for line in f.read().splitlines()]
+        busy = [(stack, int(count)) for stack, count in lines if stack.startswith("worker;busy;")]
+        self.assertTrue(busy)
+        self.assertTrue(any("spin (test_profiling.py:" in stack for stack, _ in busy))
+        self.assertGreater(sum(count for _, count in busy), 20)
+
+    def test_cprofile_section_on_another_thread(self):
+        with Profiler("test", mode="cprofile", out_dir=self.tmp) as profiler:
+            self._run_in_thread(busy_section, 0.01)
+            busy_section(0.01)
+
+        names = sorted(os.path.basename(p) for p in profiler.written)
+        self.assertEqual(names, [f"test-{os.getpid()}-busy.prof", f"test-{os.getpid()}.prof"])
+        for path in profiler.written:
+            functions = {func for _, _, func in pstats.Stats(path).stats}
+            self.assertIn("spin", functions)
+
+    def test_memory_snapshot(self):
+        with Profiler("test", mode=None, memory=True, out_dir=self.tmp) as profiler:
+            kept = allocate()
+
+        folded, top = profiler.written
+        with open(folded, "r", encoding="utf-8") as f:
+            sizes = {}
+            for line in f:
+                stack, size = line.rsplit(" ", 1)
+                sizes[stack] = int(size)
+        self.assertGreater(sum(size for stack, size in sizes.items() if "test_profiling.py" in stack),
+                           len(kept) * 1024)
+        with open(top, "r", encoding="utf-8") as f:
+            self.assertTrue(f.readline().startswith("# live: "))
+
+    def test_one_profiler_at_a_time(self):
+        with Profiler("test", mode="sample", out_dir=self.tmp):
+            with self.assertRaises(RuntimeError):
+                Profiler("other", out_dir=self.tmp).start()
+        with self.assertRaises(ValueError):
+            Profiler("test", mode="perf")
+
+
+class TestProfileCommand(unittest.TestCase):
+    def test_wraps_a_subcommand(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(tmp, "out", "bricks"))
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+                [os.path.join(REPO_ROOT, "src"), os.path.join(REPO_ROOT, "services")]))
+            result = subprocess.run(
+                [sys.executable, "-m", "nexus.cli.main", "profile", "--out", os.path.join(tmp, "prof"),
+                 "graph-build", "--input", os.path.join(tmp, "out"), "--output", os.path.join(tmp, "graph"),
+                 "--state", os.path.join(tmp, "state.sqlite")],
+                cwd=tmp, env=env, capture_output=True, text=True, timeout=120,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertIn("Graph built", result.stdout)
+            written = os.listdir(os.path.join(tmp, "prof"))
+            self.assertEqual(len(written), 1)
+            self.assertTrue(written[0].startswith("nexus-graph-build-") and written[0].endswith(".folded"))
+        finally:
+            shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import sys
+import os
+import socket
+import tempfile
+import shutil
+import threading
+
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from nexus.rerank.cross_encoder import CrossEncoderReranker
+from nexus.rerank.service import RerankService, RemoteReranker
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def predict(self, pairs, **kwargs):
+        with self.lock:
+            self.calls += 1
+        if any("boom" in query for query, _ in pairs):
+            raise ValueError("model rejected the input")
+        return [float(sum(w in text for w in query.split())) for query, text in pairs]
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets not available")
+class TestRerankService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.tmp, "rerank.sock")
+        self.model = CountingModel()
+        # Large batch so pooled requests stay in one predict call
+        self.service = RerankService(
+            self.socket_path,
+            {"cross_encoder": CrossEncoderReranker(model=self.model, batch_size=1024)},
+            batch_window_ms=50
+        )
+        self.service.start()
+        threading.Thread(target=self.service.serve_forever, daemon=True).start()
+        self.candidates = [
+            {"brick_id": "1", "brick_text": "banana bread", "base_confidence": 0.5, "extra": "kept"},
+            {"brick_id": "2", "brick_text": "apple pie recipe", "base_confidence": 0.4},
+        ]
+
+    def tearDown(self):
+        self.service.shutdown()
+        shutil.rmtree(self.tmp)
+
+    def test_remote_rank_matches_local(self):
+        client = RemoteReranker(self.socket_path, "cross_encoder")
+        self.assertEqual(client.info()["stages"], ["cross_encoder"])
+
+        results = client.rank("apple pie", [dict(c) for c in self.candidates])
+        local = CrossEncoderReranker(model=CountingModel()).rank("apple pie", [dict(c) for c in self.candidates])
+
+        self.assertEqual([r["brick_id"] for r in results], [r["brick_id"] for r in local])
+        self.assertEqual([r["final_score"] for r in results], [r["final_score"] for r in local])
+        self.assertEqual(results[0]["reranker_used"], "cross_encoder")
+        # Caller's dicts are updated in place, fields not sent over the wire survive
+        self.assertEqual(results[1]["extra"], "kept")
+
+    def test_concurrent_callers_share_batches(self):
+        client = RemoteReranker(self.socket_path, "cross_encoder")
+        barrier = threading.Barrier(8)
+        results = []
+
+        def worker(i):
+            barrier.wait()
+            results.append(client.rank(f"apple {i}", [dict(c) for c in self.candidates]))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(results), 8)
+        self.assertLess(self.model.calls, 8)
+
+    def test_failing_request_does_not_fail_its_batch(self):
+        client = RemoteReranker(self.socket_path, "cross_encoder")
+        barrier = threading.Barrier(5)
+        results, errors = {}, {}
+
+        def worker(query):
+            barrier.wait()
+            try:
+                results[query] = client.rank(query, [dict(c) for c in self.candidates])
+            except RuntimeError as e:
+                errors[query] = str(e)
+
+        queries = ["apple 0", "apple 1", "boom", "apple 2", "apple 3"]
+        threads = [threading.Thread(target=worker, args=(q,)) for q in queries]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(sorted(results), ["apple 0", "apple 1", "apple 2", "apple 3"])
+        self.assertEqual(errors, {"boom": "model rejected the input"})
+
+    def test_unknown_stage_raises(self):
+        with self.assertRaises(RuntimeError):
+            RemoteReranker(self.socket_path, "llm_reranker").rank("q", [dict(c) for c in self.candidates])
+
+
+if __name__ == '__main__':
+    unittest.main()
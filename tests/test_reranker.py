@@ -4,6 +4,7 @@ import os
 import shutil
 import tempfile
 import json
+import time
 from unittest.mock import MagicMock, patch
 
 # Use the properly installed nexus package
@@ -12,6 +13,27 @@ sys.path.insert(0, os.path.join(os.getcwd(), "src"))
 
 from nexus.rerank.heuristic import HeuristicReranker
 from nexus.rerank.orchestrator import RerankOrchestrator
+from nexus.rerank.llm_reranker import LlmReranker
+from nexus.rerank.cross_encoder import CrossEncoderReranker
+
+class StubLlm:
+    """Answers listwise prompts with fixed per-passage scores, pointwise with 0.5."""
+    def __init__(self, scores, omit=()):
+        self.scores = scores
+        self.omit = set(omit)
+        self.prompts = []
+
+    def __call__(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        if "Scores:" not in prompt:
+            return {"choices": [{"text": " 0.5"}]}
+        lines = []
+        for line in prompt.splitlines():
+            if line.startswith("[") and "]" in line:
+                idx = int(line[1:line.index("]")])
+                if idx not in self.omit:
+                    lines.append(f"{idx}: {self.scores[idx - 1]}")
+        return {"choices": [{"text": "\n".join(lines)}]}
 
 class TestReranker(unittest.TestCase):
     def setUp(self):
@@ -31,6 +53,54 @@ class TestReranker(unittest.TestCase):
         self.assertEqual(results[0]["reranker_used"], "heuristic")
         self.assertTrue(results[0]["final_score"] > 0)
 
+    def test_llm_listwise_single_call(self):
+        stub = StubLlm([0.2, 0.9, 0.1])
+        reranker = LlmReranker(llm=stub, mode="listwise", batch_size=10)
+        results = reranker.rank(self.query, [c.copy() for c in self.candidates])
+
+        self.assertEqual(len(stub.prompts), 1)
+        self.assertEqual([r["brick_id"] for r in results], ["2", "1", "3"])
+        self.assertEqual(results[0]["reranker_used"], "llm_reranker")
+        self.assertAlmostEqual(results[0]["final_score"], 0.9)
+
+    def test_llm_listwise_batches_and_pointwise_fallback(self):
+        stub = StubLlm([0.2, 0.9], omit=[2])
+        reranker = LlmReranker(llm=stub, mode="listwise", batch_size=2)
+        results = reranker.rank(self.query, [c.copy() for c in self.candidates])
+
+        # Batches [1, 2] and [3]; passage 2 was missing so it is retried pointwise
+        self.assertEqual(len(stub.prompts), 3)
+        scores = {r["brick_id"]: r["final_score"] for r in results}
+        self.assertAlmostEqual(scores["1"], 0.2)
+        self.assertAlmostEqual(scores["2"], 0.5)
+
+    def test_llm_pointwise_mode(self):
+        stub = StubLlm([])
+        reranker = LlmReranker(llm=stub, mode="pointwise")
+        reranker.rank(self.query, [c.copy() for c in self.candidates])
+        self.assertEqual(len(stub.prompts), len(self.candidates))
+
+    def test_cross_encoder_length_buckets(self):
+        class LengthModel:
+            def __init__(self):
+                self.batches = []
+
+            def predict(self, pairs, batch_size=32, **kwargs):
+                self.batches.append([len(text) for _, text in pairs])
+                return [float(len(text)) for _, text in pairs]
+
+        model = LengthModel()
+        reranker = CrossEncoderReranker(model=model, batch_size=2, max_length=4)
+        texts = ["x" * 30, "x" * 5, "x" * 20, "x" * 1, "x" * 100]
+        scores = reranker.predict_pairs([["q", t] for t in texts])
+
+        # Scores come back in input order; batches are length-sorted and capped
+        self.assertEqual(scores, [30.0, 5.0, 20.0, 1.0, 100.0])
+        self.assertEqual(model.batches, [[1, 5], [20, 30], [100]])
+
+        reranker.rank("q", [{"brick_id": "long", "brick_text": "x" * 100}])
+        self.assertEqual(model.batches[-1], [32])  # truncated to max_length * 8 chars
+
     def test_orchestrator_fallback(self):
         # Patch LlmReranker and CrossEncoderReranker to fail on init or usage
         with patch('nexus.rerank.orchestrator.LlmReranker', side_effect=ImportError("Mock missing LLM")), \
@@ -43,6 +113,112 @@ class TestReranker(unittest.TestCase):
             self.assertEqual(results[0]["reranker_used"], "heuristic")
             self.assertEqual(results[0]["brick_id"], "1")
 
+    def _orchestrator_with(self, primary=None, secondary=None):
+        with patch('nexus.rerank.orchestrator.LlmReranker', side_effect=ImportError("Mock missing LLM")), \
+             patch('nexus.rerank.orchestrator.CrossEncoderReranker', side_effect=ImportError("Mock missing CrossEncoder")):
+            orch = RerankOrchestrator()
+        orch.primary = primary
+        orch.secondary = secondary
+        return orch
+
+    def test_orchestrator_deadline_skips_slow_stage(self):
+        class SlowReranker:
+            def rank(self, query, candidates):
+                time.sleep(1.0)
+                return candidates
+
+        orch = self._orchestrator_with(primary=SlowReranker())
+        timings = {}
+        start = time.perf_counter()
+        results = orch.rerank(self.query, [c.copy() for c in self.candidates], budget_ms=50, timings=timings)
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(timings["llm_reranker"]["status"], "timeout")
+        self.assertEqual(timings["heuristic"]["status"], "ok")
+        self.assertEqual(results[0]["reranker_used"], "heuristic")
+        self.assertEqual(len(results), len(self.candidates))
+
+    def test_orchestrator_deadline_uses_stage_within_budget(self):
+        orch = self._orchestrator_with(secondary=LlmReranker(llm=StubLlm([0.2, 0.9, 0.1])))
+        timings = {}
+        results = orch.rerank(self.query, [c.copy() for c in self.candidates], budget_ms=1000, timings=timings)
+
+        self.assertEqual(timings["cross_encoder"]["status"], "ok")
+        self.assertEqual(results[0]["brick_id"], "2")
+        self.assertEqual(results[0]["reranker_used"], "llm_reranker")
+
+    def test_cascade_only_sends_top_n_to_expensive_stages(self):
+        class RecordingReranker:
+            def __init__(self, name):
+                self.name = name
+                self.seen = []
+
+            def rank(self, query, candidates):
+                self.seen = [c["brick_id"] for c in candidates]
+                # Reverse the head to prove the stage's order wins
+                candidates.reverse()
+                for c in candidates:
+                    c["reranker_used"] = self.name
+                return candidates
+
+        cross = RecordingReranker("cross_encoder")
+        llm = RecordingReranker("llm_reranker")
+        orch = self._orchestrator_with(primary=llm, secondary=cross)
+        orch.stage_top_n = {"cross_encoder": 2, "llm_reranker": 1}
+
+        candidates = [
+            {"brick_id": "a", "brick_text": "apple apple", "base_confidence": 0.9},
+            {"brick_id": "b", "brick_text": "apple", "base_confidence": 0.5},
+            {"brick_id": "c", "brick_text": "banana", "base_confidence": 0.4},
+            {"brick_id": "d", "brick_text": "cherry", "base_confidence": 0.1},
+        ]
+        timings = {}
+        results = orch.rerank(self.query, candidates, timings=timings)
+
+        # Heuristic order is a, b, c, d; CrossEncoder sees the top 2, the LLM
+        # the top 1 of the CrossEncoder ranking.
+        self.assertEqual(cross.seen, ["a", "b"])
+        self.assertEqual(llm.seen, ["b"])
+        self.assertEqual([r["brick_id"] for r in results], ["b", "a", "c", "d"])
+        self.assertEqual([r["reranker_used"] for r in results],
+                         ["llm_reranker", "cross_encoder", "heuristic", "heuristic"])
+        self.assertEqual(timings["heuristic"]["n"], 4)
+        self.assertEqual(timings["cross_encoder"]["n"], 2)
+        self.assertEqual(timings["llm_reranker"]["n"], 1)
+
+    def test_cascade_scores_are_monotonic_across_stages(self):
+        class ScoringReranker:
+            def __init__(self, name, scores):
+                self.name = name
+                self.scores = scores
+
+            def rank(self, query, candidates):
+                for c, score in zip(candidates, self.scores):
+                    c["final_score"] = score
+                    c["reranker_used"] = self.name
+                candidates.sort(key=lambda c: c["final_score"], reverse=True)
+                return candidates
+
+        # Low LLM scores and min-max CrossEncoder scores (the last head item is 0)
+        orch = self._orchestrator_with(primary=ScoringReranker("llm_reranker", [0.2, 0.1]),
+                                       secondary=ScoringReranker("cross_encoder", [1.0, 0.4, 0.0]))
+        orch.stage_top_n = {"cross_encoder": 3, "llm_reranker": 2}
+        candidates = [{"brick_id": str(i), "brick_text": "apple " * (6 - i), "base_confidence": 0.9 - i / 10}
+                      for i in range(6)]
+
+        results = orch.rerank(self.query, candidates)
+
+        scores = [r["final_score"] for r in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(0.0 <= s <= 1.0 for s in scores))
+        self.assertEqual([r["reranker_used"] for r in results],
+                         ["llm_reranker", "llm_reranker", "cross_encoder", "heuristic", "heuristic", "heuristic"])
+        self.assertEqual([r["stage_score"] for r in results[:2]], [0.2, 0.1])
+        # Candidates no later stage saw keep their heuristic scores
+        heuristic = HeuristicReranker().rank(self.query, [dict(c) for c in candidates])
+        self.assertEqual(scores[3:], [c["final_score"] for c in heuristic[3:]])
+
     def test_invariants(self):
         # Count check
         orch = RerankOrchestrator()
@@ -0,0 +1,128 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from nexus.rerank.score_cache import ScoreCache, candidate_hash
+from nexus.rerank.cross_encoder import CrossEncoderReranker
+from nexus.rerank.llm_reranker import LlmReranker
+
+
+class CountingModel:
+    """CrossEncoder stand-in: score is the number of query words in the text."""
+    def __init__(self):
+        self.pairs_scored = 0
+
+    def predict(self, pairs, **kwargs):
+        self.pairs_scored += len(pairs)
+        return [float(sum(w in text for w in query.split())) for query, text in pairs]
+
+
+class TestScoreCache(unittest.TestCase):
+    def setUp(self):
+        self.candidates = [
+            {"brick_id": "1", "brick_text": "apple pie recipe", "brick_hash": "h1"},
+            {"brick_id": "2", "brick_text": "banana bread", "brick_hash": "h2"},
+            {"brick_id": "3", "brick_text": "apple crumble", "brick_hash": "h3"},
+        ]
+
+    def test_exact_query_and_model_isolation(self):
+        cache = ScoreCache()
+        cache.put_many("m1", "Apple  Pie", {"h1": 0.7})
+
+        self.assertEqual(cache.get_many("m1", "Apple  Pie", ["h1"]), {"h1": 0.7})
+        # The model sees the raw query: other spellings are other keys
+        self.assertEqual(cache.get_many("m1", "apple pie", ["h1"]), {})
+        self.assertEqual(cache.get_many("m2", "Apple  Pie", ["h1"]), {})
+
+    def test_listwise_llm_scores_are_not_cached(self):
+        class BatchLlm:
+            def __init__(self):
+                self.calls = 0
+
+            def __call__(self, prompt, **kwargs):
+                self.calls += 1
+                if "Scores:" not in prompt:
+                    return {"choices": [{"text": " 0.5"}]}
+                n = sum(line.startswith("[") for line in prompt.splitlines())
+                return {"choices": [{"text": "\n".join(f"{i}: 0.{i}" for i in range(1, n + 1))}]}
+
+        cache = ScoreCache()
+        llm = BatchLlm()
+        listwise = LlmReranker(llm=llm, mode="listwise", batch_size=8, score_cache=cache)
+        listwise.rank("apple", [dict(c) for c in self.candidates])
+        listwise.rank("apple", [dict(c) for c in self.candidates])
+        self.assertEqual((llm.calls, len(cache)), (2, 0))
+
+        pointwise = LlmReranker(llm=llm, mode="pointwise", score_cache=cache)
+        pointwise.rank("apple", [dict(c) for c in self.candidates])
+        pointwise.rank("apple", [dict(c) for c in self.candidates])
+        self.assertEqual((llm.calls, len(cache)), (5, 3))
+
+    def test_lru_bound(self):
+        cache = ScoreCache(max_entries=2)
+        cache.put_many("m", "q", {"a": 1.0, "b": 2.0})
+        cache.get_many("m", "q", ["a"])
+        cache.put_many("m", "q", {"c": 3.0})
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get_many("m", "q", ["a", "b", "c"]), {"a": 1.0, "c": 3.0})
+
+    def test_candidate_hash_falls_back_to_text(self):
+        a = candidate_hash({"brick_text": "same"})
+        b = candidate_hash({"brick_text": "same", "brick_hash": None})
+        self.assertEqual(a, b)
+
+    def test_overlapping_queries_skip_inference(self):
+        model = CountingModel()
+        reranker = CrossEncoderReranker(model=model, score_cache=ScoreCache())
+
+        reranker.rank("apple", [dict(c) for c in self.candidates[:2]])
+        self.assertEqual(model.pairs_scored, 2)
+
+        # Only brick 3 is new
+        results = reranker.rank("apple", [dict(c) for c in self.candidates])
+        self.assertEqual(model.pairs_scored, 3)
+        self.assertEqual({r["brick_id"] for r in results[:2]}, {"1", "3"})
+
+    def test_sqlite_tier_survives_restart(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(tmp, "scores.sqlite")
+            ScoreCache(db_path=db_path).put_many("m", "q", {"h1": 0.25})
+
+            model = CountingModel()
+            restarted = ScoreCache(db_path=db_path)
+            self.assertEqual(restarted.get_many("m", "q", ["h1"]), {"h1": 0.25})
+
+            reranker = CrossEncoderReranker(model=model, score_cache=ScoreCache(db_path=db_path))
+            reranker.rank("apple", [dict(c) for c in self.candidates])
+            reranker = CrossEncoderReranker(model=model, score_cache=ScoreCache(db_path=db_path))
+            reranker.rank("apple", [dict(c) for c in self.candidates])
+            self.assertEqual(model.pairs_scored, 3)
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_after_fork_reopens_sqlite(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            cache = ScoreCache(db_path=os.path.join(tmp, "scores.sqlite"))
+            cache.put_many("m", "q", {"h1": 0.5})
+            inherited = cache._db
+            cache.after_fork()
+
+            self.assertIsNot(cache._db, inherited)
+            cache.put_many("m", "q", {"h2": 0.75})
+            self.assertEqual(ScoreCache(db_path=cache.db_path).get_many("m", "q", ["h1", "h2"]),
+                             {"h1": 0.5, "h2": 0.75})
+            # No SQLite tier: nothing to reopen
+            ScoreCache().after_fork()
+        finally:
+            shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    unittest.main()
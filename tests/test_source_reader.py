@@ -0,0 +1,109 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from nexus.bricks.source_reader import SourceReader, split_blocks
+
+
+def _write_tree(path, messages):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"messages": messages}, f)
+
+
+class TestSourceReader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "path_1.json")
+        _write_tree(self.path, [
+            {"message_id": "m1", "role": "user", "created_at": 1.0, "content": "first\n\n\nsecond\n\n"},
+            {"id": "m2", "role": "assistant", "content": ["a", "b"]},
+            {"message_id": "m1", "role": "user", "content": "duplicate id"},
+        ])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_resolves_spans_like_extractor(self):
+        reader = SourceReader()
+
+        self.assertEqual(split_blocks("first\n\n\nsecond\n\n"), ["first", "second"])
+        self.assertEqual(reader.get_block(self.path, "m1", 1), "second")
+        self.assertEqual(reader.get_block(self.path, "m2", 0), "a")
+        self.assertEqual(reader.get_message(self.path, "m1")["role"], "user")
+        self.assertIsNone(reader.get_block(self.path, "m1", 2))
+        self.assertIsNone(reader.get_block(self.path, "m1", -1))
+        self.assertIsNone(reader.get_block(self.path, "nope", 0))
+        self.assertIsNone(reader.get_block(os.path.join(self.tmp, "missing.json"), "m1", 0))
+
+    def test_cached_until_file_changes(self):
+        reader = SourceReader()
+        reader.get_block(self.path, "m1", 0)
+
+        with patch("builtins.open", side_effect=AssertionError("file re-read")):
+            for _ in range(5):
+                self.assertEqual(reader.get_block(self.path, "m1", 0), "first")
+        self.assertEqual(reader.hits, 5)
+
+        _write_tree(self.path, [{"message_id": "m1", "content": "rewritten\n\nlonger content"}])
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        self.assertEqual(reader.get_block(self.path, "m1", 0), "rewritten")
+
+        os.remove(self.path)
+        self.assertIsNone(reader.get_block(self.path, "m1", 0))
+        self.assertEqual(len(reader), 0)
+
+    def test_lru_bound(self):
+        reader = SourceReader(max_files=2)
+        paths = []
+        for i in range(3):
+            path = os.path.join(self.tmp, f"t{i}.json")
+            _write_tree(path, [{"message_id": "m", "content": f"tree {i}"}])
+            paths.append(path)
+            reader.get_tree(path)
+
+        self.assertEqual(len(reader), 2)
+        misses = reader.misses
+        reader.get_tree(paths[2])
+        reader.get_tree(paths[0])
+        self.assertEqual(reader.misses, misses + 1)
+
+    def test_byte_bound(self):
+        sizes = []
+        paths = []
+        for i in range(3):
+            path = os.path.join(self.tmp, f"t{i}.json")
+            _write_tree(path, [{"message_id": "m", "content": f"tree {i} " + "x" * 100}])
+            paths.append(path)
+            sizes.append(os.path.getsize(path))
+
+        # Room for two of the three trees
+        reader = SourceReader(max_bytes=sizes[0] + sizes[1])
+        for path in paths:
+            reader.get_tree(path)
+        self.assertEqual(len(reader), 2)
+        self.assertEqual(reader.current_bytes, sizes[1] + sizes[2])
+
+        # Too big to cache at all: still served
+        small = SourceReader(max_bytes=sizes[0] - 1)
+        self.assertEqual(small.get_block(paths[0], "m", 0), "tree 0 " + "x" * 100)
+        self.assertEqual((len(small), small.current_bytes), (0, 0))
+
+    def test_non_tree_json_is_unreadable(self):
+        reader = SourceReader()
+        for data in ([{"message_id": "m1"}], "text", 3, {"messages": {"m1": "x"}}, {"messages": [1, None]}):
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            st = os.stat(self.path)
+            os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+            self.assertIsNone(reader.get_block(self.path, "m1", 0), data)
+
+
+if __name__ == '__main__':
+    unittest.main()
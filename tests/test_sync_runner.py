@@ -0,0 +1,73 @@
+import unittest
+import os
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PACKAGE_ROOT = os.path.join(REPO_ROOT, "src", "nexus")
+
+# Walls are patched out: their tokenizer downloads its encoding on first use
+SYNC = """
+import sys
+from unittest.mock import patch
+from nexus.sync import runner
+with patch.object(runner, "build_walls", return_value=0):
+    runner.run_sync(sys.argv[1], sys.argv[2])
+"""
+
+
+def _conversation():
+    text = "reward model alignment\\n\\nreward model training\\n\\nreward model safety"
+    return {
+        "id": "conv-1",
+        "title": "Reward models",
+        "mapping": {
+            "root": {"parent": None, "children": ["m1"], "message": None},
+            "m1": {"parent": "root", "children": [], "message": {
+                "id": "m1", "author": {"role": "user"}, "create_time": 1700000000.0,
+                "content": {"parts": [text]}, "metadata": {}
+            }}
+        }
+    }
+
+
+def _tree_state(root):
+    state = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+        for name in filenames:
+            st = os.stat(os.path.join(dirpath, name))
+            state[os.path.join(dirpath, name)] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+class TestSyncOutputs(unittest.TestCase):
+    def test_sync_never_writes_inside_the_package(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            input_json = os.path.join(tmp, "conversations.json")
+            with open(input_json, "w", encoding="utf-8") as f:
+                json.dump([_conversation()], f)
+            env = dict(os.environ, NEXUS_DATA_DIR=os.path.join(tmp, "data"), NEXUS_GRAPH_MIN_DF="1",
+                       PYTHONPATH=os.path.join(REPO_ROOT, "src"))
+            for name in ("NEXUS_GRAPH_DIR", "NEXUS_GRAPH_STATE_PATH"):
+                env.pop(name, None)
+
+            before = _tree_state(PACKAGE_ROOT)
+            result = subprocess.run([sys.executable, "-c", SYNC, input_json, os.path.join(tmp, "out")],
+                                    cwd=tmp, env=env, capture_output=True, text=True, timeout=120)
+            self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+            self.assertIn("graph_built", result.stdout)
+
+            self.assertEqual(_tree_state(PACKAGE_ROOT), before)
+            with open(os.path.join(tmp, "data", "index", "graph", "nodes.json"), encoding="utf-8") as f:
+                self.assertIn("concept_reward", [n["id"] for n in json.load(f)])
+        finally:
+            shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    unittest.main()
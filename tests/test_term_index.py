@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.getcwd(), "src"))
+
+from nexus.rerank.term_index import TermIndex
+from nexus.rerank.heuristic import HeuristicReranker
+
+
+class TestTermIndex(unittest.TestCase):
+    def setUp(self):
+        self.bricks = [
+            {"brick_id": "1", "content": "Apple pie recipe with apple slices"},
+            {"brick_id": "2", "content": "Banana bread"},
+            {"brick_id": "3", "content": "pie apple"},
+            {"brick_id": "4", "content": ""},
+            {"brick_id": "5", "content": "the recipe for apple"},
+        ]
+        self.index = TermIndex()
+        self.index.add_bricks(self.bricks)
+
+    def _candidates(self):
+        return [
+            {"brick_id": b["brick_id"], "brick_text": b["content"], "base_confidence": 0.1 * i}
+            for i, b in enumerate(self.bricks)
+        ]
+
+    def test_indexed_scores_match_text_path(self):
+        for query in ["apple pie", "apple", "bread banana", "recipe", "missing words"]:
+            indexed = HeuristicReranker(self.index).rank(query, self._candidates())
+            plain = HeuristicReranker().rank(query, self._candidates())
+            self.assertEqual(
+                {c["brick_id"]: round(c["final_score"], 6) for c in indexed},
+                {c["brick_id"]: round(c["final_score"], 6) for c in plain},
+                query
+            )
+
+    def test_phrase_does_not_span_bricks(self):
+        # "... apple" + "banana ..." would be adjacent in the flat token array
+        index = TermIndex()
+        index.add_bricks([{"brick_id": "a", "content": "red apple"}, {"brick_id": "b", "content": "banana split"}])
+        overlap, phrase = index.score_batch(["apple", "banana"], ["a", "b"])
+
+        self.assertEqual(overlap.tolist(), [1, 1])
+        self.assertEqual(phrase.tolist(), [False, False])
+
+    def test_unindexed_candidates_use_text(self):
+        candidates = self._candidates() + [{"brick_id": "new", "brick_text": "apple pie", "base_confidence": 0.0}]
+        results = HeuristicReranker(self.index).rank("apple pie", candidates)
+        scores = {c["brick_id"]: c["final_score"] for c in results}
+        self.assertAlmostEqual(scores["new"], 0.9)
+
+    def test_mixed_batch_uses_one_phrase_rule(self):
+        # Substring and whole-token phrase rules disagree on all of these
+        texts = ["pineapple pie", "apple pies", "an apple pie", "apple, pie!", "Apple-Pie"]
+        index = TermIndex()
+        index.add_bricks([{"brick_id": f"i{n}", "content": t} for n, t in enumerate(texts)])
+        candidates = ([{"brick_id": f"i{n}", "brick_text": t, "base_confidence": 0.2} for n, t in enumerate(texts)]
+                      + [{"brick_id": f"u{n}", "brick_text": t, "base_confidence": 0.2} for n, t in enumerate(texts)])
+
+        scores = {c["brick_id"]: c["final_score"] for c in HeuristicReranker(index).rank("apple pie", candidates)}
+
+        for n in range(len(texts)):
+            self.assertAlmostEqual(scores[f"i{n}"], scores[f"u{n}"], msg=texts[n])
+        self.assertAlmostEqual(scores["u0"], 0.5 * 0.5 + 0.02)
+        self.assertAlmostEqual(scores["u2"], 0.5 + 0.4 + 0.02)
+        self.assertAlmostEqual(scores["u3"], 0.5 + 0.4 + 0.02)
+
+    def test_incremental_add_and_roundtrip(self):
+        self.assertEqual(self.index.add_bricks(self.bricks), 0)
+        self.assertEqual(self.index.add_bricks([{"brick_id": "6", "content": "Apple tart"}]), 1)
+
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, "terms.npz")
+            self.index.save(path)
+            loaded = TermIndex.load(path)
+        finally:
+            shutil.rmtree(tmp)
+
+        self.assertEqual(len(loaded), 6)
+        ids = ["1", "4", "6"]
+        self.assertEqual(loaded.score_batch(["apple"], ids)[0].tolist(),
+                         self.index.score_batch(["apple"], ids)[0].tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
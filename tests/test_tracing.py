@@ -0,0 +1,112 @@
+import unittest
+import contextvars
+import os
+import shutil
+import tempfile
+import threading
+from unittest.mock import patch
+
+from nexus.observability import logs, tracing
+from nexus.observability.tracing import Tracer
+from nexus.rerank.orchestrator import RerankOrchestrator
+
+
+class FixedStage:
+    def rank(self, query, candidates):
+        for c in candidates:
+            c["reranker_used"] = "cross_encoder"
+        return candidates
+
+
+class TestTracer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "trace.json")
+        self.tracer = Tracer(sample_rate=1.0, path=self.path, buffer=10)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_nested_spans_share_a_trace(self):
+        with logs.request_context("req-7"):
+            with self.tracer.span("root", k=5) as root:
+                with self.tracer.span("child") as child:
+                    child.set(n=3)
+                self.assertIs(tracing.current_span(), root)
+        self.assertIsNone(tracing.current_span())
+
+        [trace] = self.tracer.recent()
+        self.assertEqual(trace["trace_id"], "req-7")
+        child_out, root_out = trace["spans"]
+        self.assertEqual((root_out["name"], root_out["k"], root_out["parent_id"]), ("root", 5, None))
+        self.assertEqual((child_out["name"], child_out["n"]), ("child", 3))
+        self.assertEqual(child_out["parent_id"], root_out["span_id"])
+        self.assertGreaterEqual(root_out["ms"], child_out["ms"])
+
+    def test_unsampled_trace_records_nothing(self):
+        tracer = Tracer(sample_rate=0.0, path=self.path)
+        with tracer.span("root") as root:
+            with tracer.span("child") as child:
+                child.set(n=1)
+        self.assertIs(root, tracing.NOOP_SPAN)
+        self.assertIs(child, tracing.NOOP_SPAN)
+        self.assertEqual(tracer.recent(), [])
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_error_is_recorded(self):
+        with self.assertRaises(KeyError):
+            with self.tracer.span("root"):
+                raise KeyError("x")
+        self.assertEqual(self.tracer.recent()[0]["spans"][0]["error"], "KeyError")
+
+    def test_child_in_copied_context_on_another_thread(self):
+        with self.tracer.span("root"):
+            context = contextvars.copy_context()
+
+            def work():
+                with self.tracer.span("worker"):
+                    pass
+
+            t = threading.Thread(target=context.run, args=(work,))
+            t.start()
+            t.join()
+
+        worker, root = self.tracer.recent()[0]["spans"]
+        self.assertEqual(worker["parent_id"], root["span_id"])
+
+    def test_chrome_trace_file(self):
+        for i in range(2):
+            with self.tracer.span("root", i=i):
+                with self.tracer.span("child"):
+                    pass
+
+        events = tracing.read_trace_file(self.path)
+        self.assertEqual([e["name"] for e in events], ["child", "root", "child", "root"])
+        self.assertTrue(all(e["ph"] == "X" and e["dur"] >= 0 for e in events))
+        self.assertEqual(events[1]["args"]["i"], 0)
+        self.assertEqual(events[0]["args"]["parent_id"], events[1]["args"]["span_id"])
+        self.assertEqual(len(self.tracer.chrome_trace()["traceEvents"]), 4)
+
+
+class TestRerankSpans(unittest.TestCase):
+    def test_stage_spans(self):
+        with patch('nexus.rerank.orchestrator.LlmReranker', side_effect=ImportError), \
+             patch('nexus.rerank.orchestrator.CrossEncoderReranker', side_effect=ImportError):
+            orch = RerankOrchestrator(budget_ms=None)
+        orch.secondary = FixedStage()
+        candidates = [{"brick_id": f"b{i}", "base_confidence": 0.5, "brick_text": "alpha beta"} for i in range(5)]
+
+        tracer = Tracer(sample_rate=1.0, path=None)
+        with patch.object(tracing, "span", tracer.span):
+            orch.rerank("alpha", candidates)
+
+        spans = {s["name"]: s for s in tracer.recent()[0]["spans"]}
+        self.assertEqual(set(spans), {"rerank", "rerank.heuristic", "rerank.cross_encoder"})
+        self.assertEqual(spans["rerank"]["candidates"], 5)
+        self.assertEqual(spans["rerank"]["reranker_used"], "cross_encoder")
+        self.assertEqual(spans["rerank.cross_encoder"]["status"], "ok")
+        self.assertEqual(spans["rerank.heuristic"]["parent_id"], spans["rerank"]["span_id"])
+
+
+if __name__ == '__main__':
+    unittest.main()
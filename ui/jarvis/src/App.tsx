@@ -23,6 +23,11 @@ interface ExpandedBrick {
   full_text: string;
 }
 
+interface BrickBatchResponse<T> {
+  bricks: T[];
+  not_found: string[];
+}
+
 interface ApiResponse {
   query: string;
   top_bricks: BrickResult[];
@@ -52,13 +57,33 @@ interface AnchorOverride {
     status: string;
 }
 
-interface GraphIndexResponse {
-  nodes: GraphNode[] | { nodes: GraphNode[] };
-  edges: GraphEdge[] | { edges: GraphEdge[] };
+interface GraphSummary {
   index_content: string;
   anchor_overrides?: AnchorOverride[];
+  node_count: number;
+  edge_count: number;
+}
+
+interface NodePage {
+  nodes: GraphNode[];
+  next_offset: number | null;
+}
+
+interface EdgePage {
+  edges: GraphEdge[];
+  next_offset: number | null;
+}
+
+interface Neighborhood {
+  center: string;
+  nodes: GraphNode[];
+  edges: GraphEdge[];
+  truncated: boolean;
 }
 
+// Graph lists are loaded a page at a time (/jarvis/graph/*)
+const GRAPH_PAGE_SIZE = 200;
+
 type AnchorIntent =
   | { action: "promote"; brickId: string }
   | { action: "reject"; brickId: string };
@@ -84,12 +109,20 @@ export default function App() {
   const [query, setQuery] = useState('');
   const [results, setResults] = useState<BrickResult[]>([]);
   const [selectedBrick, setSelectedBrick] = useState<SelectedBrick | null>(null);
+  // Metadata for the current results page, fetched in one batch call
+  const [brickMeta, setBrickMeta] = useState<Record<string, SelectedBrick>>({});
   const [expandedBrick, setExpandedBrick] = useState<ExpandedBrick | null>(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   // New state for Graph View
-  const [graphData, setGraphData] = useState<GraphIndexResponse | null>(null);
+  const [graphSummary, setGraphSummary] = useState<GraphSummary | null>(null);
+  const [graphNodes, setGraphNodes] = useState<GraphNode[]>([]);
+  const [graphEdges, setGraphEdges] = useState<GraphEdge[]>([]);
+  const [nodesNextOffset, setNodesNextOffset] = useState<number | null>(null);
+  const [edgesNextOffset, setEdgesNextOffset] = useState<number | null>(null);
+  // 1-hop neighborhoods, fetched when a concept's neighbors are expanded
+  const [neighborhoods, setNeighborhoods] = useState<Record<string, Neighborhood>>({});
   const [showGraph, setShowGraph] = useState(false);
   const [anchorIntents, setAnchorIntents] = useState<Record<string, AnchorIntent>>({});
   
@@ -132,6 +165,25 @@ export default function App() {
     }));
   };
 
+  const prefetchBrickMeta = async (brickIds: string[]) => {
+    if (brickIds.length === 0) return;
+    try {
+      const res = await fetch('/jarvis/bricks-meta', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ brick_ids: brickIds })
+      });
+      if (!res.ok) return;
+      const data: BrickBatchResponse<SelectedBrick> = await res.json();
+      const byId: Record<string, SelectedBrick> = {};
+      data.bricks.forEach(meta => { byId[meta.brick_id] = meta; });
+      setBrickMeta(byId);
+    } catch (e) {
+      // Not fatal: clicks fall back to per-brick /jarvis/brick-meta
+      console.error("Failed to prefetch brick metadata", e);
+    }
+  };
+
   const handlePreview = async () => {
     if (!query.trim()) return;
 
@@ -139,6 +191,7 @@ export default function App() {
     setError(null);
     setSelectedBrick(null);
     setResults([]); // "Clicking “Preview” replaces results"
+    setBrickMeta({});
 
     try {
       // NON-NEGOTIABLE: ONLY call GET /jarvis/ask-preview
@@ -153,6 +206,7 @@ export default function App() {
       // "Sort results by confidence DESC"
       const sortedBricks = data.top_bricks.sort((a, b) => b.confidence - a.confidence);
       setResults(sortedBricks);
+      prefetchBrickMeta(sortedBricks.map(b => b.brick_id));
 
       if (sortedBricks.length === 0) {
         // "If results empty -> show “No matching bricks found”" -> Handled in render
@@ -169,6 +223,12 @@ export default function App() {
 
   const handleBrickClick = async (brick: BrickResult) => {
     // "brick detail panel (read-only)"
+    const prefetched = brickMeta[brick.brick_id];
+    if (prefetched) {
+      setSelectedBrick(prefetched);
+      return;
+    }
+
     // Initial loading state / reset
     setSelectedBrick({
       brick_id: brick.brick_id,
@@ -215,12 +275,37 @@ export default function App() {
     }
   };
 
+  const loadGraphNodes = async (offset: number) => {
+      try {
+          const res = await fetch(`/jarvis/graph/nodes?offset=${offset}&limit=${GRAPH_PAGE_SIZE}`);
+          if (!res.ok) throw new Error('Failed to load concepts');
+          const page: NodePage = await res.json();
+          setGraphNodes(prev => offset === 0 ? page.nodes : [...prev, ...page.nodes]);
+          setNodesNextOffset(page.next_offset);
+      } catch (e) {
+          console.error("Error loading concepts", e);
+      }
+  };
+
+  const loadGraphEdges = async (offset: number) => {
+      try {
+          const res = await fetch(`/jarvis/graph/edges?offset=${offset}&limit=${GRAPH_PAGE_SIZE}`);
+          if (!res.ok) throw new Error('Failed to load relations');
+          const page: EdgePage = await res.json();
+          setGraphEdges(prev => offset === 0 ? page.edges : [...prev, ...page.edges]);
+          setEdgesNextOffset(page.next_offset);
+      } catch (e) {
+          console.error("Error loading relations", e);
+      }
+  };
+
   const handleGraphView = async () => {
       try {
-          const res = await fetch('/jarvis/graph-index');
+          const res = await fetch('/jarvis/graph/summary');
           if (!res.ok) throw new Error('Failed to load graph index');
-          const data: GraphIndexResponse = await res.json();
-          setGraphData(data);
+          const data: GraphSummary = await res.json();
+          setGraphSummary(data);
+          setNeighborhoods({});
           setShowGraph(true);
           
           // Process Overrides
@@ -235,13 +320,31 @@ export default function App() {
              });
              setAnchorIntents(prev => ({ ...prev, ...newIntents }));
           }
+
+          // First pages only; the rest loads on demand
+          loadGraphNodes(0);
+          loadGraphEdges(0);
       } catch (e) {
           console.error("Error loading graph index", e);
           alert("Failed to load Enhanced AI View");
       }
   };
 
+  const loadNeighborhood = async (nodeId: string) => {
+      try {
+          const res = await fetch(`/jarvis/graph/neighborhood?node_id=${encodeURIComponent(nodeId)}&hops=1`);
+          if (!res.ok) return;
+          const data: Neighborhood = await res.json();
+          setNeighborhoods(prev => ({ ...prev, [nodeId]: data }));
+      } catch (e) {
+          console.error("Error loading neighbors", e);
+      }
+  };
+
   const toggleNeighbors = (nodeId: string) => {
+      if (!expandedNeighbors.has(nodeId) && !neighborhoods[nodeId]) {
+          loadNeighborhood(nodeId);
+      }
       setExpandedNeighbors(prev => {
           const next = new Set(prev);
           if (next.has(nodeId)) next.delete(nodeId);
@@ -259,26 +362,9 @@ export default function App() {
       });
   };
 
-  // Helper to safely extract nodes array regardless of schema structure
-  const getNodes = (data: GraphIndexResponse | null): GraphNode[] => {
-    if (!data) return [];
-    if (Array.isArray(data.nodes)) return data.nodes;
-    // Handle { nodes: [...] } wrapper
-    if (data.nodes && Array.isArray((data.nodes as any).nodes)) return (data.nodes as any).nodes;
-    return [];
-  };
-
-  const getEdges = (data: GraphIndexResponse | null): GraphEdge[] => {
-    if (!data) return [];
-    if (Array.isArray(data.edges)) return data.edges;
-    // Handle { edges: [...] } wrapper
-    if (data.edges && Array.isArray((data.edges as any).edges)) return (data.edges as any).edges;
-    return [];
-  };
-
   // Derived state for graph rendering
-  const nodes = getNodes(graphData);
-  const edges = getEdges(graphData);
+  const nodes = graphNodes;
+  const edges = graphEdges;
   const recalledBrickIds = results.map(r => r.brick_id);
 
   return (
@@ -389,7 +475,7 @@ export default function App() {
       )}
 
       {/* Enhanced AI View (Graph Index) Modal */}
-      {showGraph && graphData && (
+      {showGraph && graphSummary && (
         <>
           <div className="modal-backdrop" onClick={() => setShowGraph(false)} />
           <div className="brick-full-view graph-view" style={{ maxWidth: '800px' }}>
@@ -400,11 +486,11 @@ export default function App() {
             
             <div className="graph-content" style={{ overflowY: 'auto', maxHeight: '70vh' }}>
                 <div className="markdown-content" style={{ marginBottom: '2rem', padding: '1rem', background: '#f5f5f5', borderRadius: '4px' }}>
-                    <pre style={{ whiteSpace: 'pre-wrap', fontFamily: 'inherit', margin: 0 }}>{graphData.index_content}</pre>
+                    <pre style={{ whiteSpace: 'pre-wrap', fontFamily: 'inherit', margin: 0 }}>{graphSummary.index_content}</pre>
                 </div>
 
                 <div className="graph-section">
-                    <h4>Concepts ({nodes.length})</h4>
+                    <h4>Concepts ({nodes.length} of {graphSummary.node_count})</h4>
                     
                     <div className="concept-legend">
                       <span className="legend-strong">■ Strong (Hard Anchor Match)</span>
@@ -495,9 +581,10 @@ export default function App() {
                                         {/* Neighbors Expansion */}
                                         {expandedNeighbors.has(node.id) && (
                                             <div className="neighbors-list" style={{ marginLeft: '1rem', borderLeft: '1px dashed #ccc', paddingLeft: '1rem', marginTop: '0.5rem' }}>
-                                                {edges.filter(e => e.source === node.id || e.target === node.id).map((edge, i) => {
+                                                {!neighborhoods[node.id] && <div style={{fontSize: '0.8em', color: '#888'}}>Loading neighbors...</div>}
+                                                {(neighborhoods[node.id]?.edges || []).filter(e => e.source === node.id || e.target === node.id).map((edge, i) => {
                                                     const neighborId = edge.source === node.id ? edge.target : edge.source;
-                                                    const neighborNode = nodes.find(n => n.id === neighborId);
+                                                    const neighborNode = neighborhoods[node.id].nodes.find(n => n.id === neighborId);
                                                     return (
                                                         <div key={i} className="neighbor-item" style={{ background: '#f9f9f9', padding: '0.25rem', marginBottom: '0.25rem' }}>
                                                             <div>{neighborNode?.label || neighborId} <span style={{fontSize: '0.8em', color: '#666'}}>({edge.type})</span></div>
@@ -513,10 +600,13 @@ export default function App() {
                             );
                         })}
                     </div>
+                    {nodesNextOffset !== null && (
+                        <button onClick={() => loadGraphNodes(nodesNextOffset)}>Load more concepts</button>
+                    )}
                 </div>
 
                 <div className="graph-section" style={{ marginTop: '2rem' }}>
-                    <h4>Relations ({edges.length})</h4>
+                    <h4>Relations ({edges.length} of {graphSummary.edge_count})</h4>
                      <ul style={{ listStyle: 'none', padding: 0 }}>
                         {edges.map((edge, i) => (
                             <li key={i} style={{ padding: '0.25rem 0' }}>
@@ -524,6 +614,9 @@ export default function App() {
                             </li>
                         ))}
                     </ul>
+                    {edgesNextOffset !== null && (
+                        <button onClick={() => loadGraphEdges(edgesNextOffset)}>Load more relations</button>
+                    )}
                 </div>
             </div>
           </div>